@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import json
+import multiprocessing as mp
+import os
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from risk_analysis_agent.chunk_store import read_chunks
+from risk_analysis_agent.tagging import SCORE_PREFIX, tag_dataframe
+
+KEY = "_key"
+RUN_META = "run.json"  # identity of the model that wrote the checkpoint parts next to it
+
+_WORKER_ZSL: Any = None
+
+
+def _row_keys(df: pd.DataFrame) -> pd.Series:
+    """Stable per-chunk key used for checkpoints (chunk_id alone may repeat across issuers)."""
+    if "filepath" in df.columns:
+        return df["filepath"].astype(str) + "|" + df["chunk_id"].astype(str)
+    return df["chunk_id"].astype(str)
+
+
+def _init_worker(threads: int, model_kwargs: dict[str, Any]) -> None:
+    """Pool initializer of spawned workers: pin the process's thread budget, then load one model per process."""
+    global _WORKER_ZSL  # noqa: PLW0603
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "TORCH_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    import torch
+
+    from risk_analysis_agent.classifier import ZeroShotRisk
+
+    torch.set_num_threads(threads)
+    _WORKER_ZSL = ZeroShotRisk(**model_kwargs)
+
+
+def _export_once(model_kwargs: dict[str, Any]) -> None:
+    """Export/quantize the ONNX model in the parent, so spawned workers only load it instead of all exporting at once."""
+    from risk_analysis_agent.classifier import BACKEND, MODEL_ID
+    from risk_analysis_agent.onnx_backend import ensure_onnx
+
+    backend = (model_kwargs.get("backend") or BACKEND).lower()
+    if backend in ("onnx", "onnx-int8"):
+        ensure_onnx(model_kwargs.get("model_id") or MODEL_ID, quantized=backend == "onnx-int8")
+
+
+def _run_identity(model_kwargs: dict[str, Any], zsl: Any | None) -> dict[str, Any]:
+    """Everything besides the text that changes a score: parts written under another identity must not be merged."""
+    from risk_analysis_agent.cascade import CASCADE_TOP_M
+    from risk_analysis_agent.classifier import BACKEND, MAX_LEN, MODEL_ID
+    from risk_analysis_agent.taxonomy import HYPOTHESIS_TEMPLATE, canonical_labels
+
+    if zsl is not None:
+        model_id, backend, cascade_m = getattr(zsl, "model_id", None), getattr(zsl, "backend", None), getattr(zsl, "cascade_m", 0)
+        labels = list(zsl.labels)
+    else:
+        model_id, backend = model_kwargs.get("model_id") or MODEL_ID, (model_kwargs.get("backend") or BACKEND).lower()
+        labels = list(model_kwargs.get("labels") or canonical_labels())
+        cascade_m = model_kwargs.get("cascade_m")
+        cascade_m = CASCADE_TOP_M if cascade_m is None else cascade_m
+        cascade_m = cascade_m if 0 < cascade_m < len(labels) else 0  # as ZeroShotRisk: out of range means no cascade
+    return {"model_id": str(model_id), "backend": backend, "cascade_m": cascade_m, "labels": labels, "template": HYPOTHESIS_TEMPLATE, "max_len": MAX_LEN}
+
+
+def _check_parts(parts_dir: Path, identity: dict[str, Any]) -> None:
+    """Refuse to resume from parts written by another model, backend, cascade or label set; claim a fresh dir."""
+    meta = parts_dir / RUN_META
+    has_parts = any(parts_dir.glob("part-*.parquet"))
+    if has_parts:
+        previous = json.loads(meta.read_text(encoding="utf-8")) if meta.exists() else None
+        if previous != identity:
+            raise ValueError(f"{parts_dir} holds checkpoints of another run ({previous or 'unknown model'}); delete it or choose another output path")
+    else:
+        meta.write_text(json.dumps(identity, ensure_ascii=False), encoding="utf-8")
+
+
+def _score(zsl: Any, task: tuple[int, list[str], list[str]]) -> tuple[int, pd.DataFrame]:
+    seq, keys, texts = task
+    scores = tag_dataframe(pd.DataFrame({"text": texts}), zsl).drop(columns=["text"])
+    scores.insert(0, KEY, keys)
+    return seq, scores
+
+
+def _score_batch(task: tuple[int, list[str], list[str]]) -> tuple[int, pd.DataFrame]:
+    return _score(_WORKER_ZSL, task)
+
+
+def _write_part(parts_dir: Path, seq: int, scores: pd.DataFrame) -> None:
+    tmp = parts_dir / f"part-{seq:06d}.tmp"
+    scores.to_parquet(tmp, index=False)
+    tmp.replace(parts_dir / f"part-{seq:06d}.parquet")  # a part either exists whole or not at all
+
+
+def _done_parts(parts_dir: Path) -> tuple[set[str], int]:
+    done: set[str] = set()
+    next_seq = 0
+    for fp in sorted(parts_dir.glob("part-*.parquet")):
+        done.update(pd.read_parquet(fp, columns=[KEY])[KEY].tolist())
+        next_seq = max(next_seq, int(fp.stem.split("-")[1]) + 1)
+    return done, next_seq
+
+
+def classify_parquet(  # noqa: PLR0913
+    in_path: str,
+    out_path: str,
+    *,
+    workers: int = 1,
+    threads: int | None = None,
+    batch_size: int = 256,
+    model_kwargs: dict[str, Any] | None = None,
+    zsl: Any | None = None,
+    issuers: list[str] | None = None,
+    years: list[str] | None = None,
+    log: Callable[[str], None] = print,
+) -> dict[str, float]:
+    """
+    Tag every chunk of a parquet file with per-label scores, sharded across worker processes.
+
+    Batches are handed out to ``workers`` processes, each with its own model and
+    ``threads`` torch threads. Every finished batch is written as a checkpoint part
+    under ``<out_path>.parts/``; a restarted run skips chunks already in a part. The parts
+    directory records the model, backend, cascade and label set that wrote it, and a run
+    with a different one is refused instead of mixing their scores.
+    The parts are merged with the input columns into ``out_path`` at the end.
+
+    Args:
+        in_path (str): Chunk parquet (e.g. data/filings.parquet) or ChunkStore directory with 'text' and 'chunk_id'.
+        out_path (str): Output parquet: input columns plus one zsl_<label> column per label.
+        workers (int): Number of processes; 1 runs in-process.
+        threads (int | None): Torch threads per spawned worker; defaults to cores // workers. In-process
+            runs keep the caller's thread settings.
+        batch_size (int): Chunks per task/checkpoint.
+        model_kwargs (dict | None): ZeroShotRisk kwargs for each worker (model_id, backend, ...).
+        zsl (ZeroShotRisk | None): Ready classifier for in-process runs (workers=1).
+        issuers (list[str] | None): Only classify these issuers (only their partitions are read from a ChunkStore).
+        years (list[str] | None): Only classify these fiscal years.
+        log (Callable[[str], None]): Progress sink.
+
+    Returns:
+        dict[str, float]: chunks, skipped (resumed), seconds and chunks_per_sec.
+
+    Raises:
+        ValueError: If chunk keys repeat, or ``<out_path>.parts/`` holds checkpoints of another model or label set.
+    """
+    df = read_chunks(in_path, issuers, years)
+    df = df.drop(columns=[c for c in df.columns if c.startswith(SCORE_PREFIX)])  # re-classifying replaces old scores
+    keys = _row_keys(df)
+    if keys.duplicated().any():
+        raise ValueError("Input chunks must have unique (filepath, chunk_id) keys")
+    workers = max(1, workers)
+    model_kwargs = {"cache": False, **(model_kwargs or {})}
+    parts_dir = Path(str(out_path) + ".parts")
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    _check_parts(parts_dir, _run_identity(model_kwargs, zsl if workers == 1 else None))
+    done, seq = _done_parts(parts_dir)
+
+    todo = df.loc[~keys.isin(done)]
+    todo_keys = keys.loc[todo.index].tolist()
+    todo_texts = todo["text"].astype(str).tolist()
+    tasks: Iterator[tuple[int, list[str], list[str]]] = (
+        (seq + i, todo_keys[start : start + batch_size], todo_texts[start : start + batch_size]) for i, start in enumerate(range(0, len(todo_texts), batch_size))
+    )
+    threads = threads or max(1, (os.cpu_count() or 1) // workers)
+    log(f"{len(df)} chunks, {len(done)} already classified, {len(todo_texts)} to go on {workers} worker(s) x {threads} thread(s)")
+
+    t0 = time.perf_counter()
+    scored = 0
+
+    def _collect(results: Iterator[tuple[int, pd.DataFrame]]) -> None:
+        nonlocal scored
+        for part_seq, scores in results:
+            _write_part(parts_dir, part_seq, scores)
+            scored += len(scores)
+            dt = time.perf_counter() - t0
+            log(f"  {scored}/{len(todo_texts)} chunks, {scored / dt:.1f} chunks/s")
+
+    if workers == 1:  # no thread pinning here: env vars and torch threads belong to the caller
+        if zsl is None:
+            from risk_analysis_agent.classifier import ZeroShotRisk
+
+            zsl = ZeroShotRisk(**model_kwargs)
+        _collect(_score(zsl, t) for t in tasks)
+    else:
+        _export_once(model_kwargs)
+        ctx = mp.get_context("spawn")  # fresh interpreters: no forked torch thread pools
+        with ctx.Pool(workers, initializer=_init_worker, initargs=(threads, model_kwargs)) as pool:
+            _collect(pool.imap_unordered(_score_batch, tasks))
+    elapsed = time.perf_counter() - t0
+
+    parts = [pd.read_parquet(fp) for fp in sorted(parts_dir.glob("part-*.parquet"))]
+    scores_df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame({KEY: []})
+    out = df.assign(**{KEY: keys}).merge(scores_df, on=KEY, how="left").drop(columns=[KEY])
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    out.to_parquet(out_path, index=False)
+    stats = {"chunks": len(df), "skipped": len(done), "seconds": elapsed, "chunks_per_sec": scored / elapsed if elapsed > 0 else 0.0}
+    log(f"Wrote {out_path}: {scored} chunks classified in {elapsed:.1f}s ({stats['chunks_per_sec']:.1f} chunks/s)")
+    return stats
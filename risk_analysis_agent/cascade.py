@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import os
+from typing import Any
+
+import numpy as np
+
+from risk_analysis_agent.taxonomy import label_description
+
+CASCADE_TOP_M = int(os.getenv("ZSL_CASCADE_TOP_M", "0"))  # 0 = score every label with NLI
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.where(norms == 0, 1.0, norms)
+
+
+class LabelPrefilter:
+    """
+    First stage of the classifier cascade.
+    Label descriptions are embedded once with the retrieval embedder (MiniLM); each chunk
+    is embedded with the same model and only its top-m most similar labels go on to NLI scoring.
+    """
+
+    def __init__(self, labels: list[str], embedder: Any | None = None):
+        if embedder is None:
+            from risk_analysis_agent.retriever import get_embedder
+
+            embedder = get_embedder()
+        self.labels = list(labels)
+        self.embedder = embedder
+        self.label_vecs = _normalize(np.asarray(embedder.embed_documents([label_description(lab) for lab in self.labels]), dtype=np.float32))
+
+    def similarities(self, texts: list[str]) -> np.ndarray:
+        """
+        Cosine similarity of every text to every label description, shape [len(texts), len(labels)].
+        """
+        if not texts:
+            return np.zeros((0, len(self.labels)), dtype=np.float32)
+        vecs = _normalize(np.asarray(self.embedder.embed_documents(texts), dtype=np.float32))
+        return vecs @ self.label_vecs.T
+
+    def candidates(self, texts: list[str], m: int) -> list[list[int]]:
+        """
+        Indices of the top-m labels per text (in label order), or every label when m >= len(labels).
+        """
+        n = len(self.labels)
+        if m <= 0 or m >= n:
+            return [list(range(n)) for _ in texts]
+        sims = self.similarities(texts)
+        top = np.argpartition(-sims, m - 1, axis=1)[:, :m]
+        return [sorted(int(j) for j in row) for row in top]
+
+
+def recall_at_m(full_scores: list[list[tuple[str, float]]], candidates: list[list[str]], top_k: int = 3) -> float:
+    """
+    Share of each chunk's top_k labels (under full NLI scoring) that survive the prefilter.
+
+    Args:
+        full_scores (list[list[tuple[str, float]]]): Full (label, score) lists per chunk.
+        candidates (list[list[str]]): Labels kept by the prefilter per chunk.
+        top_k (int): How many top labels count as relevant.
+
+    Returns:
+        float: Recall in [0, 1] (1.0 when there is nothing to recall).
+    """
+    hit, total = 0, 0
+    for scores, cands in zip(full_scores, candidates, strict=True):
+        best = [lab for lab, _ in sorted(scores, key=lambda x: x[1], reverse=True)[:top_k]]
+        keep = set(cands)
+        hit += sum(lab in keep for lab in best)
+        total += len(best)
+    return hit / total if total else 1.0
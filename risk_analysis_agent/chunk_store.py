@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import shutil
+import uuid
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from urllib.parse import unquote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from risk_analysis_agent.ingest import SCHEMA, chunks_to_pandas, iter_record_batches
+from risk_analysis_agent.setting import Settings
+
+PARTITION_COLS = ["issuer", "fiscal_year"]
+ROWS_PER_GROUP = 16_384
+PARTITIONING = ds.partitioning(pa.schema([(c, pa.string()) for c in PARTITION_COLS]), flavor="hive")
+
+
+class ChunkStore:
+    """
+    Parquet dataset of chunks partitioned as ``<root>/issuer=<issuer>/fiscal_year=<year>/*.parquet``.
+
+    Writes stream record batches straight to row groups; reads load only the requested
+    partitions (filters are pushed down to the directory layout) and columns.
+    """
+
+    def __init__(self, root: str | None = None):
+        self.root = Path(root or Settings().chunk_store_dir)
+
+    # ------------------------ writing ----------------------------------------
+
+    def write(self, data: pd.DataFrame | pa.Table | Iterable[pa.RecordBatch], *, overwrite: bool = True) -> int:
+        """
+        Write chunks into their issuer/fiscal_year partitions.
+
+        Args:
+            data (pd.DataFrame | pa.Table | Iterable[pa.RecordBatch]): Chunks; record batches
+                (e.g. from ingest.iter_record_batches) are consumed lazily.
+            overwrite (bool): Replace the partitions being written (re-ingesting an issuer/year) instead of appending to them.
+
+        Returns:
+            int: Rows written.
+        """
+        if isinstance(data, pd.DataFrame):
+            data = pa.Table.from_pandas(data, preserve_index=False)
+        batches = data.to_batches() if isinstance(data, pa.Table) else data
+        it = iter(batches)
+        first = next(it, None)
+        if first is None:  # nothing to write; leave existing partitions alone
+            return 0
+        written = 0
+
+        def _counted() -> Iterator[pa.RecordBatch]:
+            nonlocal written
+            for b in _chain(first, it):
+                written += b.num_rows
+                yield b
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        ds.write_dataset(
+            _counted(),
+            self.root,
+            schema=first.schema,
+            format="parquet",
+            partitioning=PARTITIONING,
+            basename_template=f"part-{uuid.uuid4().hex[:12]}-{{i}}.parquet",
+            existing_data_behavior="delete_matching" if overwrite else "overwrite_or_ignore",
+            max_rows_per_group=ROWS_PER_GROUP,
+            min_rows_per_group=min(ROWS_PER_GROUP, 1024),
+        )
+        return written
+
+    def refresh(self, fps: Iterable[Path], partitions: Iterable[tuple[str, str]], workers: int | None = None) -> int:
+        """
+        Re-chunk the filings of some issuer/fiscal_year partitions into the store, streaming.
+
+        Every filing of a touched partition is re-read, since a partition is replaced as a whole;
+        partitions with no filing left are deleted. Other partitions are not touched.
+
+        Args:
+            fps (Iterable[Path]): All filing paths (<issuer>/<year>/<file>), e.g. ingest.list_filings(folder).
+            partitions (Iterable[tuple[str, str]]): (issuer, fiscal_year) pairs whose filings changed.
+            workers (int | None): Ingestion worker processes; defaults to INGEST_WORKERS.
+
+        Returns:
+            int: Rows written.
+        """
+        touched = {(str(i), str(y)) for i, y in partitions}
+        keep = [fp for fp in fps if (fp.parts[-3], fp.parts[-2]) in touched]
+        gone = touched - {(fp.parts[-3], fp.parts[-2]) for fp in keep}
+        if gone and self.root.exists():
+            for d in self.root.glob("issuer=*/fiscal_year=*"):
+                if (unquote(d.parent.name.split("=", 1)[1]), unquote(d.name.split("=", 1)[1])) in gone:
+                    shutil.rmtree(d)
+        return self.write(iter_record_batches(keep, workers=workers)) if keep else 0
+
+    # ------------------------ reading ----------------------------------------
+
+    def dataset(self) -> ds.Dataset:
+        """
+        The store as a pyarrow dataset (partition columns typed as strings).
+        """
+        return ds.dataset(self.root, format="parquet", partitioning=PARTITIONING)
+
+    def _filter(self, issuers: Iterable[str] | None, years: Iterable[str | int] | None) -> ds.Expression | None:
+        expr = None
+        if issuers is not None:
+            expr = ds.field("issuer").isin([str(i) for i in issuers])
+        if years is not None:
+            cond = ds.field("fiscal_year").isin([str(y) for y in years])
+            expr = cond if expr is None else expr & cond
+        return expr
+
+    def iter_batches(
+        self, issuers: Iterable[str] | None = None, years: Iterable[str | int] | None = None, columns: list[str] | None = None, batch_size: int = ROWS_PER_GROUP
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Stream the selected partitions/columns without materialising them.
+        """
+        if not self.root.exists():
+            return
+        yield from self.dataset().to_batches(columns=columns, filter=self._filter(issuers, years), batch_size=batch_size)
+
+    def read(self, issuers: Iterable[str] | None = None, years: Iterable[str | int] | None = None, columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        Load the selected partitions and columns into pandas.
+
+        Args:
+            issuers (Iterable[str] | None): Issuer partitions to read; all if None.
+            years (Iterable[str | int] | None): Fiscal-year partitions to read; all if None.
+            columns (list[str] | None): Columns to read; all if None.
+
+        Returns:
+            pd.DataFrame: The chunks, SCHEMA columns first.
+        """
+        if not self.root.exists():
+            return pd.DataFrame(columns=columns or SCHEMA)
+        table = self.dataset().to_table(columns=columns, filter=self._filter(issuers, years))
+        df = chunks_to_pandas(table)
+        if columns is None:
+            df = df[[c for c in SCHEMA if c in df.columns] + [c for c in df.columns if c not in SCHEMA]]
+        return df
+
+    def partitions(self) -> list[tuple[str, str]]:
+        """
+        (issuer, fiscal_year) pairs present in the store.
+        """
+        if not self.root.exists():
+            return []
+        dirs = [p for p in self.root.glob("issuer=*/fiscal_year=*") if any(p.glob("*.parquet"))]
+        return sorted((unquote(p.parent.name.split("=", 1)[1]), unquote(p.name.split("=", 1)[1])) for p in dirs)
+
+
+def _chain(first: pa.RecordBatch, rest: Iterator[pa.RecordBatch]) -> Iterator[pa.RecordBatch]:
+    yield first
+    yield from rest
+
+
+def read_chunks(path: str, issuers: Iterable[str] | None = None, years: Iterable[str | int] | None = None, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Read chunks from either a single parquet file or a partitioned ChunkStore directory.
+    """
+    if Path(path).is_dir():
+        return ChunkStore(path).read(issuers, years, columns)
+    df = pd.read_parquet(path, columns=columns)
+    if issuers is not None:
+        df = df[df["issuer"].astype(str).isin([str(i) for i in issuers])]
+    if years is not None:
+        df = df[df["fiscal_year"].astype(str).isin([str(y) for y in years])]
+    return df.reset_index(drop=True)
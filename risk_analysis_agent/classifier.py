@@ -1,18 +1,64 @@
 import os
+import threading
+from typing import Any
 
-import torch
-from transformers import AutoModelForSequenceClassification, AutoTokenizer
-
-from risk_analysis_agent.taxonomy import canonical_labels
+from risk_analysis_agent import zsl_cache
+from risk_analysis_agent.cascade import CASCADE_TOP_M, LabelPrefilter
+from risk_analysis_agent.onnx_backend import BACKENDS, load_onnx_model
+from risk_analysis_agent.taxonomy import HYPOTHESIS_TEMPLATE, canonical_labels
+from risk_analysis_agent.zsl_cache import ClassificationCache, cache_namespace, text_hash
 
 # ---- Perf/control knobs (safe defaults; override in .env) -------------------
 MODEL_ID = os.getenv("ZSL_MODEL", "facebook/bart-large-mnli")
-DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+BACKEND = os.getenv("ZSL_BACKEND", "torch").lower()  # torch | onnx | onnx-int8
 MAX_LEN = int(os.getenv("ZSL_MAX_LEN", "512"))
-LBL_BATCH = int(os.getenv("ZSL_LABEL_BATCH", "16"))  # how many labels to score per forward pass
+TOKEN_BUDGET = int(os.getenv("ZSL_TOKEN_BUDGET", "8192"))  # max padded tokens per forward pass
 TORCH_NUM = int(os.getenv("TORCH_NUM_THREADS", "4"))
 os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
-torch.set_num_threads(TORCH_NUM)
+
+_DEVICE: str | None = None
+
+
+def _torch() -> Any:
+    """
+    Imports torch on first use (it takes seconds, so importing this module stays cheap) and applies
+    TORCH_NUM_THREADS once.
+    """
+    global _DEVICE  # noqa: PLW0603
+    import torch
+
+    if _DEVICE is None:
+        torch.set_num_threads(TORCH_NUM)
+        _DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+    return torch
+
+
+def pack_by_tokens(lengths: list[int], budget: int) -> list[list[int]]:
+    """
+    Group item indices into batches whose padded size stays within a token budget.
+
+    Items are sorted by length so each batch pads to a similar length; a batch
+    costs ``len(batch) * longest_item`` tokens. An item longer than the budget
+    still gets a batch of its own.
+
+    Args:
+        lengths (list[int]): Token length of every item.
+        budget (int): Max padded tokens per batch.
+
+    Returns:
+        list[list[int]]: Item indices per batch, shortest items first.
+    """
+    batches: list[list[int]] = []
+    cur: list[int] = []
+    for idx in sorted(range(len(lengths)), key=lengths.__getitem__):
+        # sorted ascending, so the newcomer is the longest item of the batch
+        if cur and (len(cur) + 1) * lengths[idx] > budget:
+            batches.append(cur)
+            cur = []
+        cur.append(idx)
+    if cur:
+        batches.append(cur)
+    return batches
 
 
 class ZeroShotRisk:
@@ -21,64 +67,149 @@ class ZeroShotRisk:
     For each text, we score entailment for each taxonomy label:
         premise  = text chunk
         hypothesis = "This text is about <LABEL>."
-    We batch labels to speed up inference.
+    (text, label) pairs from all input texts are flattened, sorted by token length
+    and packed into batches capped by ZSL_TOKEN_BUDGET, so large runs fill every forward pass.
+    Optionally (ZSL_CASCADE_TOP_M), an embedding-similarity prefilter keeps only the top-m labels per text.
     """
 
-    def __init__(self, labels: list[str] | None = None, model_id: str | None = None):
+    def __init__(  # noqa: PLR0913
+        self,
+        labels: list[str] | None = None,
+        model_id: str | None = None,
+        *,
+        token_budget: int | None = None,
+        cache: ClassificationCache | bool = True,
+        backend: str | None = None,
+        cascade_m: int | None = None,
+        embedder: Any | None = None,
+    ):
+        """
+        Args:
+            labels (list[str] | None): Candidate labels; defaults to the risk taxonomy.
+            model_id (str | None): HF model id or local path; defaults to ZSL_MODEL.
+            token_budget (int | None): Max padded tokens per forward pass; defaults to ZSL_TOKEN_BUDGET.
+            cache (ClassificationCache | bool): Score cache to use. True opens the default one at
+                ZSL_CACHE_PATH (if set), False disables caching.
+            backend (str | None): "torch", "onnx" or "onnx-int8"; defaults to ZSL_BACKEND.
+                ONNX backends export the model once into ZSL_ONNX_DIR and run it with ONNX Runtime.
+            cascade_m (int | None): If > 0, only the top-m labels by embedding similarity get NLI-scored
+                (others score 0.0); defaults to ZSL_CASCADE_TOP_M.
+            embedder (Embeddings | None): Embedder for the cascade prefilter; defaults to the retrieval embedder.
+        """
         self.labels = labels or canonical_labels()
-        mid = model_id or MODEL_ID
-        self.tok = AutoTokenizer.from_pretrained(mid, use_fast=True)
-        self.mdl = AutoModelForSequenceClassification.from_pretrained(mid).to(DEVICE).eval()
+        self.token_budget = token_budget or TOKEN_BUDGET
+        self.model_id = model_id or MODEL_ID
+        self.backend = (backend or BACKEND).lower()
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unsupported ZSL_BACKEND: {self.backend}")
+        _torch()
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        self.tok = AutoTokenizer.from_pretrained(self.model_id, use_fast=True)
+        if self.backend == "torch":
+            self.mdl = AutoModelForSequenceClassification.from_pretrained(self.model_id).to(_DEVICE).eval()
+        else:
+            self.mdl = load_onnx_model(self.model_id, self.backend, num_threads=TORCH_NUM)
+        if cache is True:
+            self.cache = ClassificationCache() if zsl_cache.CACHE_PATH else None
+        else:
+            self.cache = cache or None
+        self.cascade_m = CASCADE_TOP_M if cascade_m is None else cascade_m
+        if not 0 < self.cascade_m < len(self.labels):
+            self.cascade_m = 0
+        self.prefilter = LabelPrefilter(self.labels, embedder) if self.cascade_m else None
+        # quantized/exported models, cascaded runs and other truncation lengths give different scores: keep their cache entries apart
+        cache_model = self.model_id if self.backend == "torch" else f"{self.model_id}@{self.backend}"
+        if self.cascade_m:
+            cache_model += f"#cascade={self.cascade_m}"
+        self._cache_ns = cache_namespace(cache_model, self.labels, HYPOTHESIS_TEMPLATE, MAX_LEN)
 
     # ------------------------ internal helpers -------------------------------
 
-    @torch.inference_mode()
+    def _score_texts(self, texts: list[str]) -> list[list[tuple[str, float]]]:
+        """
+        Score all labels for many texts, serving cached texts without touching the model.
+        Returns: for each text, a list of (label, entailment_prob) for every label (unsorted).
+        """
+        if self.cache is None:
+            return self._run_model(texts)
+        keys = [f"{self._cache_ns}:{text_hash(t)}" for t in texts]
+        found = self.cache.get_many(list(dict.fromkeys(keys)))
+        # score each missing text once, even if it appears several times in the input
+        todo = {k: t for k, t in zip(keys, texts, strict=True) if k not in found}
+        if todo:
+            fresh = self._run_model(list(todo.values()))
+            new = {k: [sc for _, sc in scores] for k, scores in zip(todo, fresh, strict=True)}
+            self.cache.put_many(new)
+            found.update(new)
+        return [list(zip(self.labels, found[k], strict=True)) for k in keys]
+
+    def _run_model(self, texts: list[str]) -> list[list[tuple[str, float]]]:
+        """
+        Score labels for many texts with cross-text, token-budgeted batching.
+        With the cascade on, only each text's prefilter candidates are scored; the rest get 0.0.
+        Returns: for each text, a list of (label, entailment_prob) for every label (unsorted).
+        """
+        n_lab = len(self.labels)
+        if not texts or not n_lab:
+            return [[] for _ in texts]
+        if self.prefilter is not None:
+            cands = self.prefilter.candidates(texts, self.cascade_m)
+        else:
+            cands = [list(range(n_lab))] * len(texts)
+        pairs = [(i, j) for i, labs in enumerate(cands) for j in labs]
+        hypotheses = [HYPOTHESIS_TEMPLATE.format(lab) for lab in self.labels]
+        # flattened (text, label) pairs, tokenized unpadded so lengths are exact
+        enc = self.tok(
+            [texts[i] for i, _ in pairs],
+            [hypotheses[j] for _, j in pairs],
+            truncation=True,
+            max_length=MAX_LEN,
+        )
+        ids = enc["input_ids"]
+        lengths = [len(x) for x in ids]
+        probs = [0.0] * len(ids)
+        torch = _torch()
+        with torch.inference_mode():
+            for batch in pack_by_tokens(lengths, self.token_budget):
+                # pad to the longest pair of this batch only (tokenizer's pad token and side; token_type_ids etc. kept)
+                inputs = self.tok.pad({key: [enc[key][p] for p in batch] for key in enc}, return_tensors="pt")
+                logits = self.mdl(**{key: t.to(_DEVICE, non_blocking=True) for key, t in inputs.items()}).logits  # shape [B, 3] = [contradiction, neutral, entailment]
+                for p, pr in zip(batch, torch.softmax(logits, dim=-1)[:, -1].tolist(), strict=True):
+                    probs[p] = float(pr)
+
+        full = [[0.0] * n_lab for _ in texts]
+        for (i, j), pr in zip(pairs, probs, strict=True):
+            full[i][j] = pr
+        return [list(zip(self.labels, row, strict=True)) for row in full]
+
     def _score_one_text(self, text: str) -> list[tuple[str, float]]:
         """
-        Score all labels for a single text, batching labels for speed.
+        Score all labels for a single text.
         Returns: list of (label, entailment_prob) for every label (unsorted).
         """
-        scores: list[tuple[str, float]] = []
-        n = len(self.labels)
-        # batch labels to avoid huge single forward + keep memory steady
-        for start in range(0, n, LBL_BATCH):
-            chunk_labels = self.labels[start : start + LBL_BATCH]
-            # Build paired inputs: (premise=text, hypothesis="This text is about <label>.")
-            premises = [text] * len(chunk_labels)
-            hypotheses = [f"This text is about {lab}." for lab in chunk_labels]
-
-            enc = self.tok(
-                premises,
-                hypotheses,
-                truncation=True,
-                max_length=MAX_LEN,
-                padding=True,
-                return_tensors="pt",
-            )
-            enc = {k: v.to(DEVICE, non_blocking=True) for k, v in enc.items()}
-            logits = self.mdl(**enc).logits  # shape [B, 3] = [contradiction, neutral, entailment]
-            probs = torch.softmax(logits, dim=-1)[:, -1].tolist()  # entailment prob per label
-
-            scores.extend(zip(chunk_labels, map(float, probs), strict=False))
-
-        return scores
+        return self._score_texts([text])[0]
 
     # ------------------------ public APIs ------------------------------------
 
-    @torch.inference_mode()
+    def score(self, texts: list[str]) -> list[list[tuple[str, float]]]:
+        """
+        Full scores: for each text, (label, entailment_prob) for every label in label order.
+        Used to store per-label scores with each chunk at index time.
+        """
+        return self._score_texts(texts)
+
     def classify(self, texts: list[str], top_k: int = 3) -> list[list[tuple[str, float]]]:
         """
         Backwards-compatible with your current UI:
           returns, for each text, the top_k labels sorted by score desc.
         """
         out: list[list[tuple[str, float]]] = []
-        for t in texts:
-            scores = self._score_one_text(t)
+        for scores in self._score_texts(texts):
             scores.sort(key=lambda x: x[1], reverse=True)
             out.append(scores[:top_k])
         return out
 
-    @torch.inference_mode()
     def classify_threshold(
         self,
         texts: list[str],
@@ -90,11 +221,29 @@ class ZeroShotRisk:
         Optionally cap the number returned with max_labels.
         """
         out: list[list[tuple[str, float]]] = []
-        for t in texts:
-            scores = self._score_one_text(t)
+        for scores in self._score_texts(texts):
             keep = [(lab, sc) for lab, sc in scores if sc >= threshold]
             keep.sort(key=lambda x: x[1], reverse=True)
             if max_labels is not None:
                 keep = keep[:max_labels]
             out.append(keep)
         return out
+
+
+_ZSL: ZeroShotRisk | None = None
+_ZSL_LOCK = threading.Lock()
+
+
+def get_zsl() -> ZeroShotRisk:
+    """
+    Process-wide ZeroShotRisk, loaded on first call; the headless counterpart of the
+    Streamlit app's cached instance, for the public API, CLI and batch jobs.
+
+    Returns:
+        ZeroShotRisk: The shared classifier.
+    """
+    global _ZSL  # noqa: PLW0603
+    with _ZSL_LOCK:
+        if _ZSL is None:
+            _ZSL = ZeroShotRisk()
+        return _ZSL
@@ -3,6 +3,8 @@ import argparse
 import os
 import subprocess
 import sys
+from pathlib import Path
+from typing import Any
 
 
 def serve() -> int:
@@ -52,7 +54,224 @@ def demo() -> int:
     return serve()
 
 
-def main() -> None:
+def _cache_command(cache: Any, path: Path | str, args: argparse.Namespace) -> int:
+    """
+    Runs a cache subcommand (stats, prune or clear) against an open cache, then closes it.
+
+    Args:
+        cache (Any): A cache with ``prune(max_bytes)``, ``clear()``, ``stats()`` and ``close()``.
+        path (Path | str): Where the cache lives, for the summary line.
+        args (argparse.Namespace): Parsed command-line arguments (``action`` and ``max_mb``).
+
+    Returns:
+        int: 0 on success.
+    """
+    try:
+        if args.action == "prune":
+            removed = cache.prune(int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None)
+            print(f"Removed {removed} entries")
+        elif args.action == "clear":
+            cache.clear()
+            print("Cache cleared")
+        st = cache.stats()
+        print(f"{path}: {st['entries']} entries, {st['bytes'] / 1024 / 1024:.1f} MB")
+    finally:
+        cache.close()
+    return 0
+
+
+def zsl_cache(args: argparse.Namespace) -> int:
+    """
+    Inspects, prunes or clears the on-disk zero-shot classification cache.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        int: 0 on success.
+    """
+    from risk_analysis_agent.zsl_cache import ClassificationCache
+
+    cache = ClassificationCache(args.path)
+    return _cache_command(cache, cache.path, args)
+
+
+def embed_cache(args: argparse.Namespace) -> int:
+    """
+    Inspects, prunes or clears the on-disk embedding cache of a model.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        int: 0 on success.
+    """
+    from risk_analysis_agent.embed_cache import EmbeddingCache
+    from risk_analysis_agent.setting import Settings
+
+    cache = EmbeddingCache(args.model or Settings().embedding_model, root=args.path)
+    return _cache_command(cache, cache.dir, args)
+
+
+def llm_cache(args: argparse.Namespace) -> int:
+    """
+    Inspects, prunes or clears the on-disk LLM response cache.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        int: 0 on success.
+    """
+    from risk_analysis_agent.llm_cache import ResponseCache
+
+    cache = ResponseCache(args.path)
+    return _cache_command(cache, cache.path, args)
+
+
+def chunk_stats(args: argparse.Namespace) -> int:
+    """
+    Compares how much chunk text the embedder and classifier truncate in char vs token chunking.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        int: 0 on success.
+    """
+    from risk_analysis_agent.ingest import ingest_folder, load_windows, truncation_report
+
+    windows = load_windows()
+    print("window limits: " + ", ".join(f"{w.name}={w.limit} tokens" for w in windows))
+    for mode in ("chars", "tokens"):
+        df = ingest_folder(args.folder, mode=mode, windows=windows)
+        print(f"[{mode}] {len(df)} chunks")
+        for name, r in truncation_report(df["text"].tolist(), windows).items():
+            print(f"  {name:6s} truncated {r['truncated_chunks']}/{r['chunks']} chunks, lost {r['tokens_lost']}/{r['tokens']} tokens ({r['lost_pct']:.1f}%)")
+    return 0
+
+
+def classify(args: argparse.Namespace) -> int:
+    """
+    Classifies every chunk of a parquet file across worker processes (resumable).
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        int: 0 on success.
+    """
+    from risk_analysis_agent.bulk import classify_parquet
+
+    model_kwargs = {k: v for k, v in {"model_id": args.model, "backend": args.backend}.items() if v}
+    classify_parquet(
+        args.input,
+        args.output,
+        workers=args.workers,
+        threads=args.threads,
+        batch_size=args.batch_size,
+        model_kwargs=model_kwargs,
+        issuers=args.issuer,
+        years=args.year,
+    )
+    return 0
+
+
+def store_chunks(args: argparse.Namespace) -> int:
+    """
+    Streams a filing folder into the issuer/fiscal_year partitioned chunk store.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        int: 0 on success.
+    """
+    from risk_analysis_agent.chunk_store import ChunkStore
+    from risk_analysis_agent.ingest import iter_record_batches, list_filings
+
+    store = ChunkStore(args.store)
+    rows = store.write(iter_record_batches(list_filings(args.folder), workers=args.workers))
+    print(f"Wrote {rows} chunks to {store.root} ({len(store.partitions())} issuer/year partitions)")
+    return 0
+
+
+def lexical_rebuild(args: argparse.Namespace) -> int:
+    """
+    Rebuilds the BM25 index used by hybrid retrieval from a Chroma collection.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        int: 0 on success.
+    """
+    from risk_analysis_agent.retriever import rebuild_lexical_index
+
+    n = rebuild_lexical_index(args.collection)
+    print(f"Indexed {n} chunks of '{args.collection}' for lexical search")
+    return 0
+
+
+def summarize(args: argparse.Namespace) -> int:
+    """
+    Summarizes every issuer/year of a filing folder with concurrent LLM calls (resumable JSONL).
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        int: 0 on success.
+    """
+    from risk_analysis_agent.ingest import list_filings
+    from risk_analysis_agent.public_api import summarize_many
+
+    pairs = sorted({(fp.parts[-3], fp.parts[-2]) for fp in list_filings(args.folder)})
+    results = summarize_many(pairs, question=args.question, k=args.k, concurrency=args.concurrency, out_path=args.output)
+    print(f"Summarized {len(results)} of {len(pairs)} issuer/year pairs -> {args.output}")
+    return 0
+
+
+def summarize_filing(args: argparse.Namespace) -> int:
+    """
+    Summarizes a whole issuer/year filing by map-reduce and prints the summary with its stats.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        int: 0 on success, 1 if nothing is indexed for the issuer/year.
+    """
+    from risk_analysis_agent.mapreduce import summarize_filing as run
+
+    res = run(args.issuer, args.year, concurrency=args.concurrency)
+    if not res["stats"]["chunks"]:
+        print(f"No indexed chunks for {args.issuer} {args.year}")
+        return 1
+    print(res["summary"])
+    stats = res["stats"]
+    reduces = stats["llm_calls"] - stats["groups"]
+    print(f"\n{stats['chunks']} chunks -> {stats['groups']} map + {reduces} reduce calls ({stats['levels']} rounds), {len(res['sources'])} chunks cited")
+    return 0
+
+
+def serve_api(args: argparse.Namespace) -> int:
+    """
+    Runs the JSON inference service (classify, search, summarize) over one warm model set.
+
+    Args:
+        args (argparse.Namespace): Parsed command-line arguments.
+
+    Returns:
+        int: 0 once the server stops.
+    """
+    from risk_analysis_agent.server import run_server
+
+    run_server(args.host, args.port, warm=not args.no_warmup)
+    return 0
+
+
+def main() -> None:  # noqa: PLR0915
     """
     Entry point for the CLI. Parses arguments and dispatches to the appropriate command.
     """
@@ -73,6 +292,71 @@ def main() -> None:
     s3 = sub.add_parser("demo", help="Create tiny sample & run dashboard")
     s3.set_defaults(func=lambda _: demo())
 
+    s4 = sub.add_parser("zsl-cache", help="Show, prune or clear the classification cache")
+    s4.add_argument("action", choices=["stats", "prune", "clear"])
+    s4.add_argument("--path", help="Cache file (default: ZSL_CACHE_PATH)")
+    s4.add_argument("--max-mb", type=float, help="Prune down to this size (default: ZSL_CACHE_MAX_MB; 0 = no limit)")
+    s4.set_defaults(func=zsl_cache)
+
+    s4b = sub.add_parser("embed-cache", help="Show, prune or clear the embedding cache")
+    s4b.add_argument("action", choices=["stats", "prune", "clear"])
+    s4b.add_argument("--model", help="Embedding model (default: EMBEDDING_MODEL)")
+    s4b.add_argument("--path", help="Cache root (default: EMBED_CACHE_DIR)")
+    s4b.add_argument("--max-mb", type=float, help="Prune down to this size (default: EMBED_CACHE_MAX_MB; 0 = no limit)")
+    s4b.set_defaults(func=embed_cache)
+
+    s4c = sub.add_parser("llm-cache", help="Show, prune (expired + LRU) or clear the LLM response cache")
+    s4c.add_argument("action", choices=["stats", "prune", "clear"])
+    s4c.add_argument("--path", help="Cache file (default: LLM_CACHE_PATH)")
+    s4c.add_argument("--max-mb", type=float, help="Prune down to this size (default: LLM_CACHE_MAX_MB; 0 = no limit)")
+    s4c.set_defaults(func=llm_cache)
+
+    s5 = sub.add_parser("chunk-stats", help="Report text truncated by model token windows (chars vs tokens chunking)")
+    s5.add_argument("--folder", default="data/samples")
+    s5.set_defaults(func=chunk_stats)
+
+    s6 = sub.add_parser("classify", help="Bulk-classify a chunk parquet with N worker processes")
+    s6.add_argument("--in", dest="input", default="data/filings.parquet")
+    s6.add_argument("--out", dest="output", default="data/filings_tagged.parquet")
+    s6.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) // 4))
+    s6.add_argument("--threads", type=int, help="Torch threads per worker (default: cores // workers)")
+    s6.add_argument("--batch-size", type=int, default=256, help="Chunks per task / checkpoint")
+    s6.add_argument("--model", help="Override ZSL_MODEL")
+    s6.add_argument("--backend", choices=["torch", "onnx", "onnx-int8"], help="Override ZSL_BACKEND")
+    s6.add_argument("--issuer", action="append", help="Only this issuer (repeatable; reads only its partitions from a chunk store)")
+    s6.add_argument("--year", action="append", help="Only this fiscal year (repeatable)")
+    s6.set_defaults(func=classify)
+
+    s7 = sub.add_parser("store-chunks", help="Stream a filing folder into the partitioned chunk store")
+    s7.add_argument("--folder", default="data/samples")
+    s7.add_argument("--store", help="Store directory (default: CHUNK_STORE_DIR)")
+    s7.add_argument("--workers", type=int, help="Ingestion processes (default: INGEST_WORKERS)")
+    s7.set_defaults(func=store_chunks)
+
+    s8 = sub.add_parser("lexical-rebuild", help="Rebuild the BM25 index used by RETRIEVAL_MODE=hybrid")
+    s8.add_argument("--collection", default="risk_docs")
+    s8.set_defaults(func=lexical_rebuild)
+
+    s9 = sub.add_parser("summarize", help="Summarize every issuer/year of a filing folder (resumable)")
+    s9.add_argument("--folder", default="data/samples")
+    s9.add_argument("--out", dest="output", default="data/summaries.jsonl")
+    s9.add_argument("--question", default="top risks")
+    s9.add_argument("--k", type=int, default=8)
+    s9.add_argument("--concurrency", type=int, help="Concurrent LLM calls (default: SUMMARIZE_CONCURRENCY)")
+    s9.set_defaults(func=summarize)
+
+    s10 = sub.add_parser("summarize-filing", help="Summarize an entire issuer/year filing (concurrent map-reduce)")
+    s10.add_argument("--issuer", required=True)
+    s10.add_argument("--year", required=True)
+    s10.add_argument("--concurrency", type=int, help="Concurrent LLM calls (default: SUMMARIZE_CONCURRENCY)")
+    s10.set_defaults(func=summarize_filing)
+
+    s11 = sub.add_parser("serve-api", help="Run the JSON inference service with warm models")
+    s11.add_argument("--host", help="Interface to bind (default: API_HOST)")
+    s11.add_argument("--port", type=int, help="Port (default: API_PORT)")
+    s11.add_argument("--no-warmup", action="store_true", help="Answer at once; load models on first use")
+    s11.set_defaults(func=serve_api)
+
     args = p.parse_args()
     sys.exit(args.func(args))
 
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import math
+import os
+import re
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from risk_analysis_agent.ingest import source_key
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))  # default prompt-context budget
+# per-model overrides, e.g. "gemma3:1b=2000,gpt-4o=12000"
+CONTEXT_TOKEN_BUDGETS = os.getenv("CONTEXT_TOKEN_BUDGETS", "")
+DEDUP_JACCARD = float(os.getenv("CONTEXT_DEDUP_JACCARD", "0.8"))  # shingle similarity treated as a duplicate
+SHINGLE_WORDS = 5
+MIN_OVERLAP_CHARS = 40  # shorter shared edges are coincidence, not chunk overlap
+_WORD = re.compile(r"\w+")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (~4 characters per token), close enough across the supported LLMs for budgeting.
+    """
+    return math.ceil(len(text) / 4)
+
+
+def context_budget(model: str | None = None) -> int:
+    """
+    Token budget for the retrieved context of a model: CONTEXT_TOKEN_BUDGETS entry, else CONTEXT_TOKEN_BUDGET.
+    """
+    for item in CONTEXT_TOKEN_BUDGETS.split(","):
+        name, _, tokens = item.strip().rpartition("=")
+        if name and name == model:
+            return int(tokens)
+    return CONTEXT_TOKEN_BUDGET
+
+
+def _shingles(text: str) -> set[tuple[str, ...]]:
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        return {tuple(words)}
+    return {tuple(words[i : i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def _edge_overlap(a: str, b: str) -> int:
+    """Length of the longest suffix of ``a`` that is a prefix of ``b`` (at least MIN_OVERLAP_CHARS)."""
+    head = b[:MIN_OVERLAP_CHARS]
+    if len(head) < MIN_OVERLAP_CHARS:
+        return 0
+    start = a.find(head, max(0, len(a) - len(b)))
+    while start != -1:
+        if b.startswith(a[start:]):
+            return len(a) - start
+        start = a.find(head, start + 1)
+    return 0
+
+
+@dataclass
+class PackedContext:
+    """
+    Prompt context built from retrieved chunks, with what was dropped and why.
+    """
+
+    text: str = ""
+    chunk_ids: list[str] = field(default_factory=list)
+    duplicates: int = 0  # near-duplicate chunks dropped
+    over_budget: int = 0  # chunks that did not fit the budget
+    overlap_chars: int = 0  # characters trimmed where neighbouring chunks overlap
+    tokens_in: int = 0  # tokens of the naive "join every chunk" context
+    tokens_out: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_in - self.tokens_out
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.chunk_ids)} chunks, ~{self.tokens_out} tokens "
+            f"(saved ~{self.tokens_saved}: {self.duplicates} duplicates, {self.overlap_chars} overlapping chars, {self.over_budget} over budget)"
+        )
+
+
+def cite_id(d: Any) -> str:
+    """Citation id of a retrieved chunk (its ``chunk_id``; "?" when missing), as written in ``[..]`` context blocks."""
+    return str(d.metadata.get("chunk_id", "?"))
+
+
+def build_context(docs: list[Any], budget: int | None = None, count_tokens: Callable[[str], int] = estimate_tokens) -> PackedContext:
+    """
+    Packs retrieved chunks into a prompt context: ``[chunk_id] text`` blocks in relevance order.
+
+    Chunks repeating an earlier one (same id, or word-shingle Jaccard >= CONTEXT_DEDUP_JACCARD,
+    e.g. boilerplate carried across fiscal years) are dropped; text shared with a neighbouring
+    chunk of the same file (the ingest overlap) is kept once. Remaining chunks are added, most
+    relevant first, while they fit ``budget`` tokens.
+
+    Args:
+        docs (list[Document]): Retrieved chunks, most relevant first.
+        budget (int | None): Token budget; defaults to CONTEXT_TOKEN_BUDGET.
+        count_tokens (Callable[[str], int]): Token counter; defaults to estimate_tokens.
+
+    Returns:
+        PackedContext: Context text, cited chunk ids and token accounting.
+    """
+    budget = CONTEXT_TOKEN_BUDGET if budget is None else budget
+    naive = "\n\n".join(f"[{cite_id(d)}] {d.page_content}" for d in docs)
+    out = PackedContext(tokens_in=count_tokens(naive) if docs else 0)
+    kept: list[tuple[Any, str, set]] = []  # (doc, text kept, shingles)
+    blocks: list[str] = []
+    used = 0
+    for d in docs:
+        cid, text = cite_id(d), d.page_content
+        shingles = _shingles(text)
+        if any((cid != "?" and cid == cite_id(k)) or _jaccard(shingles, sh) >= DEDUP_JACCARD for k, _, sh in kept):
+            out.duplicates += 1
+            continue
+        src, trimmed = source_key(cid), 0
+        for k, kept_text, _ in kept:
+            if source_key(cite_id(k)) != src:
+                continue
+            if n := _edge_overlap(kept_text, text):  # text continues a kept chunk
+                text = text[n:]
+            elif n := _edge_overlap(text, kept_text):  # text precedes a kept chunk
+                text = text[: len(text) - n]
+            trimmed += n
+        block = f"[{cid}] {text.strip()}"
+        cost = count_tokens(block) + (1 if blocks else 0)
+        if used + cost > budget:
+            out.over_budget += 1
+            continue
+        out.overlap_chars += trimmed
+        kept.append((d, text, shingles))
+        blocks.append(block)
+        out.chunk_ids.append(cid)
+        used += cost
+    out.text = "\n\n".join(blocks)
+    out.tokens_out = count_tokens(out.text) if blocks else 0
+    return out
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from risk_analysis_agent.lru import LRUCache
+
+EMBED_CACHE_DIR = os.getenv("EMBED_CACHE_DIR", ".cache/embeddings")  # empty string disables the cache
+EMBED_CACHE_MAX_MB = float(os.getenv("EMBED_CACHE_MAX_MB", "1024"))
+QUERY_CACHE_ITEMS = int(os.getenv("QUERY_CACHE_ITEMS", "1024"))  # in-process LRU of query embeddings
+
+
+def _slug(model_name: str) -> str:
+    short = hashlib.sha256(model_name.encode("utf-8")).hexdigest()[:8]
+    return f"{re.sub(r'[^A-Za-z0-9_.-]+', '__', model_name).strip('_')[-60:]}-{short}"
+
+
+class EmbeddingCache:
+    """
+    On-disk store of document embeddings for one model:
+      - ``vectors.f32``: float32 rows, read through a memory map,
+      - ``index.sqlite``: sha256(text) -> row, plus last-used time for LRU eviction.
+    Rows are only appended under a SQLite write lock, and read under it too (compaction rewrites
+    the file), so several processes may share a cache.
+    Once the vectors outgrow ``max_bytes``, the least-recently-used rows are compacted away.
+    """
+
+    def __init__(self, model_name: str, root: str | None = None, max_bytes: int | None = None):
+        self.dir = Path(root or EMBED_CACHE_DIR) / _slug(model_name)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(EMBED_CACHE_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        self.vec_path = self.dir / "vectors.f32"
+        self.vec_path.touch(exist_ok=True)
+        self._lock = threading.Lock()
+        self._mm: np.memmap | None = None
+        self._gen: str | None = None
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(self.dir / "index.sqlite", check_same_thread=False, timeout=60, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT NOT NULL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS emb (key TEXT PRIMARY KEY, row INTEGER NOT NULL, last_used REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS emb_last_used ON emb(last_used)")
+
+    # ------------------------ internal helpers -------------------------------
+
+    def _meta(self, k: str) -> str | None:
+        row = self._db.execute("SELECT v FROM meta WHERE k = ?", (k,)).fetchone()
+        return None if row is None else str(row[0])
+
+    @property
+    def dim(self) -> int | None:
+        v = self._meta("dim")
+        return None if v is None else int(v)
+
+    def _vectors(self, dim: int, rows_needed: int) -> np.ndarray:
+        """Memory-mapped view of the vector file, remapped when another writer grew or compacted it."""
+        gen = self._meta("gen")
+        if self._mm is None or self._mm.shape[0] < rows_needed or gen != self._gen:
+            self._gen = gen
+            n = self.vec_path.stat().st_size // (4 * dim)
+            self._mm = np.memmap(self.vec_path, dtype=np.float32, mode="r", shape=(n, dim)) if n else None
+        return self._mm if self._mm is not None else np.empty((0, dim), dtype=np.float32)
+
+    # ------------------------ public APIs ------------------------------------
+
+    def get_many(self, keys: list[str]) -> dict[str, np.ndarray]:
+        """
+        Vectors of the keys that are cached (and marks them as recently used).
+        """
+        dim = self.dim
+        if dim is None or not keys:
+            self.misses += len(keys)
+            return {}
+        rows: dict[str, int] = {}
+        with self._lock:
+            # prune swaps the vector file before it commits the new rows, so a read snapshot alone could pair
+            # old rows with the compacted file; holding the lock that put_many/prune write under keeps both in step
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                for start in range(0, len(keys), 500):  # stay under SQLite's bound-parameter limit
+                    part = keys[start : start + 500]
+                    marks = ",".join("?" * len(part))
+                    rows.update(self._db.execute(f"SELECT key, row FROM emb WHERE key IN ({marks})", part).fetchall())
+                if rows:
+                    now = time.time()
+                    self._db.executemany("UPDATE emb SET last_used = ? WHERE key = ?", [(now, k) for k in rows])
+                vecs = self._vectors(dim, max(rows.values(), default=-1) + 1)
+                found = {k: np.array(vecs[r]) for k, r in rows.items() if r < vecs.shape[0]}
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: dict[str, np.ndarray]) -> None:
+        """
+        Append vectors for new keys, then evict if the file outgrew ``max_bytes``.
+        """
+        if not items:
+            return
+        arr = np.asarray(list(items.values()), dtype=np.float32)
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")  # serialises appends across processes
+            try:
+                dim = self.dim
+                if dim is None:
+                    dim = arr.shape[1]
+                    self._db.execute("INSERT INTO meta (k, v) VALUES ('dim', ?)", (str(dim),))
+                if arr.shape[1] != dim:
+                    raise ValueError(f"Embedding dim {arr.shape[1]} does not match cached dim {dim} in {self.dir}")
+                first = self.vec_path.stat().st_size // (4 * dim)
+                with self.vec_path.open("r+b") as f:
+                    f.seek(first * 4 * dim)
+                    f.write(arr.tobytes())
+                now = time.time()
+                self._db.executemany("INSERT OR REPLACE INTO emb (key, row, last_used) VALUES (?, ?, ?)", [(k, first + i, now) for i, k in enumerate(items)])
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        if self.max_bytes > 0 and self.vec_path.stat().st_size > self.max_bytes:
+            # leave some headroom so we do not compact on every insert
+            self.prune(int(self.max_bytes * 0.9))
+
+    def prune(self, max_bytes: int | None = None) -> int:
+        """
+        Keep only the most recently used vectors that fit in ``max_bytes`` and compact the file.
+
+        Args:
+            max_bytes (int | None): Size to prune to; defaults to the cache's ``max_bytes``. As there,
+                0 means unlimited and removes nothing (``clear`` drops everything).
+
+        Returns:
+            int: Number of entries removed.
+        """
+        target = self.max_bytes if max_bytes is None else max_bytes
+        return self._compact(target) if target > 0 else 0
+
+    def _compact(self, target: int) -> int:
+        """Rewrite the file with the most recently used vectors that fit in ``target`` bytes (0 keeps none)."""
+        with self._lock:
+            dim = self.dim
+            if dim is None:
+                return 0
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                keep_n = max(0, target // (4 * dim))
+                kept = self._db.execute("SELECT key, row, last_used FROM emb ORDER BY last_used DESC LIMIT ?", (keep_n,)).fetchall()
+                total = int(self._db.execute("SELECT COUNT(*) FROM emb").fetchone()[0])
+                if len(kept) == total and self.vec_path.stat().st_size <= target:
+                    self._db.execute("COMMIT")
+                    return 0
+                n = self.vec_path.stat().st_size // (4 * dim)
+                old = np.memmap(self.vec_path, dtype=np.float32, mode="r", shape=(n, dim)) if n else np.empty((0, dim), dtype=np.float32)
+                kept = [(k, r, t) for k, r, t in kept if r < n]
+                tmp = self.vec_path.with_suffix(".tmp")
+                tmp.write_bytes(np.ascontiguousarray(old[[r for _, r, _ in kept]]).tobytes() if kept else b"")
+                del old
+                self._mm = None
+                tmp.replace(self.vec_path)
+                self._db.execute("DELETE FROM emb")
+                self._db.executemany("INSERT INTO emb (key, row, last_used) VALUES (?, ?, ?)", [(k, i, t) for i, (k, _, t) in enumerate(kept)])
+                self._db.execute("INSERT OR REPLACE INTO meta (k, v) VALUES ('gen', ?)", (str(time.time_ns()),))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return total - len(kept)
+
+    def clear(self) -> None:
+        """Drop every cached vector."""
+        self._compact(0)
+
+    def stats(self) -> dict[str, float]:
+        """
+        Returns hit/miss counters for this instance and the current size on disk.
+        """
+        with self._lock:
+            entries = int(self._db.execute("SELECT COUNT(*) FROM emb").fetchone()[0])
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": self.vec_path.stat().st_size,
+        }
+
+    def close(self) -> None:
+        """Close the index connection."""
+        with self._lock:
+            self._mm = None
+            self._db.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    LangChain ``Embeddings`` wrapper that serves repeated document texts from an EmbeddingCache
+    (when given) and repeated queries from an in-process LRU, and only runs the wrapped model on misses.
+    """
+
+    def __init__(self, inner: Any, model_name: str, cache: EmbeddingCache | None = None, query_items: int | None = None):
+        self.inner = inner
+        self.model_name = model_name
+        self.cache = cache
+        self.queries: LRUCache[list[float]] = LRUCache(QUERY_CACHE_ITEMS if query_items is None else query_items)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if self.cache is None:
+            return list(self.inner.embed_documents(texts))
+        keys = [hashlib.sha256(t.encode("utf-8")).hexdigest() for t in texts]
+        found = self.cache.get_many(list(dict.fromkeys(keys)))
+        missing = {k: t for k, t in zip(keys, texts, strict=True) if k not in found}
+        if missing:
+            fresh = dict(zip(missing, np.asarray(self.inner.embed_documents(list(missing.values())), dtype=np.float32), strict=True))
+            self.cache.put_many(fresh)
+            found.update(fresh)
+        return [found[k].tolist() for k in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        vec = self.queries.get(text)
+        if vec is None:
+            vec = list(self.inner.embed_query(text))
+            self.queries.put(text, vec)
+        return list(vec)
+
+    def stats(self) -> dict[str, float]:
+        st = {f"query_{k}": v for k, v in self.queries.stats().items()}
+        return {**(self.cache.stats() if self.cache is not None else {}), **st}
@@ -1,6 +1,10 @@
+from __future__ import annotations
+
 import os
+from typing import TYPE_CHECKING
 
-from langchain_huggingface import HuggingFaceEmbeddings
+if TYPE_CHECKING:
+    from langchain_huggingface import HuggingFaceEmbeddings
 
 
 def get_embedder() -> HuggingFaceEmbeddings:
@@ -8,5 +12,7 @@ def get_embedder() -> HuggingFaceEmbeddings:
     Returns an instance of HuggingFaceEmbeddings using the model specified
     by the EMBEDDING_MODEL environment variable, or a default model if not set.
     """
+    from langchain_huggingface import HuggingFaceEmbeddings
+
     model = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
     return HuggingFaceEmbeddings(model_name=model)
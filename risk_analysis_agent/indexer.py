@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from risk_analysis_agent.ingest import _resolve_dir, ingest_files, list_filings
+from risk_analysis_agent.lexical import get_lexical_index
+from risk_analysis_agent.pdf_text import file_sha256
+from risk_analysis_agent.retriever import bump_collection_version, chunk_ids, get_vectorstore, index_dataframe
+from risk_analysis_agent.setting import Settings
+from risk_analysis_agent.tagging import TAG_BATCH, score_column, tag_dataframe, tags_from_metadata
+
+
+@dataclass
+class SyncReport:
+    """
+    What an incremental index run did.
+    """
+
+    added_files: list[str] = field(default_factory=list)
+    changed_files: list[str] = field(default_factory=list)
+    removed_files: list[str] = field(default_factory=list)
+    unchanged_files: int = 0
+    chunks_embedded: int = 0
+    chunks_deleted: int = 0
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.added_files)} new, {len(self.changed_files)} changed, {len(self.removed_files)} removed, "
+            f"{self.unchanged_files} unchanged files; {self.chunks_embedded} chunks embedded, "
+            f"{self.chunks_deleted} deleted in {self.seconds:.1f}s"
+        )
+
+
+def manifest_path(collection: str = "risk_docs") -> Path:
+    """
+    Location of a collection's file manifest, next to the Chroma data.
+    """
+    return Path(Settings().chroma_persist_dir) / f"{collection}.manifest.json"
+
+
+def load_manifest(path: Path) -> dict[str, dict[str, Any]]:
+    """
+    Read a manifest: {absolute file path: {"sha256", "mtime", "size", "ids"}}; empty if missing.
+    """
+    if not path.exists():
+        return {}
+    return dict(json.loads(path.read_text(encoding="utf-8")))
+
+
+def save_manifest(path: Path, manifest: dict[str, dict[str, Any]]) -> None:
+    """
+    Write a manifest atomically.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=1, sort_keys=True), encoding="utf-8")
+    tmp.replace(path)
+
+
+def sync_folder(folder: str | None, collection: str = "risk_docs", get_zsl: Callable[[], Any] | None = None) -> SyncReport:
+    """
+    Incrementally bring a collection in line with the filings under ``folder``.
+
+    Files whose size and mtime match the manifest are skipped without being read;
+    otherwise the content hash decides. Only new or changed files are chunked (and
+    tagged, if ``get_zsl`` is given), only chunks whose content-hash id is not yet stored
+    are embedded, and chunks of removed files or stale chunks of changed files are deleted.
+
+    Args:
+        folder (str | None): Root folder (<issuer>/<year>/*.txt); defaults to data/samples.
+        collection (str): Chroma collection name.
+        get_zsl (Callable[[], ZeroShotRisk] | None): Lazy classifier factory; if given, new chunks get
+            index-time label scores. It is only called when there are chunks to tag, so a no-op sync loads no model.
+
+    Returns:
+        SyncReport: Files and chunks added, changed and removed.
+    """
+    t0 = time.perf_counter()
+    base = _resolve_dir(folder)
+    mpath = manifest_path(collection)
+    manifest = load_manifest(mpath)
+    report = SyncReport()
+
+    to_ingest: list[Path] = []
+    seen: set[str] = set()
+    for fp in list_filings(folder):
+        key = str(fp)
+        seen.add(key)
+        st = fp.stat()
+        entry = manifest.get(key)
+        if entry and entry["mtime"] == st.st_mtime and entry["size"] == st.st_size:
+            report.unchanged_files += 1
+            continue
+        sha = file_sha256(fp)
+        if entry and entry["sha256"] == sha:  # touched but identical
+            entry["mtime"], entry["size"] = st.st_mtime, st.st_size
+            report.unchanged_files += 1
+            continue
+        (report.changed_files if entry else report.added_files).append(key)
+        manifest[key] = {"sha256": sha, "mtime": st.st_mtime, "size": st.st_size, "ids": (entry or {}).get("ids", [])}
+        to_ingest.append(fp)
+
+    # only files under this folder can be "removed"; other folders may share the collection
+    removed = [k for k in manifest if k not in seen and Path(k).is_relative_to(base)]
+    report.removed_files = removed
+
+    vs = get_vectorstore(collection)
+    stale: list[str] = []
+    if to_ingest:
+        df = ingest_files(to_ingest)
+        if get_zsl is not None and not df.empty:
+            df = tag_dataframe(df, get_zsl())
+        df = df.assign(_id=chunk_ids(df))
+        new_ids = df.groupby("filepath")["_id"].apply(list).to_dict()
+        for fp in to_ingest:
+            key = str(fp)
+            ids = list(dict.fromkeys(new_ids.get(key, [])))
+            stale += [i for i in manifest[key]["ids"] if i not in set(ids)]
+            manifest[key]["ids"] = ids
+        report.chunks_embedded = index_dataframe(df.drop(columns=["_id"]), collection)
+    for key in removed:
+        stale += manifest.pop(key)["ids"]
+    if stale:
+        vs.delete(ids=stale)
+        lex = get_lexical_index(Settings().chroma_persist_dir, collection)
+        lex.remove(stale)
+        lex.save()
+        bump_collection_version(collection)
+    report.chunks_deleted = len(stale)
+
+    save_manifest(mpath, manifest)
+    report.seconds = time.perf_counter() - t0
+    return report
+
+
+def retag_collection(get_zsl: Callable[[], Any], collection: str = "risk_docs", batch: int = TAG_BATCH) -> int:
+    """
+    Add label scores to every stored chunk indexed without them (before index-time tagging, or with it off).
+
+    Only metadata is updated; nothing is re-embedded. Incremental syncs never re-read unchanged
+    files, so this is how an older index stops being classified on the fly at query time.
+
+    Args:
+        get_zsl (Callable[[], ZeroShotRisk]): Lazy classifier factory; only called if some chunk lacks scores.
+        collection (str): Chroma collection name.
+        batch (int): Chunks read and scored per step.
+
+    Returns:
+        int: Number of chunks tagged.
+    """
+    vs = get_vectorstore(collection)
+    tagged, offset = 0, 0
+    while True:
+        got = vs.get(include=["documents", "metadatas"], limit=batch, offset=offset)
+        if not got["ids"]:
+            break
+        offset += len(got["ids"])
+        todo = [(cid, doc, meta or {}) for cid, doc, meta in zip(got["ids"], got["documents"], got["metadatas"], strict=True) if tags_from_metadata(meta or {}) is None]
+        if not todo:
+            continue
+        scores = get_zsl().score([doc for _, doc, _ in todo])
+        metas = [{**meta, **{score_column(lab): round(float(sc), 6) for lab, sc in row}} for (_, _, meta), row in zip(todo, scores, strict=True)]
+        vs._collection.update(ids=[cid for cid, _, _ in todo], metadatas=metas)
+        tagged += len(todo)
+    if tagged:
+        bump_collection_version(collection)
+    return tagged
+
+
+def export_collection(out_path: str, collection: str = "risk_docs") -> pd.DataFrame:
+    """
+    Snapshot every chunk of a collection (text + metadata, incl. stored label scores) to parquet.
+
+    Returns:
+        pd.DataFrame: The exported chunks.
+    """
+    vs = get_vectorstore(collection)
+    got = vs.get(include=["documents", "metadatas"])
+    df = pd.DataFrame([{**(m or {}), "text": doc} for doc, m in zip(got["documents"], got["metadatas"], strict=True)])
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(out_path, index=False)
+    return df
@@ -1,9 +1,122 @@
+import hashlib
+import multiprocessing as mp
+import os
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
 import pandas as pd
+import pyarrow as pa
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
+from risk_analysis_agent.setting import Settings
+from risk_analysis_agent.taxonomy import HYPOTHESIS_TEMPLATE, canonical_labels
+
 SCHEMA = ["issuer", "fiscal_year", "section", "filepath", "text", "chunk_id"]
+CHUNK_CHARS = 1200
+CHUNK_OVERLAP_CHARS = 150
+PARALLEL_MIN_FILES = 64  # below this, process start-up costs more than it saves
+RECORD_BATCH_ROWS = 4096
+
+# per-process splitter of ingestion workers (set by _init_worker)
+_WORKER_SPLITTER: RecursiveCharacterTextSplitter | None = None
+_WORKER_COUNTERS: list[tuple[str, Callable[[str], int]]] = []
+_WORKER_SCHEMA: pa.Schema | None = None
+
+
+@dataclass(frozen=True)
+class ModelWindow:
+    """
+    A model's tokenizer and the number of chunk tokens it actually reads.
+    """
+
+    name: str
+    tokenizer: Any
+    limit: int
+
+    def count(self, text: str) -> int:
+        return len(self.tokenizer(text, add_special_tokens=False)["input_ids"])
+
+
+def load_windows(cfg: Settings | None = None) -> list[ModelWindow]:
+    """
+    Tokenizer windows of the embedder and the zero-shot classifier.
+
+    The embedder reads EMBED_MAX_TOKENS tokens per chunk. The classifier reads
+    ZSL_MAX_LEN tokens for premise + hypothesis, so the longest hypothesis and
+    the special tokens are reserved out of its window.
+
+    Returns:
+        list[ModelWindow]: [embed, zsl] windows.
+    """
+    from transformers import AutoTokenizer
+
+    cfg = cfg or Settings()
+    embed_tok = AutoTokenizer.from_pretrained(cfg.embedding_model, use_fast=True)
+    zsl_tok = AutoTokenizer.from_pretrained(cfg.zsl_model, use_fast=True)
+    reserve = max(len(zsl_tok(HYPOTHESIS_TEMPLATE.format(lab))["input_ids"]) for lab in canonical_labels()) + 2
+    return [
+        ModelWindow("embed", embed_tok, cfg.embed_max_tokens - 2),  # [CLS] ... [SEP]
+        ModelWindow("zsl", zsl_tok, cfg.zsl_max_len - reserve),
+    ]
+
+
+def make_splitter(mode: str | None = None, windows: list[ModelWindow] | None = None, cfg: Settings | None = None) -> RecursiveCharacterTextSplitter:
+    """
+    Build the chunk splitter for a chunking mode.
+
+    Args:
+        mode (str | None): "chars" (1200/150 characters) or "tokens"; defaults to CHUNK_MODE.
+        windows (list[ModelWindow] | None): Tokenizer windows for "tokens" mode; defaults to load_windows().
+        cfg (Settings | None): Settings to read the defaults from.
+
+    Returns:
+        RecursiveCharacterTextSplitter: In "tokens" mode, chunk length is the max token count
+        across every window, so a chunk fits all of them.
+    """
+    cfg = cfg or Settings()
+    mode = (mode or cfg.chunk_mode).lower()
+    if mode == "chars":
+        return RecursiveCharacterTextSplitter(chunk_size=CHUNK_CHARS, chunk_overlap=CHUNK_OVERLAP_CHARS)
+    if mode != "tokens":
+        raise ValueError(f"Unsupported CHUNK_MODE: {mode}")
+    windows = windows or load_windows(cfg)
+    size = cfg.chunk_tokens or min(w.limit for w in windows)
+    overlap = min(cfg.chunk_overlap_tokens, size // 4)
+
+    def _length(text: str) -> int:
+        return max(w.count(text) for w in windows)
+
+    return RecursiveCharacterTextSplitter(chunk_size=size, chunk_overlap=overlap, length_function=_length)
+
+
+def truncation_report(texts: list[str], windows: list[ModelWindow]) -> dict[str, dict[str, float]]:
+    """
+    How much chunk text each model silently drops at its token window.
+
+    Args:
+        texts (list[str]): Chunk texts.
+        windows (list[ModelWindow]): Model windows to check.
+
+    Returns:
+        dict[str, dict[str, float]]: Per window: chunks, truncated chunks, total tokens,
+        tokens lost past the window and the lost share.
+    """
+    report: dict[str, dict[str, float]] = {}
+    for w in windows:
+        counts = [w.count(t) for t in texts]
+        lost = sum(max(0, c - w.limit) for c in counts)
+        total = sum(counts)
+        report[w.name] = {
+            "limit": w.limit,
+            "chunks": len(counts),
+            "truncated_chunks": sum(c > w.limit for c in counts),
+            "tokens": total,
+            "tokens_lost": lost,
+            "lost_pct": 100.0 * lost / total if total else 0.0,
+        }
+    return report
 
 
 def _resolve_dir(path: str | None) -> Path:
@@ -16,33 +129,234 @@ def _read_txt(fp: Path) -> str:
     return fp.read_text(encoding="utf-8", errors="ignore")
 
 
-def ingest_folder(folder: str | None) -> pd.DataFrame:
-    base = _resolve_dir(folder)
-    fps = list(base.rglob("*.txt"))
-    rows = []
+def _read_pages(fp: Path, sha: str | None = None) -> list[tuple[int | None, str]]:
+    """(page number, text) sections of a filing: one per PDF page (cached extraction), one for a TXT file."""
+    if fp.suffix.lower() == ".pdf":
+        from risk_analysis_agent.pdf_text import pdf_pages
+
+        return list(enumerate(pdf_pages(fp, sha=sha), start=1))
+    return [(None, _read_txt(fp))]
+
+
+def content_id(source: str, text: str) -> str:
+    """
+    Stable vector-store id of a chunk: a hash of its source file key and its text.
+
+    Unchanged chunks keep their id across runs (so they are never re-embedded), and
+    the same text in two different filings still gets two ids.
+
+    Args:
+        source (str): "<issuer>/<year>/<file name>" key of the chunk's file.
+        text (str): Chunk text.
+
+    Returns:
+        str: 32-char hex id.
+    """
+    return hashlib.sha256(f"{source}\n{text}".encode()).hexdigest()[:32]
+
+
+def source_key(chunk_id: str) -> str:
+    """
+    File part of a chunk_id ("ACME_CORP/2024/item1a.txt:::3" -> "ACME_CORP/2024/item1a.txt").
+    """
+    return chunk_id.rsplit(":::", 1)[0]
+
+
+def _chunk_file(fp: Path, splitter: RecursiveCharacterTextSplitter, counters: list[tuple[str, Callable[[str], int]]], sha: str | None = None) -> list[dict[str, Any]]:
     year_index = 2
     issuer_index = 3
-    splitter = RecursiveCharacterTextSplitter(chunk_size=1200, chunk_overlap=150)
-    for fp in fps:
-        parts = fp.parts
-        issuer = parts[-3] if len(parts) >= issuer_index else "UNKNOWN_ISSUER"
-        fiscal_year = parts[-2] if len(parts) >= year_index else "UNKNOWN_YEAR"
-        name = fp.name.lower()
-        section = "Item 1A" if ("1a" in name or "risk" in name) else "unknown"
-        chunks = splitter.split_text(_read_txt(fp))
-        for i, ch in enumerate(chunks):
-            rows.append(
-                {
-                    "issuer": issuer,
-                    "fiscal_year": fiscal_year,
-                    "section": section,
-                    "filepath": str(fp),
-                    "text": ch,
-                    "chunk_id": f"{fp.name}:::{i}",
-                }
-            )
-    df = pd.DataFrame(rows, columns=SCHEMA)
-    return df
+    parts = fp.parts
+    issuer = parts[-3] if len(parts) >= issuer_index else "UNKNOWN_ISSUER"
+    fiscal_year = parts[-2] if len(parts) >= year_index else "UNKNOWN_YEAR"
+    name = fp.name.lower()
+    section = "Item 1A" if ("1a" in name or "risk" in name) else "unknown"
+    rows: list[dict[str, Any]] = []
+    # PDF pages are split separately so every chunk cites exactly one page
+    for page, text in _read_pages(fp, sha):
+        for ch in splitter.split_text(text):
+            row: dict[str, Any] = {
+                "issuer": issuer,
+                "fiscal_year": fiscal_year,
+                "section": section,
+                "filepath": str(fp),
+                "text": ch,
+                # issuer/year prefix keeps ids unique when two issuers both ship "item1a.txt"
+                "chunk_id": f"{issuer}/{fiscal_year}/{fp.name}:::{len(rows)}",
+            }
+            if page is not None:
+                row["page"] = page
+            for col, count in counters:
+                row[col] = count(ch)
+            rows.append(row)
+    return rows
+
+
+def _counters(mode: str, windows: list[ModelWindow] | None) -> list[tuple[str, Callable[[str], int]]]:
+    return [(f"n_tokens_{w.name}", w.count) for w in windows or []] if mode == "tokens" else []
+
+
+def chunk_schema(mode: str | None = None, windows: list[ModelWindow] | None = None, pages: bool = False) -> pa.Schema:
+    """
+    Arrow schema of chunk records: SCHEMA strings, a nullable int ``page`` column when PDFs
+    are ingested, and int ``n_tokens_<model>`` columns in "tokens" mode.
+    """
+    mode = (mode or Settings().chunk_mode).lower()
+    fields = [(c, pa.string()) for c in SCHEMA] + ([("page", pa.int64())] if pages else [])
+    return pa.schema(fields + [(col, pa.int64()) for col, _ in _counters(mode, windows)])
+
+
+def _init_worker(mode: str, windows: list[ModelWindow] | None, pages: bool) -> None:
+    """Pool initializer: build the splitter once per process."""
+    global _WORKER_SPLITTER, _WORKER_COUNTERS, _WORKER_SCHEMA  # noqa: PLW0603
+    _WORKER_SPLITTER = make_splitter(mode, windows)
+    _WORKER_COUNTERS = _counters(mode, windows)
+    _WORKER_SCHEMA = chunk_schema(mode, windows, pages)
+
+
+def _chunk_task(files: list[tuple[Path, str | None]]) -> pa.RecordBatch:
+    # Arrow batches cross the process boundary as raw buffers, far cheaper than pickled dicts
+    assert _WORKER_SPLITTER is not None
+    rows = [row for fp, sha in files for row in _chunk_file(fp, _WORKER_SPLITTER, _WORKER_COUNTERS, sha)]
+    return pa.RecordBatch.from_pylist(rows, schema=_WORKER_SCHEMA)
+
+
+def _pool_size(workers: int | None) -> int:
+    workers = Settings().ingest_workers if workers is None else workers
+    return max(1, workers or os.cpu_count() or 1)
+
+
+def _n_workers(workers: int | None, n_files: int) -> int:
+    return 1 if n_files < PARALLEL_MIN_FILES else min(_pool_size(workers), n_files)
+
+
+def _resolve_mode(mode: str | None, windows: list[ModelWindow] | None) -> tuple[str, list[ModelWindow] | None]:
+    cfg = Settings()
+    mode = (mode or cfg.chunk_mode).lower()
+    if mode == "tokens":
+        windows = windows or load_windows(cfg)
+    return mode, windows
+
+
+def iter_record_batches(
+    fps: Iterable[Path],
+    mode: str | None = None,
+    windows: list[ModelWindow] | None = None,
+    workers: int | None = None,
+    *,
+    batch_rows: int = RECORD_BATCH_ROWS,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Stream chunks of the given filings as Arrow record batches, reading and splitting files in a process pool.
+
+    Batches come out in file order, so memory holds only the files in flight.
+
+    Args:
+        fps (Iterable[Path]): Filing paths (<issuer>/<year>/<file>).
+        mode (str | None): Chunking mode, "chars" or "tokens"; defaults to CHUNK_MODE.
+        windows (list[ModelWindow] | None): Tokenizer windows for "tokens" mode.
+        workers (int | None): Worker processes; defaults to INGEST_WORKERS (0 = all cores).
+            Fewer than PARALLEL_MIN_FILES files are split in-process.
+        batch_rows (int): Max rows per batch in-process; workers return one batch per group of files.
+
+    Yields:
+        pa.RecordBatch: Chunk rows with the chunk_schema() columns.
+    """
+    mode, windows = _resolve_mode(mode, windows)
+    fps = list(fps)
+    pdfs = [fp for fp in fps if fp.suffix.lower() == ".pdf"]
+    schema = chunk_schema(mode, windows, pages=bool(pdfs))
+    shas: dict[str, str] = {}
+    if pdfs:  # page-parallel extraction into the cache first; chunking then reads cached text
+        from risk_analysis_agent.pdf_text import extract_pdfs, file_sha256
+
+        # hash each PDF once; extraction and the cache lookup while chunking both reuse it
+        shas = {str(fp): file_sha256(fp) for fp in pdfs}
+        extract_pdfs(pdfs, workers=_pool_size(workers), shas=shas)
+    workers = _n_workers(workers, len(fps))
+    if workers == 1:
+        splitter, counters = make_splitter(mode, windows), _counters(mode, windows)
+        buf: list[dict[str, Any]] = []
+        for fp in fps:
+            buf.extend(_chunk_file(fp, splitter, counters, shas.get(str(fp))))
+            while len(buf) >= batch_rows:
+                yield pa.RecordBatch.from_pylist(buf[:batch_rows], schema=schema)
+                del buf[:batch_rows]
+        if buf:
+            yield pa.RecordBatch.from_pylist(buf, schema=schema)
+        return
+    per_task = max(1, min(32, len(fps) // (workers * 8)))
+    files = [(fp, shas.get(str(fp))) for fp in fps]
+    groups = [files[i : i + per_task] for i in range(0, len(files), per_task)]
+    ctx = mp.get_context("spawn")  # fresh interpreters: safe next to tokenizer/torch thread pools
+    with ctx.Pool(workers, initializer=_init_worker, initargs=(mode, windows, bool(pdfs))) as pool:
+        yield from pool.imap(_chunk_task, groups)
+
+
+def chunks_to_pandas(table: pa.Table) -> pd.DataFrame:
+    """
+    Convert a chunk table to pandas, keeping int columns nullable-integer.
+
+    Without the mapping a ``page`` column with TXT rows (nulls) turns float64, and
+    PDF pages would reach Chroma metadata as ``1.0`` next to NaN.
+    """
+    return table.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+
+
+def iter_chunks(fps: Iterable[Path], mode: str | None = None, windows: list[ModelWindow] | None = None, workers: int | None = None) -> Iterator[dict[str, Any]]:
+    """
+    Stream chunk records of the given filings, one dict per chunk (see iter_record_batches).
+
+    Yields:
+        dict[str, Any]: One record per chunk with SCHEMA keys (plus ``n_tokens_<model>`` in "tokens" mode).
+    """
+    for batch in iter_record_batches(fps, mode, windows, workers):
+        yield from batch.to_pylist()
+
+
+def ingest_files(fps: list[Path], mode: str | None = None, windows: list[ModelWindow] | None = None, workers: int | None = None) -> pd.DataFrame:
+    """
+    Split the given <issuer>/<year>/<file> filings into chunks.
+
+    Args:
+        fps (list[Path]): Filing paths.
+        mode (str | None): Chunking mode, "chars" or "tokens"; defaults to CHUNK_MODE.
+        windows (list[ModelWindow] | None): Tokenizer windows for "tokens" mode.
+        workers (int | None): Worker processes; defaults to INGEST_WORKERS.
+
+    Returns:
+        pd.DataFrame: One row per chunk with SCHEMA columns; PDF inputs add a 1-based
+        ``page`` column and "tokens" mode adds one ``n_tokens_<model>`` column per window.
+    """
+    mode, windows = _resolve_mode(mode, windows)
+    schema = chunk_schema(mode, windows, pages=any(fp.suffix.lower() == ".pdf" for fp in fps))
+    return chunks_to_pandas(pa.Table.from_batches(list(iter_record_batches(fps, mode, windows, workers)), schema=schema))
+
+
+FILING_SUFFIXES = (".txt", ".pdf")
+
+
+def list_filings(folder: str | None) -> list[Path]:
+    """
+    Filing files under a folder (<issuer>/<year>/*.txt|*.pdf), in a stable order.
+    """
+    return sorted(fp for fp in _resolve_dir(folder).rglob("*") if fp.suffix.lower() in FILING_SUFFIXES and fp.is_file())
+
+
+def ingest_folder(folder: str | None, mode: str | None = None, windows: list[ModelWindow] | None = None, workers: int | None = None) -> pd.DataFrame:
+    """
+    Read <issuer>/<year>/*.txt|*.pdf filings under ``folder`` and split them into chunks.
+
+    Args:
+        folder (str | None): Root folder; defaults to data/samples.
+        mode (str | None): Chunking mode, "chars" or "tokens"; defaults to CHUNK_MODE.
+        windows (list[ModelWindow] | None): Tokenizer windows for "tokens" mode.
+        workers (int | None): Worker processes; defaults to INGEST_WORKERS (0 = all cores).
+
+    Returns:
+        pd.DataFrame: One row per chunk with SCHEMA columns; PDF inputs add a 1-based
+        ``page`` column and "tokens" mode adds one ``n_tokens_<model>`` column per window.
+    """
+    return ingest_files(list_filings(folder), mode=mode, windows=windows, workers=workers)
 
 
 def save_parquet(df: pd.DataFrame, out_path: str) -> None:
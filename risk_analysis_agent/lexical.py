@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import gzip
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from filelock import FileLock
+
+from risk_analysis_agent.tagging import SCORE_PREFIX
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60  # reciprocal-rank fusion damping constant
+# "S-K", "10-K", "U.S.", "AT&T" stay whole; their parts are indexed too
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-.&/][a-z0-9]+)*")
+_PARTS = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lower-cased terms of a text: compound terms ("regulation", "s-k") plus their parts of 2+ chars.
+    """
+    terms = []
+    for tok in _TOKEN.findall(text.lower()):
+        terms.append(tok)
+        parts = _PARTS.findall(tok)
+        if len(parts) > 1:
+            terms.extend(p for p in parts if len(p) > 1)
+    return terms
+
+
+def _match_op(value: Any, op: str, target: Any) -> bool:  # noqa: PLR0911
+    if op == "$eq":
+        return bool(value == target)
+    if op == "$ne":
+        return bool(value != target)
+    if op == "$in":
+        return value in target
+    if op == "$nin":
+        return value not in target
+    if value is None:
+        return False
+    if op == "$gt":
+        return bool(value > target)
+    if op == "$gte":
+        return bool(value >= target)
+    if op == "$lt":
+        return bool(value < target)
+    if op == "$lte":
+        return bool(value <= target)
+    raise ValueError(f"Unsupported filter operator: {op}")
+
+
+def matches(meta: dict[str, Any], where: dict[str, Any] | None) -> bool:
+    """
+    Evaluate a Chroma-style ``where`` filter ($and/$or, $eq/$ne/$in/$nin/$gt/$gte/$lt/$lte) against metadata.
+    """
+    if not where:
+        return True
+    for key, cond in where.items():
+        if key == "$and":
+            ok = all(matches(meta, c) for c in cond)
+        elif key == "$or":
+            ok = any(matches(meta, c) for c in cond)
+        elif isinstance(cond, dict):
+            ok = all(_match_op(meta.get(key), op, target) for op, target in cond.items())
+        else:
+            ok = meta.get(key) == cond
+        if not ok:
+            return False
+    return True
+
+
+class LexicalIndex:
+    """
+    BM25 inverted index over chunk texts, stored next to the Chroma data as
+    ``<persist dir>/<collection>.bm25.json.gz``.
+
+    Only term frequencies and the filterable metadata (no texts, no zsl_ scores) are kept;
+    documents are fetched from Chroma by id. Changes since the last load are replayed onto
+    the file's current contents under a file lock on save, so concurrent indexers (CLI and
+    UI) keep each other's postings.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.ids: list[str] = []
+        self.meta: list[dict[str, Any]] = []
+        self.tfs: list[dict[str, int]] = []
+        self._pos: dict[str, int] = {}
+        self._postings: dict[str, dict[int, int]] | None = None
+        self._lengths: list[int] = []
+        self._avg_len = 1.0
+        self._lock = threading.RLock()
+        self._dirty: dict[str, tuple[dict[str, Any], dict[str, int]] | None] = {}  # unsaved adds; None = removed
+        self.mtime_ns = 0
+        if path.exists():
+            self._load()
+
+    # ------------------------ persistence ------------------------------------
+
+    def _load(self) -> None:
+        self.mtime_ns = self.path.stat().st_mtime_ns
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            raw = json.load(f)
+        self.ids, self.meta, self.tfs = raw["ids"], raw["meta"], raw["tfs"]
+        self._pos = {cid: i for i, cid in enumerate(self.ids)}
+        self._postings = None
+
+    def save(self) -> None:
+        """Merge this instance's changes into the file on disk and write it atomically (dropping removed documents)."""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with FileLock(f"{self.path}.lock"):
+                if self.path.exists() and self.path.stat().st_mtime_ns != self.mtime_ns:
+                    self._load()  # another process saved since we loaded: start from its file
+                    self._apply(self._dirty)
+                self._compact()
+                tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+                with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=5) as f:
+                    json.dump({"ids": self.ids, "meta": self.meta, "tfs": self.tfs}, f, separators=(",", ":"))
+                tmp.replace(self.path)
+                self.mtime_ns = self.path.stat().st_mtime_ns
+            self._dirty = {}
+
+    def _compact(self) -> None:
+        keep = [i for i, cid in enumerate(self.ids) if cid]
+        if len(keep) == len(self.ids):
+            return
+        self.ids = [self.ids[i] for i in keep]
+        self.meta = [self.meta[i] for i in keep]
+        self.tfs = [self.tfs[i] for i in keep]
+        self._pos = {cid: i for i, cid in enumerate(self.ids)}
+        self._postings = None
+
+    # ------------------------ updates ----------------------------------------
+
+    def _apply(self, changes: dict[str, tuple[dict[str, Any], dict[str, int]] | None]) -> None:
+        for cid, entry in changes.items():
+            if entry is None:
+                i = self._pos.pop(cid, None)
+                if i is not None:
+                    self.ids[i], self.tfs[i] = "", {}
+            elif cid in self._pos:
+                i = self._pos[cid]
+                self.meta[i], self.tfs[i] = entry
+            else:
+                self._pos[cid] = len(self.ids)
+                self.ids.append(cid)
+                self.meta.append(entry[0])
+                self.tfs.append(entry[1])
+        self._postings = None
+
+    def add(self, ids: list[str], texts: list[str], metas: Iterable[dict[str, Any] | None]) -> None:
+        """
+        Index (or re-index) chunks by id.
+        """
+        changes: dict[str, tuple[dict[str, Any], dict[str, int]] | None] = {}
+        for cid, text, meta in zip(ids, texts, metas, strict=True):
+            changes[cid] = ({k: v for k, v in (meta or {}).items() if not k.startswith(SCORE_PREFIX)}, dict(Counter(tokenize(text))))
+        with self._lock:
+            self._apply(changes)
+            self._dirty.update(changes)
+
+    def remove(self, ids: Iterable[str]) -> None:
+        """
+        Drop chunks by id (compacted on the next save).
+        """
+        changes = dict.fromkeys(ids)
+        with self._lock:
+            self._apply(changes)
+            self._dirty.update(changes)
+
+    def __len__(self) -> int:
+        return len(self._pos)
+
+    # ------------------------ search -----------------------------------------
+
+    def _build(self) -> dict[str, dict[int, int]]:
+        postings: dict[str, dict[int, int]] = {}
+        for i, tf in enumerate(self.tfs):
+            for term, n in tf.items():
+                postings.setdefault(term, {})[i] = n
+        self._lengths = [sum(tf.values()) for tf in self.tfs]
+        self._avg_len = sum(self._lengths) / max(1, len(self._pos)) or 1.0
+        self._postings = postings
+        return postings
+
+    def search(self, query: str, k: int = 10, where: dict[str, Any] | None = None) -> list[tuple[str, float]]:
+        """
+        Top-k chunk ids by BM25 score for a query, restricted to chunks matching ``where``.
+
+        Returns:
+            list[tuple[str, float]]: (chunk id, score), best first.
+        """
+        with self._lock:
+            postings = self._postings if self._postings is not None else self._build()
+            n_docs = len(self._pos)
+            if not n_docs:
+                return []
+            lengths, avg_len = self._lengths, self._avg_len
+            scores: dict[int, float] = {}
+            for term in set(tokenize(query)):
+                docs = postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                for i, n in docs.items():
+                    norm = n * (BM25_K1 + 1) / (n + BM25_K1 * (1 - BM25_B + BM25_B * lengths[i] / avg_len))
+                    scores[i] = scores.get(i, 0.0) + idf * norm
+            ranked = sorted(scores.items(), key=lambda kv: -kv[1])
+            out = []
+            for i, score in ranked:
+                if self.ids[i] and matches(self.meta[i], where):
+                    out.append((self.ids[i], score))
+                    if len(out) >= k:
+                        break
+            return out
+
+
+def rrf_fuse(rankings: list[list[str]], k: int, rrf_k: int = RRF_K) -> list[str]:
+    """
+    Reciprocal-rank fusion of several ranked id lists: score(id) = sum 1 / (rrf_k + rank).
+
+    Returns:
+        list[str]: Top-k fused ids, best first.
+    """
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, cid in enumerate(ranking, start=1):
+            scores[cid] = scores.get(cid, 0.0) + 1.0 / (rrf_k + rank)
+    return [cid for cid, _ in sorted(scores.items(), key=lambda kv: -kv[1])[:k]]
+
+
+_INDEXES: dict[str, LexicalIndex] = {}
+_LOCK = threading.Lock()
+
+
+def get_lexical_index(persist_dir: str, collection: str = "risk_docs") -> LexicalIndex:
+    """
+    Shared LexicalIndex of a collection, reloaded when another process saved a newer file.
+    """
+    path = Path(persist_dir) / f"{collection}.bm25.json.gz"
+    key = str(path)
+    with _LOCK:
+        idx = _INDEXES.get(key)
+        if idx is None or (path.exists() and path.stat().st_mtime_ns != idx.mtime_ns):
+            idx = _INDEXES[key] = LexicalIndex(path)
+        return idx
+
+
+def reset_lexical_indexes() -> None:
+    """Forget every loaded index (they are reloaded from disk on next use)."""
+    with _LOCK:
+        _INDEXES.clear()
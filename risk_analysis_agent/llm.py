@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+from functools import cache, cached_property
 from typing import Any
 
-import httpx
-from langchain_anthropic import ChatAnthropic
-from langchain_ollama import ChatOllama
-from langchain_openai import ChatOpenAI
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
 from pydantic import SecretStr
 
+from . import llm_cache, transport
+from .llm_cache import ResponseCache, cache_keys
 from .setting import Settings
 
 
@@ -34,37 +37,71 @@ def _resolve_ollama_url(cfg: Settings) -> str:
 
 
 def _assert_up(url: str) -> None:
-    r"""
-    Determine the base URL for the Ollama service.
-
-    Priority:
-    1\. Use the user-provided override if available.
-    2\. If not set, use the Docker service name if `chroma_persist_dir` starts with `/data/`.
-    3\. Otherwise, default to localhost.
+    """
+    Check that the Ollama server at ``url`` is up (cached for LLM_HEALTH_TTL_S, see transport.check_health).
 
     Args:
-        cfg (Settings): The settings object containing configuration.
+        url (str): Ollama base URL.
 
-    Returns:
-        str: The resolved Ollama base URL.
+    Raises:
+        httpx.HTTPError: If the server is unreachable or answers with an error.
     """
-    with httpx.Client(timeout=2.0) as c:
-        r = c.get(url.rstrip("/") + "/api/version")
-        r.raise_for_status()
+    transport.check_health(url)
+
+
+def _cache_for(provider: str, model: str, temperature: float, enabled: bool | None) -> ResponseCache | bool:
+    # False (not None) so a globally configured LangChain cache is bypassed too
+    return llm_cache.get_response_cache(provider, model, temperature, enabled) or False
+
+
+@cache
+def _pooled_chat_anthropic() -> type:
+    """
+    ChatAnthropic on the shared pooled transport (the stock class builds a private client per
+    instance). Built on first use: langchain_anthropic imports transformers, which takes seconds.
+    """
+    import anthropic
+    from langchain_anthropic import ChatAnthropic
+
+    class PooledChatAnthropic(ChatAnthropic):
+        @cached_property
+        def _client(self) -> anthropic.Client:
+            return anthropic.Client(**self._client_params, http_client=transport.http_client("claude"))
 
+        @cached_property
+        def _async_client(self) -> anthropic.AsyncClient:
+            return anthropic.AsyncClient(**self._client_params, http_client=transport.async_http_client("claude"))
 
-def get_llm(
-    provider: str | None = None, model: str | None = None, temperature: float | None = None, openai_api_key: str | None = None, anthropic_api_key: str | None = None
+    return PooledChatAnthropic
+
+
+def get_llm(  # noqa: PLR0913
+    provider: str | None = None,
+    model: str | None = None,
+    temperature: float | None = None,
+    openai_api_key: str | None = None,
+    anthropic_api_key: str | None = None,
+    *,
+    cache: bool | None = None,
 ) -> Any:
     """
     Initialize and return an LLM client (Ollama, OpenAI, or Claude/Anthropic).
 
+    Responses are cached on disk (see llm_cache) unless caching is off, ``cache`` is False
+    or the temperature is above LLM_CACHE_MAX_TEMPERATURE. With LLM_CACHE_MODE=replay the
+    client answers from the cache only and the Ollama liveness check is skipped.
+
+    Every client talks through its provider's shared keep-alive pool (see transport):
+    bounded timeouts, retries with backoff and a circuit breaker; the SDKs' own retries are
+    turned off so attempts do not multiply. Provider packages are imported on first use.
+
     Args:
         provider (str | None): The LLM provider to use.
         model (str | None): The model name to use.
         temperature (float | None): Sampling temperature.
         openai_api_key (str | None): API key for OpenAI.
         anthropic_api_key (str | None): API key for Anthropic.
+        cache (bool | None): False bypasses the response cache; None follows LLM_CACHE_MODE.
 
     Returns:
         LLM instance appropriate for the provider.
@@ -78,8 +115,19 @@ def get_llm(
         model = cfg.llm_model if model is None else model
         temperature = cfg.llm_temperature if temperature is None else temperature
         url = _resolve_ollama_url(cfg)
-        _assert_up(url)
-        return ChatOllama(model=model, temperature=temperature, base_url=url)
+        if llm_cache.LLM_CACHE_MODE != "replay":
+            _assert_up(url)
+        from langchain_ollama import ChatOllama
+
+        return ChatOllama(
+            model=model,
+            temperature=temperature,
+            base_url=url,
+            cache=_cache_for(provider, model, temperature, cache),
+            client_kwargs={"timeout": transport.timeout()},
+            sync_client_kwargs={"transport": transport.sync_transport(provider)},
+            async_client_kwargs={"transport": transport.async_transport(provider)},
+        )
 
     elif provider == "openai":
         api_key = cfg.openai_api_key if openai_api_key is None else openai_api_key
@@ -87,7 +135,18 @@ def get_llm(
             raise ValueError("OPENAI_API_KEY must be set for LLM_PROVIDER=openai")
         model = model or cfg.openai_model
         temperature = cfg.llm_temperature if temperature is None else temperature
-        return ChatOpenAI(api_key=SecretStr(api_key), model=model, temperature=temperature)
+        from langchain_openai import ChatOpenAI
+
+        return ChatOpenAI(
+            api_key=SecretStr(api_key),
+            model=model,
+            temperature=temperature,
+            cache=_cache_for(provider, model, temperature, cache),
+            timeout=transport.timeout(),
+            max_retries=0,
+            http_client=transport.http_client(provider),
+            http_async_client=transport.async_http_client(provider),
+        )
 
     elif provider in ("claude", "anthropic"):
         api_key = cfg.anthropic_api_key if anthropic_api_key is None else anthropic_api_key
@@ -95,7 +154,130 @@ def get_llm(
             raise ValueError("ANTHROPIC_API_KEY must be set for LLM_PROVIDER=claude")
         model = model or cfg.anthropic_model
         temperature = cfg.llm_temperature if temperature is None else temperature
-        return ChatAnthropic(api_key=SecretStr(api_key), model_name=model, temperature=temperature, timeout=10000, stop=None)
+        return _pooled_chat_anthropic()(
+            api_key=SecretStr(api_key),
+            model_name=model,
+            temperature=temperature,
+            timeout=transport.LLM_TIMEOUT_S,
+            max_retries=0,
+            stop=None,
+            cache=_cache_for(provider, model, temperature, cache),
+        )
 
     else:
         raise ValueError(f"Unsupported LLM_PROVIDER: {provider}")
+
+
+# ---- Streaming / async helpers -----------------------------------------------
+# All three LangChain chat clients stream natively (Ollama NDJSON, OpenAI and Anthropic SSE)
+# through .stream/.astream; these helpers yield plain text so callers need not care which.
+
+
+def _text(chunk: Any) -> str:
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, list):  # Anthropic content blocks
+        return "".join(b.get("text", "") if isinstance(b, dict) else str(b) for b in content)
+    return str(content)
+
+
+def _cached(llm: Any, prompt: str, use_cache: bool) -> tuple[ResponseCache | None, tuple[str, str], str | None]:
+    # LangChain's .stream skips the client cache; look it up (and fill it) here instead
+    cache = getattr(llm, "cache", None)
+    if not isinstance(cache, ResponseCache):
+        return None, ("", ""), None
+    keys = cache_keys(llm, prompt)
+    hit = cache.lookup(*keys) if use_cache else None
+    return cache, keys, (_text(hit[0].message) if hit else None)
+
+
+def _remember(cache: ResponseCache | None, keys: tuple[str, str], pieces: list[str]) -> None:
+    if cache is not None:
+        cache.update(*keys, [ChatGeneration(message=AIMessage(content="".join(pieces)))])
+
+
+def stream_text(llm: Any, prompt: str, use_cache: bool = True) -> Iterator[str]:
+    """
+    Yield the answer to a prompt piece by piece as the provider sends it.
+
+    A cached answer is yielded at once; a streamed one is stored when complete, so the
+    next identical prompt skips the model. Clients without ``stream`` (e.g. test doubles)
+    yield their whole answer at once.
+
+    Args:
+        llm: Client returned by get_llm.
+        prompt (str): Prompt text.
+        use_cache (bool): False regenerates the answer (and refreshes the cached one).
+
+    Yields:
+        str: Text deltas.
+    """
+    if not hasattr(llm, "stream"):
+        yield _text(llm.invoke(prompt))
+        return
+    cache, keys, hit = _cached(llm, prompt, use_cache)
+    if hit is not None:
+        yield hit
+        return
+    pieces = []
+    for chunk in llm.stream(prompt):
+        if piece := _text(chunk):
+            pieces.append(piece)
+            yield piece
+    _remember(cache, keys, pieces)
+
+
+async def astream_text(llm: Any, prompt: str, use_cache: bool = True) -> AsyncIterator[str]:
+    """
+    Async form of stream_text.
+    """
+    if not hasattr(llm, "astream"):
+        for piece in await asyncio.to_thread(lambda: list(stream_text(llm, prompt, use_cache))):
+            yield piece
+        return
+    cache, keys, hit = _cached(llm, prompt, use_cache)
+    if hit is not None:
+        yield hit
+        return
+    pieces = []
+    async for chunk in llm.astream(prompt):
+        if piece := _text(chunk):
+            pieces.append(piece)
+            yield piece
+    _remember(cache, keys, pieces)
+
+
+async def ainvoke_text(llm: Any, prompt: str) -> str:
+    """
+    Full answer to a prompt without blocking the event loop.
+    """
+    if hasattr(llm, "ainvoke"):
+        return _text(await llm.ainvoke(prompt))
+    return _text(await asyncio.to_thread(llm.invoke, prompt))
+
+
+async def agenerate_many(llm: Any, prompts: list[str], concurrency: int = 4) -> list[str]:
+    """
+    Answers to many prompts with at most ``concurrency`` requests in flight.
+
+    Args:
+        llm: Client returned by get_llm.
+        prompts (list[str]): Prompts.
+        concurrency (int): Maximum concurrent requests.
+
+    Returns:
+        list[str]: Answers, in prompt order.
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _one(prompt: str) -> str:
+        async with sem:
+            return await ainvoke_text(llm, prompt)
+
+    return list(await asyncio.gather(*(_one(p) for p in prompts)))
+
+
+def generate_many(llm: Any, prompts: list[str], concurrency: int = 4) -> list[str]:
+    """
+    Blocking wrapper of agenerate_many for scripts and batch jobs.
+    """
+    return transport.run(agenerate_many(llm, prompts, concurrency))
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_responses.sqlite")  # empty string disables the cache
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "64"))
+LLM_CACHE_TTL_S = float(os.getenv("LLM_CACHE_TTL_S", str(7 * 24 * 3600)))  # 0 = entries never expire
+LLM_CACHE_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.3"))  # hotter calls are not cached
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "on").lower()  # on | off | replay (cache only, misses raise)
+
+
+class CacheMissError(LookupError):
+    """Raised in replay mode when a prompt has no cached response."""
+
+
+def cache_namespace(provider: str, model: str, temperature: float) -> str:
+    """
+    Returns the key prefix of a client. Set explicitly because some clients (ChatOllama)
+    leave model and temperature out of LangChain's ``llm_string``.
+    """
+    return json.dumps([provider, model, round(float(temperature), 4)])
+
+
+def response_key(namespace: str, prompt: str, llm_string: str) -> str:
+    """
+    Returns the cache key of a call: sha256 over the client namespace (provider, model,
+    temperature), LangChain's serialised call parameters (stop words, ...) and the prompt.
+    """
+    return hashlib.sha256(f"{namespace}\n{llm_string}\n{prompt}".encode()).hexdigest()
+
+
+class ResponseCache(BaseCache):
+    """
+    LangChain cache of LLM generations in SQLite, set as ``cache=`` on the clients
+    built by get_llm so every ``invoke``/``ainvoke`` consults it first.
+
+    Entries expire after ``ttl_s`` seconds; once the table outgrows ``max_bytes`` the
+    least-recently-used rows are evicted. With ``replay=True`` a miss raises
+    CacheMissError instead of calling the model, so tests and demos can run offline.
+    Clients sharing a file are kept apart by ``namespace`` (see cache_namespace).
+    """
+
+    def __init__(self, path: str | None = None, namespace: str = "", max_bytes: int | None = None, ttl_s: float | None = None, replay: bool = False):
+        self.path = path or LLM_CACHE_PATH
+        self.namespace = namespace
+        self.max_bytes = int(LLM_CACHE_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        self.ttl_s = LLM_CACHE_TTL_S if ttl_s is None else ttl_s
+        self.replay = replay
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, nbytes INTEGER NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS llm_responses_last_used ON llm_responses(last_used)")
+        self._db.commit()
+
+    # ------------------------ internal helpers -------------------------------
+
+    def _disk_bytes(self) -> int:
+        return int(self._db.execute("SELECT COALESCE(SUM(nbytes), 0) FROM llm_responses").fetchone()[0])
+
+    def _evict_to(self, target: int) -> int:
+        """Delete expired rows, then least-recently-used rows until the table holds at most ``target`` bytes (0 = no limit)."""
+        removed = 0
+        if self.ttl_s > 0:
+            removed += self._db.execute("DELETE FROM llm_responses WHERE created < ?", (time.time() - self.ttl_s,)).rowcount
+        excess = self._disk_bytes() - target if target > 0 else 0
+        doomed: list[tuple[str]] = []
+        freed = 0
+        if excess > 0:
+            for key, nbytes in self._db.execute("SELECT key, nbytes FROM llm_responses ORDER BY last_used ASC"):
+                if freed >= excess:
+                    break
+                doomed.append((key,))
+                freed += nbytes
+        self._db.executemany("DELETE FROM llm_responses WHERE key = ?", doomed)
+        self._db.commit()
+        return removed + len(doomed)
+
+    # ------------------------ BaseCache --------------------------------------
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        key = response_key(self.namespace, prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, created FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_s > 0 and row[1] < now - self.ttl_s:
+                row = None
+            if row is not None:
+                self._db.execute("UPDATE llm_responses SET last_used = ? WHERE key = ?", (now, key))
+                self._db.commit()
+                self.hits += 1
+            else:
+                self.misses += 1
+        if row is None:
+            if self.replay:
+                raise CacheMissError(f"No cached LLM response for prompt {prompt[:80]!r} (LLM_CACHE_MODE=replay)")
+            return None
+        return [ChatGeneration(message=AIMessage(content=g["content"], response_metadata=g.get("metadata") or {}), generation_info=g.get("info")) for g in json.loads(row[0])]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        # chat clients only: keep the answer content and its metadata, as compact JSON
+        raw = json.dumps(
+            [{"content": g.message.content, "metadata": g.message.response_metadata, "info": g.generation_info} for g in return_val if isinstance(g, ChatGeneration)],
+            default=str,
+            separators=(",", ":"),
+        )
+        key = response_key(self.namespace, prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, value, nbytes, created, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, raw, len(key) + len(raw), now, now),
+            )
+            self._db.commit()
+            if self.max_bytes > 0 and self._disk_bytes() > self.max_bytes:
+                # leave some headroom so we do not evict on every insert
+                self._evict_to(int(self.max_bytes * 0.9))
+
+    def clear(self, **kwargs: Any) -> None:
+        """Drop every cached response."""
+        with self._lock:
+            self._db.execute("DELETE FROM llm_responses")
+            self._db.commit()
+            self._db.execute("VACUUM")
+
+    # ------------------------ maintenance ------------------------------------
+
+    def prune(self, max_bytes: int | None = None) -> int:
+        """
+        Drop expired entries, then evict least-recently-used ones until the table fits in ``max_bytes``.
+
+        Args:
+            max_bytes (int | None): Size to prune to; defaults to the cache's ``max_bytes``. As there,
+                0 means unlimited and only expired entries are dropped (``clear`` drops everything).
+
+        Returns:
+            int: Number of entries removed.
+        """
+        with self._lock:
+            return self._evict_to(self.max_bytes if max_bytes is None else max_bytes)
+
+    def stats(self) -> dict[str, float]:
+        """
+        Returns hit/miss counters for this process and the current size of the table.
+        """
+        with self._lock:
+            entries = int(self._db.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0])
+            nbytes = self._disk_bytes()
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0, "entries": entries, "bytes": nbytes}
+
+    def close(self) -> None:
+        """Close the SQLite connection."""
+        with self._lock:
+            self._db.close()
+
+
+_CACHES: dict[tuple[str, str, bool], ResponseCache] = {}
+_LOCK = threading.Lock()
+
+
+def get_response_cache(provider: str, model: str, temperature: float, enabled: bool | None = None) -> ResponseCache | None:
+    """
+    Shared ResponseCache for a client, or None when caching does not apply.
+
+    Caching is skipped when it is disabled (LLM_CACHE_MODE=off, empty LLM_CACHE_PATH or
+    ``enabled=False``) or when ``temperature`` exceeds LLM_CACHE_MAX_TEMPERATURE, since a
+    replayed answer would hide the sampling the caller asked for. Replay mode always caches.
+
+    Args:
+        provider (str): LLM provider ("ollama", "openai", "claude").
+        model (str): Model name.
+        temperature (float): Sampling temperature of the client.
+        enabled (bool | None): Explicit per-client switch; None follows LLM_CACHE_MODE.
+
+    Returns:
+        ResponseCache | None: The cache to pass as ``cache=`` to the client.
+    """
+    replay = LLM_CACHE_MODE == "replay"
+    if not LLM_CACHE_PATH or enabled is False or (enabled is None and LLM_CACHE_MODE == "off"):
+        return None
+    if temperature > LLM_CACHE_MAX_TEMPERATURE and not replay:
+        return None
+    namespace = cache_namespace(provider, model, temperature)
+    with _LOCK:
+        key = (LLM_CACHE_PATH, namespace, replay)
+        if key not in _CACHES:
+            _CACHES[key] = ResponseCache(LLM_CACHE_PATH, namespace=namespace, replay=replay)
+        return _CACHES[key]
+
+
+def close_response_caches() -> None:
+    """Close every cache opened by get_response_cache."""
+    with _LOCK:
+        for cache in _CACHES.values():
+            cache.close()
+        _CACHES.clear()
+
+
+def cache_keys(llm: Any, prompt: str | Sequence[Any]) -> tuple[str, str]:
+    """
+    Returns the (prompt, llm_string) pair ``BaseChatModel.invoke`` uses for a prompt, so
+    streamed answers share cache entries with invoked ones.
+    """
+    return dumps(llm._convert_input(prompt).to_messages()), llm._get_llm_string()
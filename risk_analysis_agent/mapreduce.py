@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Any
+
+from langchain_core.documents import Document
+
+from risk_analysis_agent import transport
+from risk_analysis_agent.context import build_context, cite_id, estimate_tokens
+from risk_analysis_agent.llm import agenerate_many, get_llm
+from risk_analysis_agent.prompts import MAP_PROMPT, REDUCE_PROMPT
+from risk_analysis_agent.retriever import fiscal_year_filter, get_vectorstore
+from risk_analysis_agent.setting import Settings
+
+
+def _position(d: Any) -> tuple[str, int]:
+    # "ACME_CORP/2024/item1a.txt:::12" -> ("ACME_CORP/2024/item1a.txt", 12): file order, then chunk order
+    src, _, idx = cite_id(d).rpartition(":::")
+    return (src, int(idx)) if src and idx.isdigit() else (cite_id(d), 0)
+
+
+def filing_chunks(issuer: str, year: int | str, collection: str = "risk_docs", batch: int = 5000) -> list[Document]:
+    """
+    Every indexed chunk of an issuer/year, in filing order (file, then position in the file).
+
+    Args:
+        issuer (str): Issuer (folder name).
+        year (int | str): Fiscal year.
+        collection (str): The name of the Chroma collection. Defaults to "risk_docs".
+        batch (int): Chunks read from Chroma per call.
+
+    Returns:
+        list[Document]: The filing's chunks.
+    """
+    vs = get_vectorstore(collection)
+    where = {"$and": [{"issuer": issuer}, fiscal_year_filter(year)]}
+    docs: list[Document] = []
+    offset = 0
+    while True:
+        got = vs.get(where=where, include=["documents", "metadatas"], limit=batch, offset=offset)
+        if not got["ids"]:
+            break
+        docs.extend(Document(page_content=text, metadata=meta or {}, id=cid) for cid, text, meta in zip(got["ids"], got["documents"], got["metadatas"], strict=True))
+        offset += len(got["ids"])
+    return sorted(docs, key=_position)
+
+
+def group_chunks(docs: list[Any], max_tokens: int) -> list[list[Any]]:
+    """
+    Splits chunks, in order, into consecutive groups of at most ``max_tokens`` (a larger chunk forms its own group).
+    """
+    groups: list[list[Any]] = []
+    current: list[Any] = []
+    used = 0
+    for d in docs:
+        cost = estimate_tokens(f"[{cite_id(d)}] {d.page_content}")
+        if current and used + cost > max_tokens:
+            groups.append(current)
+            current, used = [], 0
+        current.append(d)
+        used += cost
+    if current:
+        groups.append(current)
+    return groups
+
+
+@dataclass
+class MapReduceSummary:
+    """
+    Result of a map-reduce summary, with the work it took.
+    """
+
+    summary: str = ""
+    cited: list[str] = field(default_factory=list)  # chunk_ids the final summary cites, in filing order
+    chunks: int = 0
+    groups: int = 0  # map calls
+    levels: int = 0  # reduce rounds
+    llm_calls: int = 0
+
+
+async def amap_reduce(  # noqa: PLR0913
+    llm: Any,
+    docs: list[Any],
+    issuer: str,
+    year: int | str,
+    *,
+    concurrency: int | None = None,
+    group_tokens: int | None = None,
+    fan_in: int | None = None,
+) -> MapReduceSummary:
+    """
+    Summarizes a whole filing: map, then reduce hierarchically.
+
+    The chunks are split into groups of ``group_tokens``, each summarized on its own (MAP_PROMPT,
+    with ``[chunk_id]`` blocks); the partial summaries are then merged ``fan_in`` at a time
+    (REDUCE_PROMPT, told to carry the cited chunk_ids over) until one remains. Every round runs
+    with ``concurrency`` requests in flight, so wall-clock grows with the number of rounds
+    (logarithmic in filing length) rather than with the number of chunks.
+
+    Args:
+        llm: Client returned by get_llm.
+        docs (list[Document]): The filing's chunks, in filing order (see filing_chunks).
+        issuer (str): Issuer, for the prompts.
+        year (int | str): Fiscal year, for the prompts.
+        concurrency (int | None): Concurrent LLM calls; defaults to SUMMARIZE_CONCURRENCY.
+        group_tokens (int | None): Context tokens per map call; defaults to MAPREDUCE_GROUP_TOKENS.
+        fan_in (int | None): Partial summaries per reduce call (at least 2); defaults to MAPREDUCE_FAN_IN.
+
+    Returns:
+        MapReduceSummary: Final summary, cited chunk_ids and call counts.
+    """
+    cfg = Settings()
+    concurrency = concurrency or cfg.summarize_concurrency
+    fan_in = max(2, fan_in or cfg.mapreduce_fan_in)
+    groups = group_chunks(docs, group_tokens or cfg.mapreduce_group_tokens)
+    out = MapReduceSummary(chunks=len(docs), groups=len(groups))
+    if not groups:
+        return out
+
+    # unlimited budget: a group already fits; build_context only drops repeats and overlap
+    prompts = [MAP_PROMPT.format(issuer=issuer, year=year, context=build_context(g, budget=sys.maxsize).text) for g in groups]
+    partials = await agenerate_many(llm, prompts, concurrency)
+    out.llm_calls = len(prompts)
+    while len(partials) > 1:
+        batches = [partials[i : i + fan_in] for i in range(0, len(partials), fan_in)]
+        merge = [i for i, b in enumerate(batches) if len(b) > 1]  # a lone leftover moves up unchanged
+        prompts = [REDUCE_PROMPT.format(issuer=issuer, year=year, context="\n\n".join(f"Part {j + 1}:\n{p}" for j, p in enumerate(batches[i]))) for i in merge]
+        partials = [b[0] for b in batches]
+        for i, merged in zip(merge, await agenerate_many(llm, prompts, concurrency), strict=True):
+            partials[i] = merged
+        out.llm_calls += len(prompts)
+        out.levels += 1
+
+    out.summary = partials[0]
+    out.cited = [cid for cid in dict.fromkeys(cite_id(d) for d in docs) if re.search(re.escape(cid) + r"(?!\d)", out.summary)]
+    return out
+
+
+def summarize_filing(issuer: str, year: int | str, concurrency: int | None = None, collection: str = "risk_docs", llm: Any | None = None) -> dict:
+    """
+    Risk summary of an entire issuer/year filing (not only the top-k retrieved chunks), by map-reduce.
+
+    Args:
+        issuer (str): Issuer (folder name).
+        year (int | str): Fiscal year.
+        concurrency (int | None): Concurrent LLM calls; defaults to SUMMARIZE_CONCURRENCY.
+        collection (str): The name of the Chroma collection. Defaults to "risk_docs".
+        llm: Client to use; defaults to get_llm().
+
+    Returns:
+        dict: ``issuer``, ``year``, ``summary``, ``sources`` (cited chunks: path, chunk_id, page)
+        and ``stats`` (chunks, groups, levels, llm_calls).
+    """
+    docs = filing_chunks(issuer, year, collection)
+    res = transport.run(amap_reduce(llm or get_llm(), docs, issuer, year, concurrency=concurrency))
+    by_id = {cite_id(d): d for d in docs}
+    return {
+        "issuer": issuer,
+        "year": year,
+        "summary": res.summary,
+        "sources": [{"path": by_id[cid].metadata.get("filepath"), "chunk_id": cid, "page": by_id[cid].metadata.get("page")} for cid in res.cited],
+        "stats": {"chunks": res.chunks, "groups": res.groups, "levels": res.levels, "llm_calls": res.llm_calls},
+    }
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+def _unit_rows(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=-1, keepdims=True)
+    return x / np.where(norms == 0, 1.0, norms)
+
+
+def mmr_select(query: np.ndarray, candidates: np.ndarray, k: int, lambda_mult: float = 0.5) -> list[int]:
+    """
+    Maximal marginal relevance over cosine similarities, as matrix operations.
+
+    The candidate-candidate similarity matrix is computed once and each step only updates
+    a running "max similarity to the selected set" vector, instead of recomputing the
+    similarity to every selected row per candidate.
+
+    Args:
+        query (np.ndarray): Query embedding, shape (dim,).
+        candidates (np.ndarray): Candidate embeddings, shape (n, dim).
+        k (int): Number of candidates to select.
+        lambda_mult (float): 1 = pure relevance, 0 = maximum diversity.
+
+    Returns:
+        list[int]: Indices of the selected candidates, in selection order.
+    """
+    n = min(k, len(candidates))
+    if n <= 0:
+        return []
+    cands = _unit_rows(np.asarray(candidates, dtype=np.float32))
+    relevance = cands @ _unit_rows(np.asarray(query, dtype=np.float32))
+    pairwise = cands @ cands.T
+    first = int(np.argmax(relevance))
+    selected = [first]
+    redundancy = pairwise[first].copy()
+    taken = np.zeros(len(cands), dtype=bool)
+    taken[first] = True
+    while len(selected) < n:
+        score = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        score[taken] = -np.inf
+        best = int(np.argmax(score))
+        selected.append(best)
+        taken[best] = True
+        np.maximum(redundancy, pairwise[best], out=redundancy)
+    return selected
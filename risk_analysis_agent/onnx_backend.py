@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import torch
+
+ONNX_DIR = os.getenv("ZSL_ONNX_DIR", ".cache/onnx")
+OPSET = 17
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def _slug(model_id: str) -> str:
+    """Filesystem-safe, collision-free folder name for a model id or local path."""
+    short = hashlib.sha256(model_id.encode("utf-8")).hexdigest()[:8]
+    return f"{re.sub(r'[^A-Za-z0-9_.-]+', '__', model_id).strip('_')[-60:]}-{short}"
+
+
+@contextmanager
+def _staged(dst: Path) -> Iterator[Path]:
+    """
+    Yield a fresh temp path next to ``dst`` and publish it over ``dst`` atomically on success.
+    Each writer gets its own temp file, so concurrent exports (bulk workers, server + CLI) never clobber each other.
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(dir=dst.parent, prefix=f".{dst.stem}-", suffix=".tmp")
+    os.close(fd)
+    tmp = Path(name)
+    try:
+        yield tmp
+        tmp.replace(dst)  # a crashed or concurrent export is never seen half-written
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def export_onnx(model_id: str, out_path: Path) -> Path:
+    """
+    Export a Hugging Face sequence-classification model to ONNX (fp32).
+
+    Args:
+        model_id (str): HF model id or local path.
+        out_path (Path): Target .onnx file.
+
+    Returns:
+        Path: The written file.
+    """
+    import torch
+    from transformers import AutoModelForSequenceClassification
+
+    class _LogitsOnly(torch.nn.Module):
+        """Wraps a HF model so tracing sees plain tensors in and a single logits tensor out."""
+
+        def __init__(self, mdl: torch.nn.Module):
+            super().__init__()
+            self.mdl = mdl
+
+        def forward(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+            return self.mdl(input_ids=input_ids, attention_mask=attention_mask, use_cache=False, return_dict=True).logits
+
+    mdl = AutoModelForSequenceClassification.from_pretrained(model_id).eval()
+    bos, eos = mdl.config.bos_token_id or 0, mdl.config.eos_token_id or 2
+    dummy = torch.tensor([[bos, bos, eos, eos, bos, eos]])  # "<s> A </s></s> B </s>" shaped premise/hypothesis pair
+    with _staged(out_path) as tmp, torch.inference_mode():
+        torch.onnx.export(
+            _LogitsOnly(mdl),
+            (dummy, torch.ones_like(dummy)),
+            str(tmp),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={"input_ids": {0: "batch", 1: "seq"}, "attention_mask": {0: "batch", 1: "seq"}, "logits": {0: "batch"}},
+            opset_version=OPSET,
+            dynamo=False,
+        )
+    return out_path
+
+
+def quantize_int8(src: Path, dst: Path) -> Path:
+    """
+    Apply ONNX Runtime dynamic int8 quantization (weights int8, activations quantized on the fly).
+
+    Args:
+        src (Path): fp32 .onnx file.
+        dst (Path): Target quantized .onnx file.
+
+    Returns:
+        Path: The written file.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    with _staged(dst) as tmp:
+        quantize_dynamic(str(src), str(tmp), weight_type=QuantType.QInt8)
+    return dst
+
+
+def ensure_onnx(model_id: str, quantized: bool, cache_dir: str | None = None) -> Path:
+    """
+    Return the cached ONNX file for a model, exporting (and quantizing) it on first use.
+
+    Args:
+        model_id (str): HF model id or local path.
+        quantized (bool): Whether to return the int8 variant.
+        cache_dir (str | None): Root of the export cache; defaults to ZSL_ONNX_DIR.
+
+    Returns:
+        Path: Path to model.onnx or model-int8.onnx.
+    """
+    root = Path(cache_dir or ONNX_DIR) / _slug(model_id)
+    fp32 = root / "model.onnx"
+    if not fp32.exists():
+        export_onnx(model_id, fp32)
+    if not quantized:
+        return fp32
+    int8 = root / "model-int8.onnx"
+    if not int8.exists():
+        quantize_int8(fp32, int8)
+    return int8
+
+
+class OnnxSequenceClassifier:
+    """
+    Minimal stand-in for ``AutoModelForSequenceClassification`` backed by ONNX Runtime.
+    Called with ``input_ids``/``attention_mask`` tensors, returns an object with ``.logits``.
+    """
+
+    def __init__(self, path: Path, num_threads: int | None = None):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:  # pragma: no cover - depends on the environment
+            raise ImportError('ZSL_BACKEND=onnx requires the onnx extra: `pip install -e ".[onnx]"` (onnx + onnxruntime)') from e
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            opts.intra_op_num_threads = num_threads
+        self.path = path
+        self.session = ort.InferenceSession(str(path), sess_options=opts, providers=["CPUExecutionProvider"])
+
+    def __call__(self, input_ids: torch.Tensor, attention_mask: torch.Tensor, **_: Any) -> SimpleNamespace:
+        import torch
+
+        feeds = {"input_ids": input_ids.cpu().numpy(), "attention_mask": attention_mask.cpu().numpy()}
+        (logits,) = self.session.run(["logits"], feeds)
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+def load_onnx_model(model_id: str, backend: str, num_threads: int | None = None, cache_dir: str | None = None) -> OnnxSequenceClassifier:
+    """
+    Build the ONNX Runtime model for ``backend`` ("onnx" or "onnx-int8"), exporting it once if needed.
+    """
+    if backend not in ("onnx", "onnx-int8"):
+        raise ValueError(f"Unsupported ZSL_BACKEND for ONNX Runtime: {backend}")
+    return OnnxSequenceClassifier(ensure_onnx(model_id, quantized=backend == "onnx-int8", cache_dir=cache_dir), num_threads=num_threads)
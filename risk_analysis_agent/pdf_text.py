@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", ".cache/pdf_text")
+PAGES_PER_TASK = 16
+
+
+def file_sha256(fp: Path) -> str:
+    """
+    SHA-256 of a file's bytes, read in 1 MiB blocks.
+    """
+    h = hashlib.sha256()
+    with fp.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _reader(fp: Path) -> Any:
+    try:
+        from pypdf import PdfReader
+    except ImportError as e:  # pragma: no cover - depends on the environment
+        raise ImportError("PDF ingestion requires `pip install pypdf`") from e
+    return PdfReader(str(fp))
+
+
+def _extract_range(task: tuple[str, int, int]) -> tuple[str, int, list[str]]:
+    path, start, end = task
+    pages = _reader(Path(path)).pages
+    return path, start, [(pages[i].extract_text() or "") for i in range(start, end)]
+
+
+class PdfTextCache:
+    """
+    Extracted page texts on disk, one JSON list per PDF keyed by the file's SHA-256,
+    so re-ingesting an unchanged PDF (even renamed or moved) skips extraction.
+    """
+
+    def __init__(self, root: str | None = None):
+        self.root = Path(root or PDF_CACHE_DIR)
+
+    def _path(self, sha: str) -> Path:
+        return self.root / sha[:2] / f"{sha}.json"
+
+    def has(self, sha: str) -> bool:
+        return self._path(sha).exists()
+
+    def get(self, sha: str) -> list[str] | None:
+        p = self._path(sha)
+        return list(json.loads(p.read_text(encoding="utf-8"))) if p.exists() else None
+
+    def put(self, sha: str, pages: list[str]) -> None:
+        p = self._path(sha)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        # a private temp file per writer: two ingests of the same PDF never clobber each other's staging file
+        fd, name = tempfile.mkstemp(dir=p.parent, prefix=f".{sha}-", suffix=".tmp")
+        tmp = Path(name)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(pages, f, ensure_ascii=False)
+            tmp.replace(p)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+
+def extract_pdfs(fps: list[Path], workers: int = 1, cache: PdfTextCache | None = None, shas: dict[str, str] | None = None) -> dict[str, float]:
+    """
+    Extract every uncached PDF into the cache, splitting pages of all files across worker processes.
+
+    Pages are handed out in ranges of PAGES_PER_TASK, so one large prospectus keeps
+    every worker busy instead of one.
+
+    Args:
+        fps (list[Path]): PDF files.
+        workers (int): Worker processes; 1 extracts in-process.
+        cache (PdfTextCache | None): Extraction cache; defaults to PDF_CACHE_DIR.
+        shas (dict[str, str] | None): Already computed SHA-256 per path, so those files are not read again.
+
+    Returns:
+        dict[str, float]: files, cached (skipped) files, pages extracted, seconds and pages_per_sec.
+    """
+    cache = cache or PdfTextCache()
+    t0 = time.perf_counter()
+    todo: dict[str, tuple[str, int]] = {}
+    shas = shas or {}
+    for fp in fps:
+        sha = shas.get(str(fp)) or file_sha256(fp)
+        if not cache.has(sha):
+            todo[str(fp)] = (sha, len(_reader(fp).pages))
+    tasks = [(path, start, min(start + PAGES_PER_TASK, n)) for path, (_, n) in todo.items() for start in range(0, n, PAGES_PER_TASK)]
+    pages: dict[str, list[str]] = {path: [""] * n for path, (_, n) in todo.items()}
+    if workers <= 1 or len(tasks) <= 1:
+        for path, start, texts in map(_extract_range, tasks):
+            pages[path][start : start + len(texts)] = texts
+    else:
+        ctx = mp.get_context("spawn")
+        with ctx.Pool(min(workers, len(tasks))) as pool:
+            for path, start, texts in pool.imap_unordered(_extract_range, tasks):
+                pages[path][start : start + len(texts)] = texts
+    for path, (sha, _) in todo.items():
+        cache.put(sha, pages[path])
+    n_pages = sum(n for _, n in todo.values())
+    elapsed = time.perf_counter() - t0
+    return {"files": len(fps), "cached": len(fps) - len(todo), "pages": n_pages, "seconds": elapsed, "pages_per_sec": n_pages / elapsed if elapsed > 0 else 0.0}
+
+
+def pdf_pages(fp: Path, cache: PdfTextCache | None = None, sha: str | None = None) -> list[str]:
+    """
+    Page texts of a PDF (index 0 = page 1), from the cache or extracted in-process and cached.
+    Pass ``sha`` when the file was already hashed to skip reading it again.
+    """
+    cache = cache or PdfTextCache()
+    sha = sha or file_sha256(fp)
+    pages = cache.get(sha)
+    if pages is None:
+        pages = _extract_range((str(fp), 0, len(_reader(fp).pages)))[2]
+        cache.put(sha, pages)
+    return pages
@@ -22,3 +22,30 @@ Context:
 
 Answer:
 """
+
+MAP_PROMPT = """You are a financial risk analyst reading one part of the {issuer} (FY {year}) filing.
+List the material risks disclosed in this part, grouped by the risk taxonomy.
+Each context block starts with its [chunk_id]; CITE the chunk_ids behind every risk. Do not invent risks.
+
+Format:
+- Risk Category: <name>
+  - Why it matters: <1-2 sentences>
+  - Evidence (chunk_ids): <ids>
+
+Context:
+{context}
+"""
+
+REDUCE_PROMPT = """You are a financial risk analyst combining partial risk notes on the {issuer} (FY {year}) filing.
+Merge them into one summary grouped by the risk taxonomy: fold duplicate risks together, keep the most material ones
+and carry over EVERY chunk_id cited as evidence for the risks you keep, exactly as written.
+
+Format:
+- Risk Category: <name>
+  - Why it matters: <1-2 sentences>
+  - Evidence (chunk_ids): <ids>
+  - Suggested Mitigation: <1 sentence>
+
+Partial notes:
+{context}
+"""
@@ -1,15 +1,53 @@
+import json
 import sys
+import threading
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-
-from risk_analysis_agent.ui_streamlit import _get_zsl
+from typing import Any
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 
+from risk_analysis_agent.classifier import get_zsl
 from risk_analysis_agent.llm import get_llm  # if your summary uses LLM
-from risk_analysis_agent.retriever import get_retriever  # whatever you use to open Chroma/FAISS
+from risk_analysis_agent.mapreduce import summarize_filing
+from risk_analysis_agent.retriever import fiscal_year_filter, get_retriever  # whatever you use to open Chroma/FAISS
+from risk_analysis_agent.setting import Settings
+from risk_analysis_agent.tagging import tag_documents
+
+__all__ = ["summarize_filing", "summarize_many", "summarize_risk"]  # summarize_filing: whole filings by map-reduce
+
+SUMMARY_DOCS = 4  # chunks of context per LLM summary
+SOURCE_DOCS = 8
+
+
+def _where(issuer: str, year: int | str) -> dict[str, Any]:
+    return {"$and": [{"issuer": issuer}, fiscal_year_filter(year)]}
+
+
+def _summarize(llm: Any, issuer: str, year: int | str, question: str, docs: list[Any]) -> str:
+    context = "\n\n".join(t.page_content for t in docs[:SUMMARY_DOCS])
+    prompt = f"Summarize the {issuer} {year} {question} based on:\n{context}\n\nSummary:"
+    summary = llm.invoke(prompt) if llm else "LLM not configured"
+    return str(getattr(summary, "content", summary))
+
+
+def _result(issuer: str, year: int | str, summary: str, categories: list[Any], docs: list[Any]) -> dict:
+    sources = []
+    for d in docs[:SOURCE_DOCS]:
+        src = d.metadata.get("source") or d.metadata.get("path") or "unknown"
+        chunk_id = d.metadata.get("id") or d.metadata.get("chunk_id") or ""
+        sources.append({"path": src, "chunk_id": chunk_id, "page": d.metadata.get("page")})
+    return {
+        "issuer": issuer,
+        "year": year,
+        "summary": summary,
+        "categories": categories,
+        "sources": sources,
+    }
 
 
 def summarize_risk(issuer: str, year: int, question: str = "top risks", k: int = 8) -> dict:
@@ -19,32 +57,72 @@ def summarize_risk(issuer: str, year: int, question: str = "top risks", k: int =
         "issuer":..., "year":...,
         "summary": str,
         "categories": [{"label":..., "confidence":...}, ...],
-        "sources": [{"path":..., "chunk_id":...}, ...]
+        "sources": [{"path":..., "chunk_id":..., "page":...}, ...]  # page: PDF page number, None for TXT
       }
     """
-    retriever = get_retriever(k=k, where={"$and": [{"issuer": issuer}, {"fiscal_year": year}]})
+    retriever = get_retriever(k=k, where=_where(issuer, year))
     docs = retriever.invoke(question)  # or get_relevant_documents()
-    # classify categories from the retrieved text
-    texts = [d.page_content for d in docs]
-    zsl = _get_zsl()
-    categories = zsl.classify(texts, top_k=3)
+    # categories come from scores stored at index time; the classifier only runs for untagged chunks
+    categories = tag_documents(docs, get_zsl, top_k=3)
 
     # (Optional) LLM summary over top-k docs
     llm = get_llm()
-    context = "\n\n".join(t.page_content for t in docs[:4])
-    prompt = f"Summarize the {issuer} {year} {question} based on:\n{context}\n\nSummary:"
-    summary = llm.invoke(prompt) if llm else "LLM not configured"
+    return _result(issuer, year, _summarize(llm, issuer, year, question, docs), categories, docs)
 
-    sources = []
-    for d in docs[:8]:
-        src = d.metadata.get("source") or d.metadata.get("path") or "unknown"
-        chunk_id = d.metadata.get("id") or d.metadata.get("chunk_id") or ""
-        sources.append({"path": src, "chunk_id": chunk_id})
 
-    return {
-        "issuer": issuer,
-        "year": year,
-        "summary": str(summary),
-        "categories": categories,
-        "sources": sources,
-    }
+def _done_pairs(out_path: Path) -> set[tuple[str, str]]:
+    done = set()
+    if out_path.exists():
+        for line in out_path.read_text(encoding="utf-8").splitlines():
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:  # a line cut short by a crash is redone
+                continue
+            done.add((row["issuer"], str(row["year"])))
+    return done
+
+
+def summarize_many(pairs: Iterable[tuple[str, int | str]], question: str = "top risks", k: int = 8, concurrency: int | None = None, out_path: str | None = None) -> list[dict]:
+    """
+    summarize_risk for many (issuer, year) pairs in one pass.
+
+    Every pair is retrieved through the shared vector store, the classifier runs once over
+    the untagged chunks of all pairs, and LLM calls run on ``concurrency`` threads.
+    With ``out_path`` each result is appended to a JSONL file as soon as it is ready and
+    pairs already in the file are skipped, so an interrupted run resumes where it stopped.
+
+    Args:
+        pairs (Iterable[tuple[str, int | str]]): (issuer, fiscal year) pairs.
+        question (str): Summary focus.
+        k (int): Chunks retrieved per pair.
+        concurrency (int | None): Concurrent LLM calls; defaults to SUMMARIZE_CONCURRENCY.
+        out_path (str | None): Optional JSONL output (resumable).
+
+    Returns:
+        list[dict]: summarize_risk results of the pairs run now, in input order.
+    """
+    out = Path(out_path) if out_path else None
+    done = _done_pairs(out) if out else set()
+    todo = [(issuer, year) for issuer, year in dict.fromkeys(pairs) if (issuer, str(year)) not in done]
+    if not todo:
+        return []
+    docs = [get_retriever(k=k, where=_where(issuer, year)).invoke(question) for issuer, year in todo]
+    flat = [d for pair_docs in docs for d in pair_docs]
+    tags = iter(tag_documents(flat, get_zsl, top_k=3))  # one batched classifier pass
+    categories = [[next(tags) for _ in pair_docs] for pair_docs in docs]
+
+    llm = get_llm()
+    lock = threading.Lock()
+    if out:
+        out.parent.mkdir(parents=True, exist_ok=True)
+
+    def _run(i: int) -> dict:
+        issuer, year = todo[i]
+        res = _result(issuer, year, _summarize(llm, issuer, year, question, docs[i]), categories[i], docs[i])
+        if out:
+            with lock, out.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(res, default=str) + "\n")
+        return res
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency or Settings().summarize_concurrency)) as pool:
+        return list(pool.map(_run, range(len(todo))))
@@ -1,34 +1,105 @@
 from __future__ import annotations
 
+import json
 import os
-from typing import Any
+import sys
+import threading
+import time
+from collections.abc import Callable, Collection, Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, ClassVar
 
-import chromadb
+import numpy as np
 import pandas as pd
-from langchain_chroma import Chroma
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_core.vectorstores import VectorStoreRetriever
-from langchain_huggingface import HuggingFaceEmbeddings
 
+from . import embed_cache
+from .embed_cache import CachedEmbeddings, EmbeddingCache
+from .ingest import content_id, source_key
+from .lexical import get_lexical_index, reset_lexical_indexes, rrf_fuse
+from .lru import LRUCache
+from .mmr import mmr_select
 from .setting import Settings
+from .tagging import SCORE_PREFIX
 
+if TYPE_CHECKING:
+    from chromadb.api import ClientAPI
+    from langchain_chroma import Chroma
 
-def get_embedder(model: str | None = None) -> HuggingFaceEmbeddings:
+# ---- Process-wide registry of heavy objects ---------------------------------
+# Embedding models, Chroma clients and vector stores are built once per process and
+# shared by every caller (UI reruns, API calls, batch jobs). Guarded by one lock so
+# concurrent first calls do not load the same model twice.
+_LOCK = threading.RLock()
+_EMBEDDERS: dict[str, Any] = {}
+_CLIENTS: dict[str, ClientAPI] = {}
+_STORES: dict[tuple[str, str, str], Chroma] = {}
+
+RESULT_CACHE_ITEMS = int(os.getenv("RESULT_CACHE_ITEMS", "256"))
+FETCH_PER_K = 4  # MMR/hybrid candidates per requested result
+
+
+# chromadb, langchain_chroma and langchain_huggingface (transformers + torch) take seconds to
+# import; they load with the first client/model, so importing this module stays cheap.
+def _load_embeddings(model_name: str) -> Embeddings:
+    """Builds ``langchain_huggingface.HuggingFaceEmbeddings``, importing it on first use."""
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    return HuggingFaceEmbeddings(model_name=model_name)
+
+
+def get_embedder(model: str | None = None) -> Embeddings:
     """
-    Returns a HuggingFaceEmbeddings instance for the specified model.
+    Returns the shared HuggingFaceEmbeddings instance for the specified model, wrapped in
+    CachedEmbeddings (query LRU, plus the on-disk cache unless EMBED_CACHE_DIR is empty).
 
     Args:
         model (str | None): The name of the embedding model to use. If None, uses the default from settings.
 
     Returns:
-        HuggingFaceEmbeddings: The embedding function instance.
+        Embeddings: The embedding function instance.
     """
-    cfg = Settings()
-    return HuggingFaceEmbeddings(model_name=model or cfg.embedding_model)
+    name = model or Settings().embedding_model
+    with _LOCK:
+        if name not in _EMBEDDERS:
+            emb = _load_embeddings(name)
+            # repeated chunk texts (rebuilds, boilerplate across years) are served from disk, repeated queries from memory
+            disk = EmbeddingCache(name) if embed_cache.EMBED_CACHE_DIR else None
+            _EMBEDDERS[name] = CachedEmbeddings(emb, name, disk)
+        return _EMBEDDERS[name]
+
+
+def get_client(persist_dir: str | None = None) -> ClientAPI:
+    """
+    Returns the shared Chroma PersistentClient for a persist directory.
+
+    Args:
+        persist_dir (str | None): Chroma directory; defaults to CHROMA_PERSIST_DIR.
+
+    Returns:
+        ClientAPI: The Chroma client.
+    """
+    path = persist_dir or Settings().chroma_persist_dir
+    with _LOCK:
+        if path not in _CLIENTS:
+            os.environ["CHROMADB_TELEMETRY_IMPLEMENTATION"] = "none"
+            os.environ["ANONYMIZED_TELEMETRY"] = "false"
+            os.makedirs(path, exist_ok=True)
+            import chromadb
+
+            _CLIENTS[path] = chromadb.PersistentClient(path=path)
+        return _CLIENTS[path]
 
 
 def get_vectorstore(collection: str = "risk_docs") -> Chroma:
     """
-    Initializes and returns a Chroma vector store client for the specified collection.
+    Returns the shared Chroma vector store for the specified collection.
+
+    Built once per (persist dir, collection, embedding model) and reused afterwards.
 
     Args:
         collection (str): The name of the Chroma collection to use. Defaults to "risk_docs".
@@ -37,40 +108,461 @@ def get_vectorstore(collection: str = "risk_docs") -> Chroma:
         Chroma: An instance of the Chroma vector store for the given collection.
     """
     cfg = Settings()
-    os.environ["CHROMADB_TELEMETRY_IMPLEMENTATION"] = "none"
-    os.environ["ANONYMIZED_TELEMETRY"] = "false"
-    os.makedirs(cfg.chroma_persist_dir, exist_ok=True)
-    client = chromadb.PersistentClient(path=cfg.chroma_persist_dir)
-    return Chroma(client=client, collection_name=collection, embedding_function=get_embedder())
+    key = (cfg.chroma_persist_dir, collection, cfg.embedding_model)
+    with _LOCK:
+        if key not in _STORES:
+            from langchain_chroma import Chroma
+
+            _STORES[key] = Chroma(client=get_client(cfg.chroma_persist_dir), collection_name=collection, embedding_function=get_embedder())
+        return _STORES[key]
+
+
+def reload_vectorstores() -> None:
+    """
+    Drops cached Chroma clients and vector stores (e.g. after the persist dir was rebuilt
+    by another process); embedding models stay loaded. The next call reopens them.
+    """
+    with _LOCK:
+        _STORES.clear()
+        clients = list(_CLIENTS.values())
+        _CLIENTS.clear()
+    for client in clients:
+        client.clear_system_cache()
+
+
+def close_registry() -> None:
+    """
+    Releases every cached object: vector stores, Chroma clients, BM25 indexes and embedding models.
+    """
+    reload_vectorstores()
+    reset_lexical_indexes()
+    with _LOCK:
+        for emb in _EMBEDDERS.values():
+            if isinstance(emb, CachedEmbeddings) and emb.cache is not None:
+                emb.cache.close()
+        _EMBEDDERS.clear()
+
+
+# ---- Collection versions and retrieval result cache --------------------------
+# Every index write bumps <persist dir>/<collection>.version; cached results are keyed
+# by that version, so a write (from any process) invalidates them without coordination.
+_RESULTS: LRUCache[list[Document]] = LRUCache(RESULT_CACHE_ITEMS)
+
+
+def _version_path(collection: str) -> Path:
+    return Path(Settings().chroma_persist_dir) / f"{collection}.version"
+
+
+def collection_version(collection: str = "risk_docs") -> str:
+    """
+    Current write version of a collection ("0" if it was never written through index_chunks).
+    """
+    try:
+        return _version_path(collection).read_text(encoding="utf-8").strip() or "0"
+    except FileNotFoundError:
+        return "0"
+
+
+def bump_collection_version(collection: str = "risk_docs") -> str:
+    """
+    Marks a collection as changed, invalidating cached retrieval results in every process.
+    """
+    path = _version_path(collection)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    version = f"{time.time_ns()}-{os.getpid()}"
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(version, encoding="utf-8")
+    tmp.replace(path)
+    return version
+
+
+def fetch_size(k: int, fetch_k: int | None = None) -> int:
+    """
+    Candidate pool of MMR and hybrid retrieval: ``fetch_k`` if given (never below k), else max(FETCH_PER_K * k, MMR_FETCH_K),
+    so large k still leaves MMR room to diversify.
+    """
+    if fetch_k:
+        return max(k, fetch_k)
+    return max(FETCH_PER_K * k, Settings().mmr_fetch_k)
+
+
+def mmr_search(vs: Chroma, query: str, search_kwargs: dict[str, Any]) -> list[Document]:
+    """
+    Maximal-marginal-relevance retrieval: one Chroma query returns the ``fetch_k`` nearest
+    candidates with their stored embeddings, then mmr_select picks ``k`` of them.
+
+    Args:
+        vs (Chroma): Vector store of the collection.
+        query (str): User query.
+        search_kwargs (dict): Retriever search kwargs: ``k`` (default 4), optional ``filter``,
+            ``fetch_k`` (default: fetch_size) and ``lambda_mult`` (default: MMR_LAMBDA).
+
+    Returns:
+        list[Document]: Selected chunks, most relevant first.
+    """
+    cfg = Settings()
+    k = search_kwargs.get("k", 4)
+    fetch_k = fetch_size(k, search_kwargs.get("fetch_k"))
+    q = vs.embeddings.embed_query(query)
+    res = vs._collection.query(
+        query_embeddings=[q],
+        n_results=fetch_k,
+        where=search_kwargs.get("filter") or None,
+        include=["documents", "metadatas", "embeddings"],
+    )
+    ids, texts, metas = res["ids"][0], res["documents"][0], res["metadatas"][0]
+    if not ids:
+        return []
+    picked = mmr_select(np.asarray(q), np.asarray(res["embeddings"][0]), k, search_kwargs.get("lambda_mult", cfg.mmr_lambda))
+    return [Document(page_content=texts[i], metadata=metas[i] or {}, id=ids[i]) for i in picked]
 
 
-def get_retriever(k: int = 5, where: Any | None = None) -> VectorStoreRetriever:
+def hybrid_search(vs: Chroma, collection: str, query: str, search_kwargs: dict[str, Any]) -> list[Document]:
+    """
+    Lexical + vector retrieval fused with reciprocal-rank fusion.
+
+    The BM25 index and the vector store each return ``fetch_k`` candidates under the same
+    metadata filter; their ranks are fused and the top ``k`` chunks returned. Exact terms
+    ("LIBOR", "Regulation S-K", tickers) rank high without widening k.
+
+    Args:
+        vs (Chroma): Vector store of the collection.
+        collection (str): Collection name (selects the BM25 index).
+        query (str): User query.
+        search_kwargs (dict): Retriever search kwargs: ``k`` (default 4), optional ``filter``
+            (Chroma-style, applied to both sides) and ``fetch_k`` (default: fetch_size).
+
+    Returns:
+        list[Document]: Fused top-k chunks.
+    """
+    k = search_kwargs.get("k", 4)
+    where = search_kwargs.get("filter")
+    fetch_k = fetch_size(k, search_kwargs.get("fetch_k"))
+    kwargs: dict[str, Any] = {"k": fetch_k}
+    if where:
+        kwargs["filter"] = where
+    dense = vs.similarity_search(query, **kwargs)
+    lex = get_lexical_index(Settings().chroma_persist_dir, collection)
+    sparse = [cid for cid, _ in lex.search(query, fetch_k, where)]
+    by_id = {d.id: d for d in dense if d.id}
+    fused = rrf_fuse([[d.id for d in dense if d.id], sparse], k)
+    missing = [cid for cid in fused if cid not in by_id]
+    if missing:
+        got = vs.get(ids=missing, include=["documents", "metadatas"])
+        for cid, text, meta in zip(got["ids"], got["documents"], got["metadatas"], strict=True):
+            by_id[cid] = Document(page_content=text, metadata=meta or {}, id=cid)
+    return [by_id[cid] for cid in fused if cid in by_id]
+
+
+class CachedRetriever(VectorStoreRetriever):
+    """
+    VectorStoreRetriever whose results are memoised per (query, search type, search kwargs,
+    embedding model, collection, collection version) in a process-wide LRU. "mmr" runs the vectorised mmr_search;
+    "hybrid" fuses BM25 and vector results.
+    """
+
+    allowed_search_types: ClassVar[Collection[str]] = (*VectorStoreRetriever.allowed_search_types, "hybrid")
+    collection: str = "risk_docs"
+
+    def _search(self, query: str, run_manager: CallbackManagerForRetrieverRun, **kwargs: Any) -> list[Document]:
+        if self.search_type == "mmr":
+            return mmr_search(self.vectorstore, query, self.search_kwargs | kwargs)
+        if self.search_type == "hybrid":
+            return hybrid_search(self.vectorstore, self.collection, query, self.search_kwargs | kwargs)
+        return super()._get_relevant_documents(query, run_manager=run_manager, **kwargs)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun, **kwargs: Any) -> list[Document]:
+        if kwargs:  # per-call overrides are rare; do not cache them
+            return self._search(query, run_manager, **kwargs)
+        cfg = Settings()
+        search = json.dumps(self.search_kwargs, sort_keys=True, default=str)
+        key = (query, self.search_type, search, cfg.chroma_persist_dir, cfg.embedding_model, self.collection, collection_version(self.collection))
+        docs = _RESULTS.get(key)
+        if docs is None:
+            docs = self._search(query, run_manager)
+            _RESULTS.put(key, docs)
+        return [d.model_copy(deep=True) for d in docs]  # callers may mutate metadata
+
+
+def result_cache_stats() -> dict[str, float]:
+    """
+    Hit/miss counters of the retrieval result cache.
+    """
+    return _RESULTS.stats()
+
+
+def clear_result_cache() -> None:
+    """
+    Drops every cached retrieval result of this process.
+    """
+    _RESULTS.clear()
+
+
+def fiscal_year_filter(year: int | str) -> dict[str, Any]:
+    """
+    Chroma ``where`` clause for one fiscal year, matching it stored as a string or an int.
+
+    Folder ingestion stores the year as its folder name (a string); DataFrames indexed
+    directly may carry int years. Chroma compares types strictly, so both are asked for.
+    """
+    text = str(year).strip()
+    return {"$or": [{"fiscal_year": text}, {"fiscal_year": int(text)}]} if text.isdigit() else {"fiscal_year": text}
+
+
+def get_retriever(k: int = 5, where: Any | None = None, collection: str = "risk_docs", search_type: str | None = None) -> VectorStoreRetriever:
     """
     Returns a retriever object for querying the Chroma vector store.
 
+    Repeated (query, k, filter) lookups are answered from the result cache until
+    the collection is written again.
+
     Args:
         k (int): Number of results to return. Defaults to 5.
         where (dict | None): Optional filter for metadata fields.
+        collection (str): The name of the Chroma collection to query. Defaults to "risk_docs".
+        search_type (str | None): "mmr", "similarity" or "hybrid" (BM25 + vector, RRF-fused); defaults to RETRIEVAL_MODE.
 
     Returns:
-        Chroma: A retriever configured for MMR search.
+        VectorStoreRetriever: A retriever configured for the chosen search type.
     """
-    vs = get_vectorstore()
-    kwargs = {"k": k}
+    cfg = Settings()
+    vs = get_vectorstore(collection)
+    search_type = search_type or cfg.retrieval_mode
+    kwargs: dict[str, Any] = {"k": k}
     if where:  # OMIT empty filters; Chroma 1.x rejects {}
         kwargs["filter"] = where
-    return vs.as_retriever(search_type="mmr", search_kwargs=kwargs)
+    if search_type == "mmr":
+        kwargs |= {"fetch_k": fetch_size(k), "lambda_mult": cfg.mmr_lambda}
+    return CachedRetriever(vectorstore=vs, search_type=search_type, search_kwargs=kwargs, collection=collection)
 
 
-def index_dataframe(df: pd.DataFrame) -> None:
+def chunk_ids(df: pd.DataFrame) -> list[str]:
+    """
+    Content-hash vector-store ids for chunk rows (see ingest.content_id).
+
+    Args:
+        df (pandas.DataFrame): Chunks with 'text' and 'chunk_id' (or 'filepath') columns.
+
+    Returns:
+        list[str]: One id per row.
+    """
+    texts = df["text"].astype(str).tolist()
+    if "chunk_id" in df.columns:
+        sources = [source_key(str(c)) for c in df["chunk_id"]]
+    else:
+        sources = df["filepath"].astype(str).tolist()
+    return [content_id(src, t) for src, t in zip(sources, texts, strict=True)]
+
+
+def existing_ids(vs: Chroma, ids: list[str], batch: int = 5000) -> set[str]:
+    """
+    Subset of ``ids`` already stored in the vector store.
+    """
+    found: set[str] = set()
+    for start in range(0, len(ids), batch):
+        found.update(vs.get(ids=ids[start : start + batch], include=[])["ids"])
+    return found
+
+
+@dataclass
+class IndexStats:
+    """
+    Counters of a streaming index run.
+    """
+
+    seen: int = 0
+    skipped: int = 0  # duplicates within the run or already stored
+    embedded: int = 0
+    retagged: int = 0  # stored chunks that only gained label scores (no re-embedding)
+    seconds: float = 0.0
+    peak_rss_mb: float = 0.0
+
+    @property
+    def embeddings_per_sec(self) -> float:
+        return self.embedded / self.seconds if self.seconds > 0 else 0.0
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident memory of this process in MiB (0.0 where the platform does not report it).
+    """
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows
+        return 0.0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024  # bytes on macOS, KiB on Linux
+
+
+def _has_scores(meta: dict[str, Any] | None) -> bool:
+    return any(k.startswith(SCORE_PREFIX) for k in meta or {})
+
+
+def backfill_scores(vs: Chroma, records: dict[str, dict[str, Any]]) -> int:
+    """
+    Copy label scores onto stored chunks that were indexed without them; metadata only, nothing is re-embedded.
+
+    Args:
+        vs (Chroma): The vector store.
+        records (dict[str, dict]): Chunk id -> record carrying ``zsl_*`` scores.
+
+    Returns:
+        int: Number of stored chunks updated.
+    """
+    if not records:
+        return 0
+    got = vs.get(ids=list(records), include=["metadatas"])
+    ids, metas = [], []
+    for cid, meta in zip(got["ids"], got["metadatas"], strict=True):
+        if not _has_scores(meta):
+            ids.append(cid)
+            metas.append({**(meta or {}), **{k: v for k, v in records[cid].items() if k.startswith(SCORE_PREFIX)}})
+    if ids:
+        vs._collection.update(ids=ids, metadatas=metas)
+    return len(ids)
+
+
+def _chunk_metadata(rec: dict[str, Any]) -> dict[str, Any] | None:
+    # Chroma only stores str/int/float/bool values and rejects empty dicts; None, NaN and NA mark missing values
+    meta = {k: v for k, v in rec.items() if k not in ("text", "_id") and not (pd.api.types.is_scalar(v) and pd.isna(v))}
+    return meta or None
+
+
+def index_chunks(  # noqa: PLR0915
+    chunks: Iterable[dict[str, Any]],
+    collection: str = "risk_docs",
+    *,
+    embed_batch: int | None = None,
+    write_batch: int | None = None,
+    log: Callable[[str], None] | None = None,
+) -> IndexStats:
+    """
+    Streams chunk records into the Chroma vector store in bounded memory.
+
+    Records are consumed lazily: every ``embed_batch`` records are checked against the
+    store, the new ones embedded in one call, and embedded rows are upserted once
+    ``write_batch`` of them are pending (never more than the client's max batch size).
+    Only the ids seen so far are kept across batches. Written chunks are also added to
+    the collection's BM25 index. Tagged records whose chunk is already stored without
+    label scores (indexed before index-time tagging, or with it off) get the scores
+    written into the stored metadata.
+
+    Args:
+        chunks (Iterable[dict]): Records with 'text' and 'chunk_id' (or 'filepath') plus metadata fields.
+        collection (str): The name of the Chroma collection to write to. Defaults to "risk_docs".
+        embed_batch (int | None): Chunks per embedding call; defaults to INDEX_EMBED_BATCH.
+        write_batch (int | None): Chunks per Chroma upsert; defaults to INDEX_WRITE_BATCH.
+        log (Callable[[str], None] | None): Progress sink, called after every write.
+
+    Returns:
+        IndexStats: Chunks seen, skipped, embedded and retagged, elapsed seconds and peak RSS.
+    """
+    cfg = Settings()
+    vs = get_vectorstore(collection)
+    embed_batch = max(1, embed_batch or cfg.index_embed_batch)
+    write_batch = max(1, min(write_batch or cfg.index_write_batch, get_client(cfg.chroma_persist_dir).get_max_batch_size()))
+    stats = IndexStats()
+    seen: set[str] = set()
+    pending: list[tuple[str, str, dict[str, Any] | None, list[float]]] = []
+    lex = get_lexical_index(cfg.chroma_persist_dir, collection)
+    t0 = time.perf_counter()
+
+    def _write() -> None:
+        while pending:
+            part = pending[:write_batch]
+            del pending[:write_batch]
+            ids, texts, metas, vectors = (list(col) for col in zip(*part, strict=True))
+            vs._collection.upsert(ids=ids, documents=texts, metadatas=metas, embeddings=vectors)
+            lex.add(ids, texts, metas)
+            stats.embedded += len(ids)
+        stats.seconds = time.perf_counter() - t0
+        stats.peak_rss_mb = peak_rss_mb()
+        if log:
+            log(f"  {stats.embedded} embedded, {stats.skipped} skipped, {stats.embeddings_per_sec:.1f} emb/s, peak RSS {stats.peak_rss_mb:.0f} MiB")
+
+    def _embed(batch: list[dict[str, Any]]) -> None:
+        frame = pd.DataFrame(batch)
+        ids = chunk_ids(frame)
+        stored = existing_ids(vs, [i for i in ids if i not in seen])
+        fresh = []
+        for cid, rec in zip(ids, batch, strict=True):
+            if cid in seen or cid in stored:
+                stats.skipped += 1
+            else:
+                fresh.append((cid, str(rec["text"]), _chunk_metadata(rec)))
+            seen.add(cid)
+        stats.retagged += backfill_scores(vs, {cid: rec for cid, rec in zip(ids, batch, strict=True) if cid in stored and _has_scores(rec)})
+        if fresh:
+            vectors = vs.embeddings.embed_documents([t for _, t, _ in fresh])
+            pending.extend((cid, t, m, list(v)) for (cid, t, m), v in zip(fresh, vectors, strict=True))
+        if len(pending) >= write_batch:
+            _write()
+
+    batch: list[dict[str, Any]] = []
+    for rec in chunks:
+        stats.seen += 1
+        batch.append(rec)
+        if len(batch) >= embed_batch:
+            _embed(batch)
+            batch = []
+    if batch:
+        _embed(batch)
+    _write()
+    if stats.embedded:
+        lex.save()
+    if stats.embedded or stats.retagged:
+        bump_collection_version(collection)
+    return stats
+
+
+def _records(df: pd.DataFrame, size: int) -> Iterator[dict[str, Any]]:
+    for start in range(0, len(df), size):
+        yield from df.iloc[start : start + size].to_dict(orient="records")
+
+
+def index_dataframe(df: pd.DataFrame, collection: str = "risk_docs") -> int:
     """
     Indexes a pandas DataFrame into the Chroma vector store.
 
+    Ids are content hashes, so re-indexing the same chunks is idempotent and
+    only chunks not yet in the collection are embedded. Rows are streamed
+    through index_chunks, a slice at a time.
+
     Args:
         df (pandas.DataFrame): DataFrame containing a 'text' column and optional metadata columns.
+        collection (str): The name of the Chroma collection to write to. Defaults to "risk_docs".
+
+    Returns:
+        int: Number of chunks newly embedded.
     """
-    vs = get_vectorstore()
-    texts = df["text"].astype(str).tolist()
-    metas = df.drop(columns=["text"], errors="ignore").to_dict(orient="records")
-    ids = [f"doc-{i}" for i in range(len(texts))]
-    vs.add_texts(texts=texts, metadatas=metas, ids=ids)
+    return index_chunks(_records(df, Settings().index_embed_batch), collection).embedded
+
+
+def rebuild_lexical_index(collection: str = "risk_docs", batch: int = 5000) -> int:
+    """
+    Rebuilds a collection's BM25 index from the texts stored in Chroma.
+
+    Needed once for collections indexed before hybrid retrieval existed; afterwards
+    index_chunks and sync_folder keep it current.
+
+    Args:
+        collection (str): The name of the Chroma collection. Defaults to "risk_docs".
+        batch (int): Chunks read from Chroma per call.
+
+    Returns:
+        int: Number of chunks in the rebuilt index.
+    """
+    cfg = Settings()
+    vs = get_vectorstore(collection)
+    lex = get_lexical_index(cfg.chroma_persist_dir, collection)
+    lex.remove(list(lex.ids))
+    offset = 0
+    while True:
+        got = vs.get(include=["documents", "metadatas"], limit=batch, offset=offset)
+        if not got["ids"]:
+            break
+        lex.add(got["ids"], got["documents"], got["metadatas"])
+        offset += len(got["ids"])
+    lex.save()
+    bump_collection_version(collection)
+    return len(lex)
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from risk_analysis_agent.classifier import get_zsl
+from risk_analysis_agent.mapreduce import summarize_filing
+from risk_analysis_agent.public_api import summarize_risk
+from risk_analysis_agent.retriever import close_registry, fiscal_year_filter, get_embedder, get_retriever, get_vectorstore
+from risk_analysis_agent.setting import Settings
+from risk_analysis_agent.transport import transport_stats
+
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+API_CLASSIFY_CONCURRENCY = int(os.getenv("API_CLASSIFY_CONCURRENCY", "1"))  # forward passes at once (each uses TORCH_NUM_THREADS)
+API_SEARCH_CONCURRENCY = int(os.getenv("API_SEARCH_CONCURRENCY", "8"))
+API_SUMMARIZE_CONCURRENCY = int(os.getenv("API_SUMMARIZE_CONCURRENCY", "4"))  # requests; each makes its own LLM calls
+API_QUEUE_TIMEOUT_S = float(os.getenv("API_QUEUE_TIMEOUT_S", "30"))  # wait for a free slot, then answer 503
+API_MAX_BODY_BYTES = int(os.getenv("API_MAX_BODY_BYTES", str(4 * 1024 * 1024)))
+MAX_TEXTS = 512  # texts per /classify request
+
+
+def _warm_classifier() -> None:
+    get_zsl()
+
+
+def _warm_embedder() -> None:
+    get_embedder().embed_query("warm-up")  # loads the weights, not just the wrapper
+
+
+def _warm_vectorstore() -> None:
+    get_vectorstore()._collection.count()
+
+
+# loaded once at start-up, in this order; /readyz answers 200 once all succeeded
+WARMUPS: dict[str, Callable[[], None]] = {"classifier": _warm_classifier, "embedder": _warm_embedder, "vectorstore": _warm_vectorstore}
+
+
+# ---- Endpoints: JSON body in, JSON-serialisable dict out ------------------------
+# Request fields are checked up front and rejected with BadRequestError (400); any other exception is a server fault (500).
+
+SEARCH_MODES = ("similarity", "mmr", "hybrid")
+
+
+class BadRequestError(Exception):
+    """A request the client must fix: malformed JSON, a missing field or a field of the wrong type or range."""
+
+    status = 400
+
+
+class BodyTooLargeError(BadRequestError):
+    status = 413
+
+
+def _required(body: dict[str, Any], name: str) -> Any:
+    if body.get(name) is None:
+        raise BadRequestError(f"missing field '{name}'")
+    return body[name]
+
+
+def _int(body: dict[str, Any], name: str, default: int) -> int:
+    value = body.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise BadRequestError(f"'{name}' must be a positive integer")
+    return value
+
+
+def _str(body: dict[str, Any], name: str, default: str | None = None) -> str | None:
+    value = body.get(name, default)
+    if value is not None and not isinstance(value, str):
+        raise BadRequestError(f"'{name}' must be a string")
+    return value
+
+
+def _year(body: dict[str, Any], required: bool) -> int | str | None:
+    year = _required(body, "year") if required else body.get("year")
+    if year is not None and (isinstance(year, bool) or not isinstance(year, int | str)):
+        raise BadRequestError("'year' must be an integer or a string")
+    return year
+
+
+def classify(body: dict[str, Any]) -> dict[str, Any]:
+    texts = _required(body, "texts")
+    if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+        raise BadRequestError("'texts' must be a list of strings")
+    if len(texts) > MAX_TEXTS:
+        raise BadRequestError(f"at most {MAX_TEXTS} texts per request")
+    results = get_zsl().classify(texts, top_k=_int(body, "top_k", 3))
+    return {"results": [[{"label": label, "score": score} for label, score in tags] for tags in results]}
+
+
+def search(body: dict[str, Any]) -> dict[str, Any]:
+    query, issuer, year, k, mode = _str(body, "query"), _str(body, "issuer"), _year(body, required=False), _int(body, "k", 5), _str(body, "mode")
+    if not query or not query.strip():
+        raise BadRequestError("'query' must be a non-empty string")
+    if mode is not None and mode not in SEARCH_MODES:
+        raise BadRequestError(f"'mode' must be one of {', '.join(SEARCH_MODES)}")
+    conds = [{"issuer": issuer}] if issuer else []
+    if year:
+        conds.append(fiscal_year_filter(year))
+    where = {"$and": conds} if len(conds) > 1 else (conds[0] if conds else None)
+    docs = get_retriever(k=k, where=where, search_type=mode).invoke(query)
+    return {"results": [{"chunk_id": d.metadata.get("chunk_id"), "text": d.page_content, "metadata": d.metadata} for d in docs]}
+
+
+def summarize(body: dict[str, Any]) -> dict[str, Any]:
+    issuer, year = _required(body, "issuer"), _year(body, required=True)
+    if not isinstance(issuer, str):
+        raise BadRequestError("'issuer' must be a string")
+    question, k = _str(body, "question", "top risks"), _int(body, "k", 8)
+    if body.get("full"):  # whole filing by map-reduce instead of the top-k chunks
+        return summarize_filing(issuer, year)
+    return summarize_risk(issuer, year, question=question, k=k)
+
+
+ROUTES: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {"/classify": classify, "/search": search, "/summarize": summarize}
+
+
+@dataclass
+class EndpointStats:
+    requests: int = 0
+    errors: int = 0  # 4xx/5xx answers other than "busy"
+    rejected: int = 0  # 503: no free slot within API_QUEUE_TIMEOUT_S
+    latency_s: float = 0.0
+
+
+class RiskAPIServer(ThreadingHTTPServer):
+    """
+    Long-running JSON service over one warm model set (classifier, embedder, Chroma store).
+
+    Every request runs on its own thread; each endpoint has a concurrency limit, and a request
+    that finds no free slot within ``queue_timeout_s`` gets 503 with ``Retry-After``.
+    POST endpoints answer 503 until warm-up has finished.
+    """
+
+    daemon_threads = True
+    request_queue_size = 128  # the default backlog of 5 drops connections under bursts
+
+    def __init__(
+        self,
+        host: str = API_HOST,
+        port: int = API_PORT,
+        *,
+        limits: dict[str, int] | None = None,
+        queue_timeout_s: float | None = None,
+    ):
+        super().__init__((host, port), _Handler)
+        limits = {"/classify": API_CLASSIFY_CONCURRENCY, "/search": API_SEARCH_CONCURRENCY, "/summarize": API_SUMMARIZE_CONCURRENCY, **(limits or {})}
+        self.slots = {path: threading.BoundedSemaphore(max(1, n)) for path, n in limits.items()}
+        self.queue_timeout_s = API_QUEUE_TIMEOUT_S if queue_timeout_s is None else queue_timeout_s
+        self.warm: dict[str, str] = dict.fromkeys(WARMUPS, "pending")
+        self.warmed = threading.Event()
+        self.stats = {path: EndpointStats() for path in ROUTES}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    @property
+    def ready(self) -> bool:
+        return self.warmed.is_set() and all(state == "ok" for state in self.warm.values())
+
+    def warm_up(self) -> None:
+        """Load every WARMUPS component once, recording "ok" or the error of each."""
+        for name, load in WARMUPS.items():
+            self.warm[name] = "loading"
+            try:
+                load()
+                self.warm[name] = "ok"
+            except Exception as e:  # reported by /readyz; the service keeps answering
+                self.warm[name] = f"error: {e}"
+        self.warmed.set()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive: every answer carries Content-Length
+    server: RiskAPIServer
+
+    def _send(self, status: int, body: dict[str, Any], headers: dict[str, str] | None = None) -> None:
+        data = json.dumps(body, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        srv = self.server
+        if self.path == "/healthz":
+            self._send(200, {"status": "ok"})
+        elif self.path == "/readyz":
+            self._send(200 if srv.ready else 503, {"ready": srv.ready, "components": dict(srv.warm)})
+        elif self.path == "/stats":
+            with srv.lock:
+                endpoints = {path: asdict(s) for path, s in srv.stats.items()}
+            self._send(200, {"endpoints": endpoints, "llm": transport_stats()})
+        else:
+            self._send(404, {"error": f"unknown path {self.path}"})
+
+    def _body(self) -> dict[str, Any]:
+        raw = self.headers.get("Content-Length") or "0"
+        if not raw.isdigit():
+            self.close_connection = True  # the body cannot be skipped without its length
+            raise BadRequestError(f"invalid Content-Length {raw!r}")
+        length = int(raw)
+        if length > API_MAX_BODY_BYTES:
+            self.close_connection = True  # the body is left unread and would corrupt the next request
+            raise BodyTooLargeError(f"body larger than {API_MAX_BODY_BYTES} bytes")
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:  # JSONDecodeError and undecodable bytes
+            raise BadRequestError(f"invalid JSON: {e}") from e
+        if not isinstance(body, dict):
+            raise BadRequestError("body must be a JSON object")
+        return body
+
+    def _finish(self, path: str, t0: float, status: int) -> None:
+        with self.server.lock:
+            stats = self.server.stats[path]
+            stats.requests += 1
+            stats.latency_s += time.perf_counter() - t0
+            stats.rejected += status == 503  # noqa: PLR2004
+            stats.errors += status >= 400 and status != 503  # noqa: PLR2004
+
+    def do_POST(self) -> None:
+        srv, path, t0 = self.server, self.path, time.perf_counter()
+        endpoint = ROUTES.get(path)
+        if endpoint is None:
+            self.close_connection = True  # the body is left unread
+            self._send(404, {"error": f"unknown path {path}"}, {"Connection": "close"})
+            return
+        status, answer, headers = 200, {}, {}
+        try:
+            body = self._body()
+            if not srv.warmed.is_set():
+                status, answer, headers = 503, {"error": "warming up"}, {"Retry-After": "5"}
+            elif not srv.slots[path].acquire(timeout=srv.queue_timeout_s):
+                status, answer, headers = 503, {"error": f"busy: {path} is at its concurrency limit"}, {"Retry-After": "1"}
+            else:
+                try:
+                    answer = endpoint(body)
+                finally:
+                    srv.slots[path].release()
+        except BadRequestError as e:
+            status, answer = e.status, {"error": str(e)}
+            if self.close_connection:
+                headers = {"Connection": "close"}
+        except Exception as e:
+            self.log_error("%s failed: %r", path, e)
+            status, answer = 500, {"error": f"{type(e).__name__}: {e}"}
+        self._send(status, answer, headers)
+        self._finish(path, t0, status)
+
+
+def run_server(host: str | None = None, port: int | None = None, warm: bool = True) -> None:
+    """
+    Serves the JSON API until interrupted, loading the models in the background first.
+
+    Args:
+        host (str | None): Interface to bind; defaults to API_HOST.
+        port (int | None): Port; defaults to API_PORT.
+        warm (bool): Load the classifier, embedder and vector store before answering POSTs;
+            False answers at once and loads each on first use.
+    """
+    server = RiskAPIServer(host or API_HOST, API_PORT if port is None else port)
+    if warm:
+        threading.Thread(target=server.warm_up, name="warm-up", daemon=True).start()
+    else:
+        server.warm = {}
+        server.warmed.set()
+    print(f"Risk API on {server.url} (collection store: {Settings().chroma_persist_dir}); GET /readyz, POST /classify /search /summarize")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        close_registry()
@@ -20,6 +20,9 @@ class Settings:
     llm_provider: str = os.getenv("LLM_PROVIDER", "ollama").lower()
     llm_model: str = os.getenv("LLM_MODEL", os.getenv("OLLAMA_MODEL", "gemma3:1b"))
     llm_temperature: float = float(os.getenv("LLM_TEMPERATURE", "0.2"))
+    summarize_concurrency: int = int(os.getenv("SUMMARIZE_CONCURRENCY", "4"))  # concurrent LLM calls in summarize_many
+    mapreduce_group_tokens: int = int(os.getenv("MAPREDUCE_GROUP_TOKENS", "2000"))  # context per map call of summarize_filing
+    mapreduce_fan_in: int = int(os.getenv("MAPREDUCE_FAN_IN", "4"))  # partial summaries merged per reduce call
     ollama_base_url: str | None = os.getenv("OLLAMA_BASE_URL")
 
     # API KEY
@@ -32,19 +35,32 @@ class Settings:
 
     # Embeddings
     embedding_model: str = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    embed_max_tokens: int = int(os.getenv("EMBED_MAX_TOKENS", "256"))  # sentence-transformers truncation window
+
+    # Chunking: "chars" (fixed character windows) or "tokens" (sized with the embedder + classifier tokenizers)
+    chunk_mode: str = os.getenv("CHUNK_MODE", "chars").lower()
+    chunk_tokens: int = int(os.getenv("CHUNK_TOKENS", "0"))  # 0 = largest size that fits every model window
+    chunk_overlap_tokens: int = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
+    chunk_store_dir: str = os.getenv("CHUNK_STORE_DIR", "data/chunks")  # issuer=/fiscal_year= partitioned parquet
+    ingest_workers: int = int(os.getenv("INGEST_WORKERS", "0"))  # processes reading/splitting filings; 0 = all cores
 
     # Vector store
     chroma_persist_dir: str = os.getenv(
         "CHROMA_PERSIST_DIR",
         "/data/chroma" if _in_docker() else ".chroma-risk",
     )
+    retrieval_mode: str = os.getenv("RETRIEVAL_MODE", "mmr").lower()  # mmr | similarity | hybrid (BM25 + vector, RRF)
+    mmr_fetch_k: int = int(os.getenv("MMR_FETCH_K", "20"))  # minimum MMR/hybrid candidate pool; raised to 4 * k for larger k
+    mmr_lambda: float = float(os.getenv("MMR_LAMBDA", "0.5"))  # 1 = pure relevance, 0 = maximum diversity
+    index_embed_batch: int = int(os.getenv("INDEX_EMBED_BATCH", "256"))  # chunks per embed_documents call
+    index_write_batch: int = int(os.getenv("INDEX_WRITE_BATCH", "4096"))  # chunks per Chroma upsert (capped at the client's max)
 
     # Classifier / inference knobs
     sent_batch_size: int = int(os.getenv("SENT_BATCH_SIZE", "16"))
     sent_max_len: int = int(os.getenv("SENT_MAX_LEN", "512"))
     zsl_model: str = os.getenv("ZSL_MODEL", "facebook/bart-large-mnli")
     zsl_max_len: int = int(os.getenv("ZSL_MAX_LEN", "512"))
-    zsl_label_batch: int = int(os.getenv("ZSL_LABEL_BATCH", "16"))
+    zsl_token_budget: int = int(os.getenv("ZSL_TOKEN_BUDGET", "8192"))
 
     tokenizers_parallelism: bool = _as_bool(os.getenv("TOKENIZERS_PARALLELISM"), False)
     torch_num_threads: int = int(os.getenv("TORCH_NUM_THREADS", "4"))
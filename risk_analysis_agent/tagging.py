@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+import pandas as pd
+
+from risk_analysis_agent.taxonomy import canonical_labels, to_key
+
+SCORE_PREFIX = "zsl_"
+TAG_BATCH = 256  # chunks per classifier call when tagging a whole corpus
+
+
+def score_column(label: str) -> str:
+    """
+    Returns the metadata/column name holding the entailment score of a label, e.g. "zsl_market_risk".
+    """
+    return SCORE_PREFIX + to_key(label)
+
+
+def tag_dataframe(df: pd.DataFrame, zsl: Any, batch_size: int = TAG_BATCH) -> pd.DataFrame:
+    """
+    Classify every chunk once and add one score column per label.
+
+    The columns travel with the chunk into Chroma metadata and the parquet file,
+    so query-time paths can read tags instead of running the model.
+
+    Args:
+        df (pd.DataFrame): Chunks with a 'text' column.
+        zsl (ZeroShotRisk): Classifier exposing ``labels`` and ``score(texts)``.
+        batch_size (int): Chunks per classifier call.
+
+    Returns:
+        pd.DataFrame: A copy of ``df`` with the score columns added.
+    """
+    out = df.copy()
+    texts = out["text"].astype(str).tolist()
+    cols: dict[str, list[float]] = {score_column(lab): [] for lab in zsl.labels}
+    for start in range(0, len(texts), batch_size):
+        for scores in zsl.score(texts[start : start + batch_size]):
+            for lab, sc in scores:
+                cols[score_column(lab)].append(round(float(sc), 6))
+    for col, vals in cols.items():
+        out[col] = vals
+    return out
+
+
+def tags_from_metadata(meta: dict[str, Any], top_k: int = 3, labels: list[str] | None = None) -> list[tuple[str, float]] | None:
+    """
+    Rebuild the top_k (label, score) tags of a chunk from its stored scores.
+
+    Returns:
+        list[tuple[str, float]] | None: Tags sorted by score desc, or None if the chunk was indexed without scores.
+    """
+    scores = []
+    for lab in labels or canonical_labels():
+        val = meta.get(score_column(lab))
+        if val is None:
+            return None
+        scores.append((lab, float(val)))
+    scores.sort(key=lambda x: x[1], reverse=True)
+    return scores[:top_k]
+
+
+def tag_documents(docs: list[Any], get_zsl: Callable[[], Any], top_k: int = 3) -> list[list[tuple[str, float]]]:
+    """
+    Top_k tags for retrieved documents, read from index-time metadata when present.
+
+    The classifier is only built and run for documents indexed without scores.
+
+    Args:
+        docs (list[Document]): Retrieved documents (``page_content`` + ``metadata``).
+        get_zsl (Callable[[], ZeroShotRisk]): Lazy classifier factory.
+        top_k (int): Number of tags per document.
+
+    Returns:
+        list[list[tuple[str, float]]]: Tags per document, in input order.
+    """
+    tags: list[list[tuple[str, float]] | None] = [tags_from_metadata(d.metadata or {}, top_k=top_k) for d in docs]
+    missing = [i for i, t in enumerate(tags) if t is None]
+    if missing:
+        fresh = get_zsl().classify([docs[i].page_content for i in missing], top_k=top_k)
+        for i, t in zip(missing, fresh, strict=False):
+            tags[i] = t
+    return [t or [] for t in tags]
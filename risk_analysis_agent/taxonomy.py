@@ -11,10 +11,31 @@ RISK_TAXONOMY = [
     "Model Risk",
 ]
 
+# NLI hypothesis each label is scored with (premise = chunk text).
+HYPOTHESIS_TEMPLATE = "This text is about {}."
+
+# Short descriptions used to embed labels for the cascade prefilter (closer to disclosure wording than the bare label).
+RISK_DESCRIPTIONS = {
+    "Market Risk": "Market risk: interest rates, foreign exchange, equity and commodity prices, inflation and economic conditions affecting results.",
+    "Liquidity Risk": "Liquidity risk: access to funding, cash flows, capital markets, debt refinancing and deposit outflows.",
+    "Credit Risk": "Credit risk: counterparty defaults, borrowers failing to repay loans, credit losses and credit ratings.",
+    "Operational Risk": "Operational risk: failures of processes, systems, people, outages, fraud and business disruption.",
+    "Cybersecurity Risk": "Cybersecurity risk: cyber attacks, data breaches, hacking, ransomware and information security incidents.",
+    "Regulatory/Legal Risk": "Regulatory and legal risk: laws, regulation, compliance, litigation, government investigations, taxes and fines.",
+    "Supply Chain Risk": "Supply chain risk: suppliers, manufacturing, components, logistics, shortages and delivery delays.",
+    "ESG/Climate Risk": "ESG and climate risk: climate change, extreme weather, environmental rules, emissions and sustainability.",
+    "Reputational Risk": "Reputational risk: brand damage, public perception, customer trust, media coverage and controversies.",
+    "Model Risk": "Model risk: errors in models, algorithms, artificial intelligence, estimates and quantitative assumptions.",
+}
+
 
 def canonical_labels() -> list[str]:
     return list(RISK_TAXONOMY)
 
 
+def label_description(label: str) -> str:
+    return RISK_DESCRIPTIONS.get(label, label)
+
+
 def to_key(label: str) -> str:
     return label.replace("/", " ").replace(" ", "_").lower()
@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from collections.abc import Coroutine
+from dataclasses import asdict, dataclass
+from typing import Any, TypeVar
+
+import httpx
+
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "120"))  # longest silence (read/write/pool wait) before a call fails
+LLM_CONNECT_TIMEOUT_S = float(os.getenv("LLM_CONNECT_TIMEOUT_S", "5"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))  # retries after a connection error, timeout, 429 or 5xx
+LLM_RETRY_BACKOFF_S = float(os.getenv("LLM_RETRY_BACKOFF_S", "0.5"))  # doubled on every retry
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))  # consecutive failures that open a provider's circuit
+LLM_BREAKER_RESET_S = float(os.getenv("LLM_BREAKER_RESET_S", "30"))  # open circuit lets a probe through after this long
+LLM_HEALTH_TTL_S = float(os.getenv("LLM_HEALTH_TTL_S", "30"))  # a successful health check is trusted this long
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "16"))  # keep-alive connections per provider
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+MAX_BACKOFF_S = 30.0
+HEALTH_TIMEOUT_S = 2.0
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised without contacting the provider while its circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failures`` consecutive failed attempts; once open, calls fail fast until
+    ``reset_s`` has passed, then one probe is let through and its outcome closes or re-opens it.
+    """
+
+    def __init__(self, failures: int, reset_s: float):
+        self.failures = max(1, failures)
+        self.reset_s = reset_s
+        self._consecutive = 0
+        self._opened_at: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half-open" if time.monotonic() - self._opened_at >= self.reset_s else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_s:
+                self._opened_at = time.monotonic()  # this call is the probe; others wait for its outcome
+                return True
+            return False
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self._consecutive = 0
+                self._opened_at = None
+                return
+            self._consecutive += 1
+            if self._consecutive >= self.failures:
+                self._opened_at = time.monotonic()
+
+
+@dataclass
+class ProviderStats:
+    """
+    Per-provider transport counters. Latency is time to response headers (time to first token when streaming).
+    """
+
+    requests: int = 0  # attempts sent, retries included
+    errors: int = 0  # attempts that failed (transport error, timeout, 429/5xx)
+    retries: int = 0
+    rejected: int = 0  # calls refused by the open circuit breaker
+    latency_s: float = 0.0
+    max_latency_s: float = 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        out: dict[str, float] = asdict(self)
+        out["mean_latency_s"] = self.latency_s / self.requests if self.requests else 0.0
+        return out
+
+
+class _Policy:
+    """Retry, backoff, breaker and counters shared by the sync and async transports of a provider."""
+
+    def __init__(self, provider: str, breaker: CircuitBreaker, stats: ProviderStats, lock: threading.Lock):
+        self.provider = provider
+        self.breaker = breaker
+        self.stats = stats
+        self.max_retries = LLM_MAX_RETRIES
+        self.backoff_s = LLM_RETRY_BACKOFF_S
+        self._lock = lock
+
+    def _attempts(self, request: httpx.Request) -> int:
+        return 1 + max(0, int(request.extensions.get("max_retries", self.max_retries)))
+
+    def _admit(self, attempt: int) -> float:
+        if not self.breaker.allow():
+            with self._lock:
+                self.stats.rejected += 1
+            raise CircuitOpenError(f"{self.provider}: circuit open after {self.breaker.failures} consecutive failures; retry in up to {self.breaker.reset_s:.0f}s")
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.retries += attempt > 0
+        return time.perf_counter()
+
+    def _done(self, t0: float, ok: bool) -> None:
+        elapsed = time.perf_counter() - t0
+        with self._lock:
+            self.stats.latency_s += elapsed
+            self.stats.max_latency_s = max(self.stats.max_latency_s, elapsed)
+            self.stats.errors += not ok
+        self.breaker.record(ok)
+
+    def _delay(self, attempt: int, response: httpx.Response | None = None) -> float:
+        retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+        if retry_after.replace(".", "", 1).isdigit():
+            return min(float(retry_after), MAX_BACKOFF_S)
+        return min(self.backoff_s * 2**attempt, MAX_BACKOFF_S)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=LLM_POOL_SIZE, max_keepalive_connections=LLM_POOL_SIZE)
+
+
+class RetryTransport(_Policy, httpx.BaseTransport):
+    """
+    Pooled keep-alive transport that retries connection errors, timeouts and 429/5xx answers
+    with exponential backoff (``Retry-After`` honoured) behind the provider's circuit breaker.
+    """
+
+    def __init__(self, provider: str, breaker: CircuitBreaker, stats: ProviderStats, lock: threading.Lock):
+        super().__init__(provider, breaker, stats, lock)
+        self._pool = httpx.HTTPTransport(limits=_limits())
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        attempts = self._attempts(request)
+        for attempt in range(attempts):
+            t0 = self._admit(attempt)
+            try:
+                response = self._pool.handle_request(request)
+            except httpx.TransportError:
+                self._done(t0, ok=False)
+                if attempt + 1 == attempts:
+                    raise
+                time.sleep(self._delay(attempt))
+                continue
+            ok = response.status_code not in RETRY_STATUSES
+            self._done(t0, ok)
+            if ok or attempt + 1 == attempts:
+                return response
+            response.close()
+            time.sleep(self._delay(attempt, response))
+        raise AssertionError("unreachable")
+
+    def close(self) -> None:
+        self._pool.close()
+
+
+class AsyncRetryTransport(_Policy, httpx.AsyncBaseTransport):
+    """
+    Async form of RetryTransport. Connections belong to an event loop, so each running loop
+    (e.g. every ``run`` of generate_many) gets its own keep-alive pool, closed by ``aclose``
+    on that loop before it ends.
+    """
+
+    def __init__(self, provider: str, breaker: CircuitBreaker, stats: ProviderStats, lock: threading.Lock):
+        super().__init__(provider, breaker, stats, lock)
+        self._pools: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport] = weakref.WeakKeyDictionary()
+
+    def _pool(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._pools:
+                self._pools[loop] = httpx.AsyncHTTPTransport(limits=_limits())
+            return self._pools[loop]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        attempts = self._attempts(request)
+        pool = self._pool()
+        for attempt in range(attempts):
+            t0 = self._admit(attempt)
+            try:
+                response = await pool.handle_async_request(request)
+            except httpx.TransportError:
+                self._done(t0, ok=False)
+                if attempt + 1 == attempts:
+                    raise
+                await asyncio.sleep(self._delay(attempt))
+                continue
+            ok = response.status_code not in RETRY_STATUSES
+            self._done(t0, ok)
+            if ok or attempt + 1 == attempts:
+                return response
+            await response.aclose()
+            await asyncio.sleep(self._delay(attempt, response))
+        raise AssertionError("unreachable")
+
+    async def aclose(self) -> None:
+        """Close the running loop's pool (the transport stays usable; a later call opens a new pool)."""
+        with self._lock:
+            pool = self._pools.pop(asyncio.get_running_loop(), None)
+        if pool is not None:
+            await pool.aclose()
+
+    def close_pools(self) -> None:
+        """Close the pools of every loop that is still open, on that loop; pools of closed loops are dropped."""
+        with self._lock:
+            pools = list(self._pools.items())
+            self._pools.clear()
+        for loop, pool in pools:
+            if loop.is_closed():
+                continue
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(pool.aclose(), loop)
+            else:
+                loop.run_until_complete(pool.aclose())
+
+
+@dataclass
+class _Provider:
+    stats: ProviderStats
+    transport: RetryTransport
+    async_transport: AsyncRetryTransport
+    client: httpx.Client
+    async_client: httpx.AsyncClient
+
+
+_PROVIDERS: dict[str, _Provider] = {}
+_HEALTHY: dict[str, float] = {}  # url -> monotonic time the last successful check expires
+_LOCK = threading.Lock()
+
+
+def timeout() -> httpx.Timeout:
+    """Bounded timeouts for LLM calls: LLM_CONNECT_TIMEOUT_S to connect, LLM_TIMEOUT_S for everything else."""
+    return httpx.Timeout(LLM_TIMEOUT_S, connect=LLM_CONNECT_TIMEOUT_S)
+
+
+def _provider(name: str) -> _Provider:
+    with _LOCK:
+        if name not in _PROVIDERS:
+            breaker = CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_RESET_S)
+            stats = ProviderStats()
+            lock = threading.Lock()
+            sync = RetryTransport(name, breaker, stats, lock)
+            asyn = AsyncRetryTransport(name, breaker, stats, lock)
+            _PROVIDERS[name] = _Provider(stats, sync, asyn, httpx.Client(transport=sync, timeout=timeout()), httpx.AsyncClient(transport=asyn, timeout=timeout()))
+        return _PROVIDERS[name]
+
+
+def sync_transport(provider: str) -> RetryTransport:
+    """Shared transport of a provider, for clients that build their own httpx.Client (Ollama)."""
+    return _provider(provider).transport
+
+
+def async_transport(provider: str) -> AsyncRetryTransport:
+    """Shared async transport of a provider, for clients that build their own httpx.AsyncClient (Ollama)."""
+    return _provider(provider).async_transport
+
+
+def http_client(provider: str) -> httpx.Client:
+    """Shared httpx.Client of a provider (pooled, keep-alive, retrying), for the OpenAI/Anthropic SDKs."""
+    return _provider(provider).client
+
+
+def async_http_client(provider: str) -> httpx.AsyncClient:
+    """Shared httpx.AsyncClient of a provider."""
+    return _provider(provider).async_client
+
+
+def check_health(url: str, ttl_s: float | None = None, provider: str = "ollama") -> None:
+    """
+    Checks that an Ollama server answers ``/api/version``, at most once per ``ttl_s`` seconds.
+
+    The check goes over the provider's pooled connection without retries; only successes are
+    remembered, so a server that comes back is noticed on the next call.
+
+    Args:
+        url (str): Server base URL.
+        ttl_s (float | None): How long a success is trusted; defaults to LLM_HEALTH_TTL_S.
+        provider (str): Provider whose transport (and circuit breaker) to use.
+
+    Raises:
+        httpx.HTTPError: If the server is unreachable, answers with an error or its circuit is open.
+    """
+    ttl_s = LLM_HEALTH_TTL_S if ttl_s is None else ttl_s
+    now = time.monotonic()
+    if _HEALTHY.get(url, 0.0) > now:
+        return
+    r = http_client(provider).get(url.rstrip("/") + "/api/version", timeout=HEALTH_TIMEOUT_S, extensions={"max_retries": 0})
+    r.raise_for_status()
+    _HEALTHY[url] = now + ttl_s
+
+
+async def aclose_loop_pools() -> None:
+    """Close every provider's keep-alive connections that belong to the running event loop."""
+    with _LOCK:
+        providers = list(_PROVIDERS.values())
+    for p in providers:
+        await p.async_transport.aclose()
+
+
+def run(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    ``asyncio.run`` for code that calls LLMs: the loop's pooled connections are closed before
+    the loop ends, instead of lingering (sockets open) until garbage collection.
+    """
+
+    async def _main() -> T:
+        try:
+            return await coro
+        finally:
+            await aclose_loop_pools()
+
+    return asyncio.run(_main())
+
+
+def transport_stats() -> dict[str, dict[str, Any]]:
+    """
+    Returns latency and error counters per provider for this process, with the breaker state.
+    """
+    with _LOCK:
+        providers = dict(_PROVIDERS)
+    return {name: {**p.stats.as_dict(), "circuit": p.transport.breaker.state} for name, p in providers.items()}
+
+
+def reset_transports() -> None:
+    """Close every pooled connection (sync and async) and forget counters, breaker states and health checks."""
+    with _LOCK:
+        providers = list(_PROVIDERS.values())
+        _PROVIDERS.clear()
+        _HEALTHY.clear()
+    for p in providers:
+        p.client.close()
+        p.transport.close()  # Ollama builds its own httpx.Client on this transport
+        p.async_transport.close_pools()
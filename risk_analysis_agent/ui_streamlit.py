@@ -10,11 +10,16 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from risk_analysis_agent.chunk_store import ChunkStore
 from risk_analysis_agent.classifier import ZeroShotRisk
-from risk_analysis_agent.ingest import ingest_folder, save_parquet
-from risk_analysis_agent.llm import get_llm
+from risk_analysis_agent.context import build_context, context_budget
+from risk_analysis_agent.indexer import sync_folder
+from risk_analysis_agent.ingest import list_filings
+from risk_analysis_agent.llm import get_llm, stream_text
 from risk_analysis_agent.prompts import QA_PROMPT, RISK_SUMMARY_PROMPT
-from risk_analysis_agent.retriever import get_retriever, index_dataframe
+from risk_analysis_agent.retriever import get_retriever
+from risk_analysis_agent.tagging import tag_documents
+from risk_analysis_agent.transport import transport_stats
 
 load_dotenv()
 st.set_page_config(page_title="Risk Analysis Agent", layout="wide")
@@ -66,6 +71,10 @@ provider_name = st.sidebar.selectbox("LLM Provider", list(LLM_PROVIDERS.keys()),
 provider = LLM_PROVIDERS[str(provider_name)]["id"]
 model = st.sidebar.selectbox("Model", LLM_PROVIDERS[str(provider_name)]["models"], index=0)
 temperature = st.sidebar.slider("Temperature", 0.0, 1.0, 0.2, 0.05)
+# answers at low temperature are replayed from the LLM response cache; tick to ask the model again
+regenerate = st.sidebar.checkbox("Regenerate answers (skip cache)", value=False)
+with st.sidebar.expander("LLM connection stats"):
+    st.json(transport_stats())  # latency, errors, retries and circuit state per provider, this server process
 
 # Optionally, set API keys in sidebar when needed
 if provider == "openai":
@@ -78,20 +87,28 @@ def ingest_tab() -> None:
     """
     Displays the UI for ingesting filings and indexing them.
 
-    Allows the user to specify a folder containing TXT filings,
-    triggers ingestion and indexing, and displays a preview of the ingested data.
+    Allows the user to specify a folder containing TXT/PDF filings and syncs it into the index:
+    only new or changed files are chunked, risk-tagged and embedded; chunks of removed files are deleted.
     """
     st.subheader("1) Ingest filings and index")
-    folder = st.text_input("Folder with TXT filings (issuer/year/*.txt)", "data/samples")
+    folder = st.text_input("Folder with TXT/PDF filings (issuer/year/*.txt, *.pdf)", "data/samples")
     if st.button("Index folder", use_container_width=True):
-        df = ingest_folder(folder)
-        if df.empty:
-            st.warning("No .txt files found. Expected structure: data/samples/<ISSUER>/<YEAR>/*.txt")
+        # classify once at index time (new chunks only); Analyze/summarize read the stored scores
+        report = sync_folder(folder, get_zsl=_get_zsl)
+        if not (report.added_files or report.changed_files or report.removed_files or report.unchanged_files):
+            st.warning("No .txt/.pdf files found. Expected structure: data/samples/<ISSUER>/<YEAR>/*.txt")
         else:
-            save_parquet(df, "data/filings.parquet")
-            index_dataframe(df)
-            st.success(f"Indexed {len(df)} chunks → Chroma")
-            st.dataframe(df.head(10))
+            st.success(f"Synced → Chroma: {report.summary()}")
+            changed = report.added_files + report.changed_files
+            # keep the partitioned chunk store in step: rewrite only the touched issuer/year partitions (all on first use)
+            store, fps = ChunkStore(), list_filings(folder)
+            touched = {Path(f).parts[-3:-1] for f in changed + report.removed_files}
+            if not store.partitions():
+                touched |= {fp.parts[-3:-1] for fp in fps}
+            if touched:
+                store.refresh(fps, touched)
+            if changed:
+                st.dataframe(pd.DataFrame({"file": changed}).head(10))
 
 
 def analyze_tab() -> None:
@@ -99,7 +116,8 @@ def analyze_tab() -> None:
     Displays the UI for analyzing and classifying top risks.
 
     Allows the user to specify issuer, fiscal year, and focus, retrieves relevant document chunks,
-    classifies them, displays tags, and generates an executive summary using an LLM.
+    displays their risk tags (stored at index time, classified on the fly for older indexes),
+    and generates an executive summary using an LLM.
     """
     st.subheader("2) Classify & summarize top risks")
     issuer = st.text_input("Issuer (folder name)", "ACME_CORP")
@@ -115,13 +133,12 @@ def analyze_tab() -> None:
         if not docs:
             st.warning("No documents returned. Did you index the right issuer/year?")
         else:
-            context = "\n\n".join([f"[{d.metadata.get('chunk_id','?')}] {d.page_content}" for d in docs])
-            zsl = _get_zsl()
-            top_texts = [d.page_content for d in docs[: min(8, len(docs))]]
-            tags = zsl.classify(top_texts, top_k=3)
+            packed = build_context(docs, context_budget(str(model)))
+            top_docs = docs[: min(8, len(docs))]
+            tags = tag_documents(top_docs, _get_zsl, top_k=3)
 
             rows = []
-            for d, ts in zip(docs[: len(top_texts)], tags, strict=False):
+            for d, ts in zip(top_docs, tags, strict=False):
                 rows.append(
                     {
                         "chunk_id": d.metadata.get("chunk_id", "?"),
@@ -133,9 +150,10 @@ def analyze_tab() -> None:
             st.write("**Tagged chunks (top-8):**")
             st.dataframe(pd.DataFrame(rows))
             llm = _get_llm(str(provider), str(model), temperature, openai_api_key if provider == "openai" else None, anthropic_api_key if provider == "claude" else None)
-            prompt = RISK_SUMMARY_PROMPT.format(issuer=issuer, year=year, context=context)
+            prompt = RISK_SUMMARY_PROMPT.format(issuer=issuer, year=year, context=packed.text)
             st.write("### Executive Summary")
-            st.write(llm.invoke(prompt).content)
+            st.caption(f"Context: {packed.summary()}")
+            st.write_stream(stream_text(llm, prompt, use_cache=not regenerate))  # tokens render as they arrive
 
 
 # ---------- Tabs ----------
@@ -158,10 +176,10 @@ with tab_qa:
         if not docs:
             st.warning("No documents returned.")
         else:
-            context = "\n\n".join([f"[{d.metadata.get('chunk_id','?')}] {d.page_content}" for d in docs])
+            packed = build_context(docs, context_budget(str(model)))
+            st.caption(f"Context: {packed.summary()}")
             llm = _get_llm(str(provider), str(model), temperature, openai_api_key if provider == "openai" else None, anthropic_api_key if provider == "claude" else None)
-            ans = llm.invoke(QA_PROMPT.format(question=q, context=context))
-            st.write(ans.content)
+            st.write_stream(stream_text(llm, QA_PROMPT.format(question=q, context=packed.text), use_cache=not regenerate))
             with st.expander("Sources"):
                 st.write(
                     pd.DataFrame(
@@ -171,6 +189,7 @@ with tab_qa:
                                 "issuer": d.metadata.get("issuer"),
                                 "year": d.metadata.get("fiscal_year"),
                                 "file": d.metadata.get("filepath"),
+                                "page": d.metadata.get("page"),
                             }
                             for d in docs
                         ]
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+CACHE_PATH = os.getenv("ZSL_CACHE_PATH", ".cache/zsl_scores.sqlite")  # empty string disables the cache
+CACHE_MAX_MB = float(os.getenv("ZSL_CACHE_MAX_MB", "256"))
+CACHE_MEM_ITEMS = int(os.getenv("ZSL_CACHE_MEM_ITEMS", "4096"))
+TOUCH_FLUSH_ITEMS = 4096  # pending last_used updates written in one go
+
+
+def text_hash(text: str) -> str:
+    """
+    Returns the SHA-256 hex digest of a chunk text.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def cache_namespace(model_id: str, labels: list[str], template: str, max_len: int) -> str:
+    """
+    Returns a short digest identifying everything that changes a score besides the text itself.
+
+    Args:
+        model_id (str): Model name or local path (plus backend, if not the default one).
+        labels (list[str]): Candidate labels, in scoring order.
+        template (str): Hypothesis template, e.g. "This text is about {}.".
+        max_len (int): Token length premise/hypothesis pairs are truncated to.
+
+    Returns:
+        str: 16-char hex namespace prefix for cache keys.
+    """
+    raw = json.dumps([model_id, list(labels), template, max_len], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class ClassificationCache:
+    """
+    Two-level cache of per-label entailment scores:
+      - an in-memory LRU (per process) in front of
+      - a SQLite table on disk shared by every process using the same path.
+    Keys are ``<namespace>:<sha256(text)>``; values are the score list in label order.
+    The disk table is evicted least-recently-used first once it grows over ``max_bytes``.
+    Reads never write: ``last_used`` of disk hits is kept in memory and flushed with the next
+    write (``put_many``/``prune``), so cache-hit-only runs do not contend for the SQLite write lock.
+    """
+
+    def __init__(self, path: str | None = None, max_bytes: int | None = None, memory_items: int | None = None):
+        self.path = path or CACHE_PATH
+        self.max_bytes = int(CACHE_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        self.memory_items = CACHE_MEM_ITEMS if memory_items is None else memory_items
+        self._mem: OrderedDict[str, list[float]] = OrderedDict()
+        self._touched: dict[str, float] = {}  # key -> last_used not yet written to disk
+        self._lock = threading.Lock()
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS zsl_scores (key TEXT PRIMARY KEY, scores TEXT NOT NULL, nbytes INTEGER NOT NULL, last_used REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS zsl_scores_last_used ON zsl_scores(last_used)")
+        self._db.commit()
+
+    # ------------------------ internal helpers -------------------------------
+
+    def _remember(self, key: str, scores: list[float]) -> None:
+        if self.memory_items <= 0:
+            return
+        self._mem[key] = scores
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.memory_items:
+            self._mem.popitem(last=False)
+
+    def _flush_touches(self) -> None:
+        """Write pending ``last_used`` times (the caller commits)."""
+        if self._touched:
+            self._db.executemany("UPDATE zsl_scores SET last_used = ? WHERE key = ?", [(t, k) for k, t in self._touched.items()])
+            self._touched.clear()
+
+    def _disk_bytes(self) -> int:
+        return int(self._db.execute("SELECT COALESCE(SUM(nbytes), 0) FROM zsl_scores").fetchone()[0])
+
+    def _evict_to(self, target: int) -> int:
+        """Delete least-recently-used rows until the table holds at most ``target`` bytes."""
+        self._flush_touches()
+        excess = self._disk_bytes() - target
+        if excess <= 0:
+            self._db.commit()
+            return 0
+        removed, freed = 0, 0
+        doomed: list[tuple[str]] = []
+        for key, nbytes in self._db.execute("SELECT key, nbytes FROM zsl_scores ORDER BY last_used ASC"):
+            if freed >= excess:
+                break
+            doomed.append((key,))
+            freed += nbytes
+            removed += 1
+        self._db.executemany("DELETE FROM zsl_scores WHERE key = ?", doomed)
+        self._db.commit()
+        for (key,) in doomed:
+            self._mem.pop(key, None)
+        return removed
+
+    # ------------------------ public APIs ------------------------------------
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        """
+        Look up many keys at once; memory first, then one SQLite query for the rest.
+
+        Returns:
+            dict[str, list[float]]: Scores for the keys that were found.
+        """
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            pending = []
+            for k in keys:
+                if k in self._mem:
+                    self._mem.move_to_end(k)
+                    found[k] = self._mem[k]
+                    self.hits_memory += 1
+                else:
+                    pending.append(k)
+            now = time.time()
+            for start in range(0, len(pending), 500):  # stay under SQLite's bound-parameter limit
+                part = pending[start : start + 500]
+                marks = ",".join("?" * len(part))
+                rows = self._db.execute(f"SELECT key, scores FROM zsl_scores WHERE key IN ({marks})", part).fetchall()
+                for k, raw in rows:
+                    found[k] = json.loads(raw)
+                    self._remember(k, found[k])
+                    self._touched[k] = now
+                self.hits_disk += len(rows)
+                self.misses += len(part) - len(rows)
+            if len(self._touched) >= TOUCH_FLUSH_ITEMS:
+                self._flush_touches()
+                self._db.commit()
+        return found
+
+    def put_many(self, items: dict[str, list[float]]) -> None:
+        """
+        Store scores for many keys, evicting old rows if the table outgrows ``max_bytes``.
+        """
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for k, scores in items.items():
+            raw = json.dumps(scores)
+            rows.append((k, raw, len(k) + len(raw), now))
+        with self._lock:
+            for k, scores in items.items():
+                self._remember(k, scores)
+            self._flush_touches()
+            self._db.executemany("INSERT OR REPLACE INTO zsl_scores (key, scores, nbytes, last_used) VALUES (?, ?, ?, ?)", rows)
+            self._db.commit()
+            if self.max_bytes > 0 and self._disk_bytes() > self.max_bytes:
+                # leave some headroom so we do not evict on every insert
+                self._evict_to(int(self.max_bytes * 0.9))
+
+    def prune(self, max_bytes: int | None = None) -> int:
+        """
+        Evict least-recently-used entries until the disk table fits in ``max_bytes``.
+
+        Args:
+            max_bytes (int | None): Size to prune to; defaults to the cache's ``max_bytes``. As there,
+                0 means unlimited and removes nothing (``clear`` drops everything).
+
+        Returns:
+            int: Number of entries removed.
+        """
+        target = self.max_bytes if max_bytes is None else max_bytes
+        if target <= 0:
+            return 0
+        with self._lock:
+            return self._evict_to(target)
+
+    def clear(self) -> None:
+        """Drop every cached entry, on disk and in memory."""
+        with self._lock:
+            self._mem.clear()
+            self._touched.clear()
+            self._db.execute("DELETE FROM zsl_scores")
+            self._db.commit()
+            self._db.execute("VACUUM")
+
+    def stats(self) -> dict[str, float]:
+        """
+        Returns hit/miss counters for this process and the current size of the disk table.
+        """
+        with self._lock:
+            entries = int(self._db.execute("SELECT COUNT(*) FROM zsl_scores").fetchone()[0])
+            nbytes = self._disk_bytes()
+        lookups = self.hits_memory + self.hits_disk + self.misses
+        return {
+            "hits_memory": self.hits_memory,
+            "hits_disk": self.hits_disk,
+            "misses": self.misses,
+            "hit_rate": (self.hits_memory + self.hits_disk) / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": nbytes,
+            "memory_entries": len(self._mem),
+        }
+
+    def close(self) -> None:
+        """Write pending ``last_used`` times and close the SQLite connection."""
+        with self._lock:
+            if self._touched:
+                self._flush_touches()
+                self._db.commit()
+            self._db.close()
@@ -0,0 +1,64 @@
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+WORDS = "interest rate liquidity cyber vendor supply chain regulatory litigation credit counterparty inflation tariff outage climate".split()
+
+
+def make_tree(base: Path, n: int, paras: int) -> None:
+    rng = random.Random(0)
+    for i in range(n):
+        d = base / f"ISSUER_{i % 500:03d}" / str(2015 + i % 10)
+        d.mkdir(parents=True, exist_ok=True)
+        text = "\n\n".join(" ".join(rng.choices(WORDS, k=120)) + "." for _ in range(paras))
+        (d / f"item1a_{i}.txt").write_text(text, encoding="utf-8")
+
+
+def run(mode: str, folder: str, workers: int) -> dict[str, float]:
+    import pandas as pd
+
+    from risk_analysis_agent.ingest import _chunk_file, iter_record_batches, list_filings, make_splitter
+
+    t0 = time.perf_counter()
+    fps = list_filings(folder)
+    if mode == "serial-dicts":  # previous ingest_folder: one dict per chunk, then one DataFrame
+        splitter = make_splitter("chars")
+        rows = [row for fp in fps for row in _chunk_file(fp, splitter, [])]
+        n = len(pd.DataFrame(rows))
+    else:  # streaming Arrow batches, consumed without materialising the corpus
+        n = sum(b.num_rows for b in iter_record_batches(fps, "chars", workers=workers))
+    return {"chunks": n, "seconds": time.perf_counter() - t0, "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Ingestion wall-clock and peak RSS on a synthetic filing tree")
+    ap.add_argument("--files", type=int, default=10_000)
+    ap.add_argument("--paras", type=int, default=30, help="~1 KB paragraphs per filing")
+    ap.add_argument("--workers", type=int, default=0, help="0 = all cores")
+    ap.add_argument("--folder", default="", help="Reuse an existing tree instead of generating one")
+    ap.add_argument("--run", default="", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.run:  # child process: one measurement, fresh RSS high-water mark
+        print(json.dumps(run(args.run, args.folder, args.workers)))
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = args.folder or tmp
+        if not args.folder:
+            make_tree(Path(tmp), args.files, args.paras)
+        for mode, workers in (("serial-dicts", 1), ("stream", 1), ("stream", args.workers)):
+            out = subprocess.run([sys.executable, __file__, "--run", mode, "--folder", folder, "--workers", str(workers)], check=True, capture_output=True, text=True).stdout
+            res = json.loads(out.strip().splitlines()[-1])
+            label = f"{mode} (workers={workers or 'all'})"
+            print(f"{label:28s} {res['chunks']:8d} chunks {res['seconds']:8.1f} s  peak RSS {res['peak_rss_mb']:7.0f} MiB")
@@ -0,0 +1,38 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from risk_analysis_agent import transport
+from risk_analysis_agent.llm import ainvoke_text, generate_many, get_llm, stream_text
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="LLM time-to-first-token (streaming) and wall-clock for N prompts, serial vs concurrent")
+    ap.add_argument("--provider", help="Override LLM_PROVIDER")
+    ap.add_argument("--model", help="Override the provider's model")
+    ap.add_argument("--prompts", type=int, default=8)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--prompt", default="List three liquidity risks a bank discloses in a 10-K, one line each.")
+    args = ap.parse_args()
+
+    llm = get_llm(provider=args.provider, model=args.model)
+    t0 = time.perf_counter()
+    ttft = None
+    for _ in stream_text(llm, args.prompt):
+        ttft = ttft or time.perf_counter() - t0
+    total = time.perf_counter() - t0
+    print(f"streaming: first token {ttft or total:6.2f} s, full answer {total:6.2f} s")
+
+    prompts = [f"{args.prompt} (variant {i})" for i in range(args.prompts)]
+    t0 = time.perf_counter()
+    for p in prompts:
+        transport.run(ainvoke_text(llm, p))
+    serial = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    generate_many(llm, prompts, concurrency=args.concurrency)
+    concurrent = time.perf_counter() - t0
+    print(f"{args.prompts} prompts: serial {serial:6.2f} s, concurrency {args.concurrency} {concurrent:6.2f} s ({serial / concurrent:4.1f}x)")
@@ -0,0 +1,61 @@
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from langchain_chroma import Chroma
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from risk_analysis_agent.retriever import mmr_search
+
+
+class RandomEmbedder:
+    """MiniLM-sized random vectors; the benchmark measures retrieval, not the model."""
+
+    def __init__(self, dim: int) -> None:
+        self.dim = dim
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return np.random.default_rng(len(texts)).normal(size=(len(texts), self.dim)).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return np.random.default_rng(len(text)).normal(size=self.dim).tolist()
+
+
+def _median_ms(fn, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="MMR latency: LangChain max_marginal_relevance_search vs NumPy mmr_search")
+    ap.add_argument("--chunks", type=int, default=5000)
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--fetch-mult", type=int, default=4, help="fetch_k = k * fetch-mult")
+    ap.add_argument("--lambda-mult", type=float, default=0.5)
+    ap.add_argument("--runs", type=int, default=20)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        vs = Chroma(collection_name="bench", embedding_function=RandomEmbedder(args.dim), persist_directory=tmp)
+        vecs = np.random.default_rng(0).normal(size=(args.chunks, args.dim)).tolist()
+        for start in range(0, args.chunks, 4096):
+            ids = [str(i) for i in range(start, min(start + 4096, args.chunks))]
+            vs._collection.add(ids=ids, documents=[f"chunk {i}" for i in ids], embeddings=vecs[start : start + len(ids)])
+        query = "interest rate risk"
+        print(f"{args.chunks} chunks, dim {args.dim}, median of {args.runs} runs")
+        for k in (8, 12, 16, 20, 24):
+            kw = {"k": k, "fetch_k": k * args.fetch_mult, "lambda_mult": args.lambda_mult}
+            old = _median_ms(lambda kw=kw: vs.max_marginal_relevance_search(query, **kw), args.runs)
+            new = _median_ms(lambda kw=kw: mmr_search(vs, query, kw), args.runs)
+            print(f"k={k:2d} fetch_k={kw['fetch_k']:3d}  langchain {old:7.2f} ms  numpy {new:7.2f} ms  ({old / new:4.1f}x)")
@@ -0,0 +1,56 @@
+import argparse
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from risk_analysis_agent.pdf_text import PdfTextCache, extract_pdfs
+
+WORDS = "interest rate liquidity cyber vendor supply chain regulatory litigation credit counterparty inflation tariff outage climate".split()
+
+
+def make_pdf(path: Path, n_pages: int, lines: int = 50) -> None:
+    """Synthetic prospectus: ``lines`` lines of Helvetica text per page."""
+    rng = random.Random(0)
+    objs = ["<< /Type /Catalog /Pages 2 0 R >>", "", "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for _ in range(n_pages):
+        body = " T* ".join(f"({' '.join(rng.choices(WORDS, k=12))}) Tj" for _ in range(lines))
+        stream = f"BT /F1 9 Tf 11 TL 40 800 Td {body} ET"
+        objs.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objs.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Contents {len(objs)} 0 R /Resources << /Font << /F1 3 0 R >> >> >>")
+        kids.append(f"{len(objs)} 0 R")
+    objs[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objs, start=1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode() + "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(bytes(out))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="PDF extraction throughput (pages/sec): serial vs page-parallel vs cached")
+    ap.add_argument("--pages", type=int, default=400)
+    ap.add_argument("--docs", type=int, default=2)
+    ap.add_argument("--workers", type=int, default=4)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fps = []
+        for i in range(args.docs):
+            fps.append(Path(tmp) / f"prospectus_{i}.pdf")
+            make_pdf(fps[-1], args.pages)
+        for label, workers in (("serial", 1), (f"{args.workers} workers", args.workers)):
+            cache = PdfTextCache(str(Path(tmp) / f"cache-{workers}"))
+            cold = extract_pdfs(fps, workers=workers, cache=cache)
+            warm = extract_pdfs(fps, workers=workers, cache=cache)
+            rerun = f"re-ingest: {warm['seconds']:.3f} s, {warm['cached']} cached"
+            print(f"{label:12s} {cold['pages']:6d} pages {cold['seconds']:7.2f} s  {cold['pages_per_sec']:7.1f} pages/s  ({rerun})")
@@ -0,0 +1,39 @@
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from risk_analysis_agent.retriever import clear_result_cache, close_registry, get_retriever, result_cache_stats
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Cold vs warm get_retriever latency (process-wide registry)")
+    ap.add_argument("--runs", type=int, default=20)
+    ap.add_argument("--k", type=int, default=8)
+    ap.add_argument("--query", default="cybersecurity incidents")
+    args = ap.parse_args()
+
+    close_registry()
+    t0 = time.perf_counter()
+    get_retriever(k=args.k).invoke(args.query)
+    cold = (time.perf_counter() - t0) * 1000
+
+    uncached = []
+    for _ in range(args.runs):
+        clear_result_cache()
+        t0 = time.perf_counter()
+        get_retriever(k=args.k).invoke(args.query)
+        uncached.append((time.perf_counter() - t0) * 1000)
+
+    warm = []
+    for _ in range(args.runs):
+        t0 = time.perf_counter()
+        get_retriever(k=args.k).invoke(args.query)
+        warm.append((time.perf_counter() - t0) * 1000)
+    print(f"cold get_retriever+invoke: {cold:8.1f} ms")
+    print(f"warm, result cache cleared: {statistics.median(uncached):7.1f} ms (median of {args.runs})")
+    print(f"warm, repeat query:         {statistics.median(warm):7.1f} ms (median of {args.runs}; result cache {result_cache_stats()['hit_rate']:.0%} hits)")
@@ -0,0 +1,37 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from risk_analysis_agent.classifier import ZeroShotRisk
+from risk_analysis_agent.ingest import ingest_folder
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Compare zero-shot classifier throughput across backends")
+    ap.add_argument("--folder", default="data/samples")
+    ap.add_argument("--limit", type=int, default=64, help="Number of chunks to score")
+    ap.add_argument("--backends", default="torch,onnx,onnx-int8")
+    ap.add_argument("--model", help="Override ZSL_MODEL")
+    args = ap.parse_args()
+
+    texts = ingest_folder(args.folder)["text"].tolist()[: args.limit]
+    ref = None
+    for backend in args.backends.split(","):
+        t0 = time.perf_counter()
+        zsl = ZeroShotRisk(model_id=args.model, cache=False, backend=backend)
+        load_s = time.perf_counter() - t0
+        zsl._score_texts(texts[:1])  # warm-up
+        t0 = time.perf_counter()
+        scores = zsl._score_texts(texts)
+        dt = time.perf_counter() - t0
+        line = f"{backend:10s} load {load_s:6.1f}s  {len(texts) / dt:7.2f} chunks/s"
+        if ref is None:
+            ref = scores
+        else:
+            diff = max(abs(a[1] - b[1]) for ra, rb in zip(ref, scores, strict=True) for a, b in zip(ra, rb, strict=True))
+            line += f"  max |Δ entailment| vs {args.backends.split(',')[0]}: {diff:.4f}"
+        print(line)
@@ -0,0 +1,34 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from risk_analysis_agent.cascade import LabelPrefilter, recall_at_m
+from risk_analysis_agent.classifier import ZeroShotRisk
+from risk_analysis_agent.ingest import ingest_folder
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Recall of the embedding prefilter against full NLI scoring")
+    ap.add_argument("--folder", default="data/samples")
+    ap.add_argument("--m", default="2,3,4,5", help="Comma-separated candidate counts to evaluate")
+    ap.add_argument("--top-k", type=int, default=3)
+    ap.add_argument("--limit", type=int, help="Only use the first N chunks")
+    args = ap.parse_args()
+
+    texts = ingest_folder(args.folder)["text"].tolist()[: args.limit]
+    zsl = ZeroShotRisk(cascade_m=0)
+    t0 = time.perf_counter()
+    full = zsl.score(texts)
+    print(f"full NLI scoring: {len(texts)} chunks x {len(zsl.labels)} labels in {time.perf_counter() - t0:.1f}s")
+
+    pre = LabelPrefilter(zsl.labels)
+    sims = pre.similarities(texts)
+    for m in (int(x) for x in args.m.split(",")):
+        order = (-sims).argsort(axis=1)[:, :m]
+        cands = [[zsl.labels[j] for j in row] for row in order]
+        share = m / len(zsl.labels)
+        print(f"m={m:2d}: recall@{args.top_k} = {recall_at_m(full, cands, args.top_k):.3f}  NLI pairs = {share:.0%} of full")
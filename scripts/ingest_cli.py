@@ -1,13 +1,20 @@
 import argparse
 
-from risk_analysis_agent.ingest import ingest_folder
-from risk_analysis_agent.retriever import index_dataframe
+from risk_analysis_agent.classifier import get_zsl
+from risk_analysis_agent.indexer import export_collection, retag_collection, sync_folder
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
     ap.add_argument("--folder", default="data/samples")
+    ap.add_argument("--parquet", default="data/filings.parquet", help="Snapshot of the indexed chunks ('' to skip)")
+    ap.add_argument("--no-classify", action="store_true", help="Skip index-time risk tagging")
+    ap.add_argument("--retag", action="store_true", help="Also tag stored chunks indexed without label scores (metadata only, no re-embedding)")
     args = ap.parse_args()
 
-    df = ingest_folder(args.folder)
-    index_dataframe(df)
-    print("Indexed:", len(df))
+    # the classifier loads only if some file changed (or some stored chunk lacks scores)
+    report = sync_folder(args.folder, get_zsl=None if args.no_classify else get_zsl)
+    print("Synced:", report.summary())
+    if args.retag and not args.no_classify:
+        print("Retagged:", retag_collection(get_zsl), "chunks")
+    if args.parquet:
+        print("Exported:", len(export_collection(args.parquet)), "chunks to", args.parquet)
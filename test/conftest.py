@@ -0,0 +1,154 @@
+import sys
+import threading
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from helpers import TINY_TEXTS, CountingEmbedder, FakeStore, FlatEmbedder, StubOllama, StubServer
+
+from risk_analysis_agent.setting import Settings
+from risk_analysis_agent.taxonomy import canonical_labels
+
+
+@pytest.fixture(autouse=True)
+def _no_embedding_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep fake test embedders out of the shared on-disk embedding cache."""
+    from risk_analysis_agent import embed_cache
+
+    monkeypatch.setattr(embed_cache, "EMBED_CACHE_DIR", "")
+
+
+@pytest.fixture(autouse=True)
+def _no_zsl_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep test classifier scores out of the shared on-disk score cache."""
+    from risk_analysis_agent import zsl_cache
+
+    monkeypatch.setattr(zsl_cache, "CACHE_PATH", "")
+
+
+@pytest.fixture(autouse=True)
+def _no_llm_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep test LLM answers out of the shared on-disk response cache."""
+    from risk_analysis_agent import llm_cache
+
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_PATH", "")
+
+
+@pytest.fixture(autouse=True)
+def _fresh_transports() -> Iterator[None]:
+    """Each test starts with empty LLM connection pools, counters, breakers and health checks."""
+    from risk_analysis_agent import transport
+
+    yield
+    transport.reset_transports()
+
+
+@pytest.fixture
+def fake_store(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Iterator[Callable[..., FakeStore]]:
+    """
+    Factory: ``fake_store(embedder, **settings)`` points the shared retriever registry (and the indexer's
+    manifests) at a temp Chroma dir whose embedding model is ``embedder``; registry and result cache are
+    reset around the test. Most tests want ``flat_store`` or ``counting_store`` instead.
+    """
+    from risk_analysis_agent import indexer
+    from risk_analysis_agent import retriever as retr
+
+    def _make(embedder: object, **settings: object) -> FakeStore:
+        store = FakeStore(Settings(chroma_persist_dir=str(tmp_path / "chroma"), **settings))
+
+        def _load(model_name: str) -> object:
+            store.loads += 1
+            return embedder
+
+        monkeypatch.setattr(retr, "Settings", lambda: store.settings)
+        monkeypatch.setattr(indexer, "Settings", lambda: store.settings)
+        monkeypatch.setattr(retr, "_load_embeddings", _load)
+        return store
+
+    retr.close_registry()
+    retr.clear_result_cache()
+    yield _make
+    retr.close_registry()
+    retr.clear_result_cache()
+
+
+@pytest.fixture
+def flat_store(fake_store: Callable[..., FakeStore]) -> FakeStore:
+    """A temp store on FlatEmbedder, for tests that need a working index but not meaningful vectors."""
+    return fake_store(FlatEmbedder())
+
+
+@pytest.fixture
+def counting_store(fake_store: Callable[..., FakeStore]) -> CountingEmbedder:
+    """A temp store on a CountingEmbedder; returns the embedder so tests can count what was embedded."""
+    emb = CountingEmbedder()
+    fake_store(emb)
+    return emb
+
+
+@pytest.fixture(scope="session")
+def tiny_mnli_dir(tmp_path_factory: pytest.TempPathFactory) -> str:
+    """
+    Builds a randomly initialised, tiny BART-MNLI style model and tokenizer on disk.
+
+    Lets classifier tests exercise the real transformers code paths without
+    downloading anything from the Hugging Face hub.
+
+    Returns:
+        str: Directory usable as ``model_id`` for ``ZeroShotRisk``.
+    """
+    import torch
+    from tokenizers import Tokenizer, models, normalizers, pre_tokenizers, processors
+    from transformers import BartConfig, BartForSequenceClassification, PreTrainedTokenizerFast
+
+    out = tmp_path_factory.mktemp("tiny-mnli")
+    words = {w.strip(".,").lower() for t in [*TINY_TEXTS, *canonical_labels(), "This text is about"] for w in t.replace("/", " ").split()}
+    vocab = {"<s>": 0, "<pad>": 1, "</s>": 2, "<unk>": 3}
+    for w in sorted(words):
+        vocab.setdefault(w, len(vocab))
+
+    tok = Tokenizer(models.WordLevel(vocab=vocab, unk_token="<unk>"))
+    tok.normalizer = normalizers.Lowercase()
+    tok.pre_tokenizer = pre_tokenizers.Sequence([pre_tokenizers.Whitespace(), pre_tokenizers.Punctuation()])
+    tok.post_processor = processors.TemplateProcessing(
+        single="<s> $A </s>",
+        pair="<s> $A </s> </s> $B </s>",
+        special_tokens=[("<s>", 0), ("</s>", 2)],
+    )
+    fast = PreTrainedTokenizerFast(
+        tokenizer_object=tok, bos_token="<s>", eos_token="</s>", pad_token="<pad>", unk_token="<unk>", model_max_length=512, model_input_names=["input_ids", "attention_mask"]
+    )
+    fast.save_pretrained(out)
+
+    torch.manual_seed(0)
+    cfg = BartConfig(
+        vocab_size=len(vocab),
+        d_model=16,
+        encoder_layers=1,
+        decoder_layers=1,
+        encoder_attention_heads=2,
+        decoder_attention_heads=2,
+        encoder_ffn_dim=32,
+        decoder_ffn_dim=32,
+        max_position_embeddings=512,
+        num_labels=3,
+        id2label={0: "contradiction", 1: "neutral", 2: "entailment"},
+        label2id={"contradiction": 0, "neutral": 1, "entailment": 2},
+    )
+    BartForSequenceClassification(cfg).eval().save_pretrained(out)
+    return str(out)
+
+
+@pytest.fixture
+def stub_ollama() -> Iterator[StubServer]:
+    """A local Ollama stand-in on a free port; ``.prompts`` records every chat request."""
+    server = StubServer(StubOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
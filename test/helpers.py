@@ -0,0 +1,177 @@
+import json
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from risk_analysis_agent.setting import Settings
+from risk_analysis_agent.taxonomy import canonical_labels
+
+TINY_TEXTS = [
+    "Interest rate volatility could affect our funding costs.",
+    "There is a risk of cyber attacks on our infrastructure.",
+    "New regulation may increase compliance costs and fines.",
+    "Supplier delays could disrupt production.",
+]
+
+
+@dataclass
+class FakeStore:
+    """What ``fake_store`` set up: the Settings the retriever sees and how often it loaded the embedder."""
+
+    settings: Settings
+    loads: int = 0
+
+
+class FlatEmbedder:
+    """Every text gets the same vector: no model download, and rank comes only from filters or the lexical side."""
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return [1.0, 0.5, 0.25]
+
+
+class CountingEmbedder:
+    """Deterministic text-derived vectors; ``embedded`` records every document text, ``queries`` counts query embeddings."""
+
+    def __init__(self) -> None:
+        self.embedded: list[str] = []
+        self.queries = 0
+
+    def _vector(self, text: str) -> list[float]:
+        return [float(len(text) % 7), float(sum(map(ord, text)) % 97), 1.0]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.embedded += texts
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        self.queries += 1
+        return self._vector(text)
+
+
+class FakeZSL:
+    """Deterministic stand-in: score = position of the label, scaled by text length."""
+
+    def __init__(self) -> None:
+        self.labels = canonical_labels()
+        self.calls: list[list[str]] = []
+
+    def score(self, texts: list[str]) -> list[list[tuple[str, float]]]:
+        self.calls.append(texts)
+        return [[(lab, (j + 1) / (len(self.labels) + len(t))) for j, lab in enumerate(self.labels)] for t in texts]
+
+    def classify(self, texts: list[str], top_k: int = 3) -> list[list[tuple[str, float]]]:
+        return [sorted(s, key=lambda x: x[1], reverse=True)[:top_k] for s in self.score(texts)]
+
+
+def make_pdf(path: Path, pages: list[str]) -> Path:
+    """Write a minimal text-only PDF (one Helvetica line per page) that pypdf can extract."""
+    objs = ["<< /Type /Catalog /Pages 2 0 R >>", "", "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        safe = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        stream = f"BT /F1 10 Tf 40 800 Td ({safe}) Tj ET"
+        objs.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objs.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Contents {len(objs)} 0 R /Resources << /Font << /F1 3 0 R >> >> >>")
+        kids.append(f"{len(objs)} 0 R")
+    objs[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objs, start=1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(bytes(out))
+    return path
+
+
+STUB_TOKENS = ["Liquidity", " risk", " rose", " in", " 2024", "."]
+STUB_TOKEN_DELAY = 0.05
+STUB_ANSWER_DELAY = 0.3
+
+
+class StubOllama(BaseHTTPRequestHandler):
+    """Minimal Ollama: /api/version plus /api/chat, streamed as chunked NDJSON with a delay per token (HTTP/1.1 keep-alive)."""
+
+    protocol_version = "HTTP/1.1"
+    server: "StubServer"
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1
+
+    def finish(self) -> None:
+        super().finish()
+        self.server.closed += 1
+
+    def _json(self, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _chunk(self, body: dict, last: bool = False) -> None:
+        data = json.dumps(body).encode() + b"\n"
+        # the terminator goes out with the last chunk: a client that stops reading at "done" still finds the body complete
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n" + (b"0\r\n\r\n" if last else b""))
+        self.wfile.flush()
+
+    def do_GET(self) -> None:
+        self.server.paths.append(self.path)
+        self._json({"version": "0.6.0"})
+
+    def do_POST(self) -> None:
+        self.server.paths.append(self.path)
+        req = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.prompts.append(req["messages"][-1]["content"])
+        with self.server.lock:
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+        try:
+            self._answer(req)
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+    def _answer(self, req: dict) -> None:
+        base = {"model": req["model"], "created_at": "2024-01-01T00:00:00Z"}
+        if not req.get("stream", True):
+            time.sleep(STUB_ANSWER_DELAY)
+            self._json({**base, "message": {"role": "assistant", "content": "".join(STUB_TOKENS)}, "done": True, "done_reason": "stop"})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for tok in STUB_TOKENS:
+            time.sleep(STUB_TOKEN_DELAY)
+            self._chunk({**base, "message": {"role": "assistant", "content": tok}, "done": False})
+        self._chunk({**base, "message": {"role": "assistant", "content": ""}, "done": True, "done_reason": "stop"}, last=True)
+
+
+class StubServer(ThreadingHTTPServer):
+    request_queue_size = 64  # the default backlog of 5 drops concurrent connects (1 s SYN retry)
+
+    def __init__(self, handler: type[BaseHTTPRequestHandler]) -> None:
+        super().__init__(("127.0.0.1", 0), handler)
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.prompts: list[str] = []
+        self.paths: list[str] = []
+        self.connections = 0
+        self.closed = 0  # connections the client has closed (StubOllama only)
+        self.lock = threading.Lock()
+        self.in_flight = 0  # chat requests being answered right now (StubOllama only)
+        self.max_in_flight = 0
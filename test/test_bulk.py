@@ -0,0 +1,155 @@
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from helpers import TINY_TEXTS, FakeZSL
+
+from risk_analysis_agent.bulk import classify_parquet
+from risk_analysis_agent.tagging import score_column
+from risk_analysis_agent.taxonomy import canonical_labels
+
+
+@pytest.fixture
+def chunks_parquet(tmp_path: Path) -> Path:
+    rows = [
+        {"issuer": "ACME_CORP", "fiscal_year": "2024", "filepath": f"f{i % 3}.txt", "text": f"{TINY_TEXTS[i % 4]} #{i}", "chunk_id": f"f{i % 3}.txt:::{i}"} for i in range(10)
+    ]
+    path = tmp_path / "chunks.parquet"
+    pd.DataFrame(rows).to_parquet(path, index=False)
+    return path
+
+
+class FlakyZSL(FakeZSL):
+    """Fails after ``ok_batches`` calls, to simulate a crashed run."""
+
+    def __init__(self, ok_batches: int) -> None:
+        super().__init__()
+        self.ok_batches = ok_batches
+
+    def score(self, texts: list[str]) -> list[list[tuple[str, float]]]:
+        if len(self.calls) >= self.ok_batches:
+            raise RuntimeError("worker crashed")
+        return super().score(texts)
+
+
+def test_classify_parquet_inline_writes_scores(chunks_parquet: Path, tmp_path: Path) -> None:
+    """
+    Test that every chunk gets one score column per label and input columns are kept.
+    """
+    out = tmp_path / "tagged.parquet"
+    stats = classify_parquet(str(chunks_parquet), str(out), workers=1, batch_size=4, zsl=FakeZSL(), log=lambda _: None)
+    df = pd.read_parquet(out)
+    assert len(df) == stats["chunks"] == 10  # noqa: PLR2004
+    assert {"issuer", "chunk_id", "text"} <= set(df.columns)
+    assert df[[score_column(lab) for lab in canonical_labels()]].notna().all().all()
+
+
+def test_classify_parquet_resumes_from_checkpoints(chunks_parquet: Path, tmp_path: Path) -> None:
+    """
+    Test that a restarted run only classifies chunks missing from the checkpoint parts.
+    """
+    out = tmp_path / "tagged.parquet"
+    with pytest.raises(RuntimeError, match="crashed"):
+        classify_parquet(str(chunks_parquet), str(out), workers=1, batch_size=4, zsl=FlakyZSL(ok_batches=2), log=lambda _: None)
+    assert len(list((tmp_path / "tagged.parquet.parts").glob("part-*.parquet"))) == 2  # noqa: PLR2004
+
+    zsl = FakeZSL()
+    stats = classify_parquet(str(chunks_parquet), str(out), workers=1, batch_size=4, zsl=zsl, log=lambda _: None)
+    assert stats["skipped"] == 8  # noqa: PLR2004
+    assert sum(len(c) for c in zsl.calls) == 2  # noqa: PLR2004
+    assert pd.read_parquet(out)[score_column("Market Risk")].notna().all()
+
+
+def test_resume_under_another_label_set_is_refused(chunks_parquet: Path, tmp_path: Path) -> None:
+    """
+    Test that checkpoints written with one label set are not merged into a run with another.
+    """
+    out = tmp_path / "tagged.parquet"
+    with pytest.raises(RuntimeError, match="crashed"):
+        classify_parquet(str(chunks_parquet), str(out), workers=1, batch_size=4, zsl=FlakyZSL(ok_batches=1), log=lambda _: None)
+    other = FakeZSL()
+    other.labels = other.labels[:3]
+    with pytest.raises(ValueError, match="another run"):
+        classify_parquet(str(chunks_parquet), str(out), workers=1, batch_size=4, zsl=other, log=lambda _: None)
+    assert other.calls == []
+
+
+def test_inline_run_keeps_caller_thread_settings(chunks_parquet: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that workers=1 builds its model in-process without pinning the caller's thread env or torch threads.
+    """
+    torch = pytest.importorskip("torch")
+    from risk_analysis_agent import classifier
+
+    built: list[dict] = []
+    monkeypatch.setattr(classifier, "ZeroShotRisk", lambda **kw: built.append(kw) or FakeZSL())
+    monkeypatch.setenv("OMP_NUM_THREADS", "3")
+    monkeypatch.delenv("TORCH_NUM_THREADS", raising=False)
+    torch_threads = torch.get_num_threads()
+    classify_parquet(str(chunks_parquet), str(tmp_path / "tagged.parquet"), workers=1, threads=1, model_kwargs={"model_id": "m"}, log=lambda _: None)
+    assert built == [{"cache": False, "model_id": "m"}]
+    assert (os.environ["OMP_NUM_THREADS"], os.environ.get("TORCH_NUM_THREADS"), torch.get_num_threads()) == ("3", None, torch_threads)
+
+
+def test_classify_parquet_multiprocess_matches_inline(chunks_parquet: Path, tmp_path: Path, tiny_mnli_dir: str) -> None:
+    """
+    Test that sharding across worker processes gives the same scores as one process.
+    """
+    kwargs = {"model_id": tiny_mnli_dir}
+    classify_parquet(str(chunks_parquet), str(tmp_path / "one.parquet"), workers=1, threads=1, batch_size=3, model_kwargs=kwargs, log=lambda _: None)
+    classify_parquet(str(chunks_parquet), str(tmp_path / "two.parquet"), workers=2, threads=1, batch_size=3, model_kwargs=kwargs, log=lambda _: None)
+    one = pd.read_parquet(tmp_path / "one.parquet")
+    two = pd.read_parquet(tmp_path / "two.parquet")
+    pd.testing.assert_frame_equal(one, two, atol=1e-5)
+
+
+def test_classify_reads_only_selected_store_partitions(tmp_path: Path) -> None:
+    """
+    Test that a ChunkStore input with issuer/year filters classifies only that slice.
+    """
+    from risk_analysis_agent.chunk_store import ChunkStore
+
+    rows = [
+        {"issuer": iss, "fiscal_year": "2024", "filepath": f"{iss}.txt", "text": f"{TINY_TEXTS[i]} {iss}", "chunk_id": f"{iss}.txt:::{i}"}
+        for iss in ("ACME", "BETA")
+        for i in range(4)
+    ]
+    store = ChunkStore(str(tmp_path / "chunks"))
+    store.write(pd.DataFrame(rows))
+    out = tmp_path / "tagged.parquet"
+    zsl = FakeZSL()
+    classify_parquet(str(store.root), str(out), workers=1, zsl=zsl, issuers=["BETA"], years=["2024"], log=lambda _: None)
+    df = pd.read_parquet(out)
+    assert set(df["issuer"]) == {"BETA"}
+    assert sum(len(c) for c in zsl.calls) == 4  # noqa: PLR2004
+
+
+def test_multiprocess_onnx_exports_once_in_parent(chunks_parquet: Path, tmp_path: Path, tiny_mnli_dir: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that ONNX workers load a model exported once by the parent instead of racing to export it.
+    """
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("onnx")
+    from risk_analysis_agent import onnx_backend
+
+    onnx_dir = tmp_path / "onnx"
+    monkeypatch.setenv("ZSL_ONNX_DIR", str(onnx_dir))  # spawned workers re-read the env
+    monkeypatch.setattr(onnx_backend, "ONNX_DIR", str(onnx_dir))
+    exported: list[int] = []  # inode of every file this process exported
+    export = onnx_backend.export_onnx
+    monkeypatch.setattr(onnx_backend, "export_onnx", lambda model_id, out: exported.append(export(model_id, out).stat().st_ino) or out)
+
+    kwargs = {"model_id": tiny_mnli_dir, "backend": "onnx"}
+    classify_parquet(str(chunks_parquet), str(tmp_path / "two.parquet"), workers=2, threads=1, batch_size=3, model_kwargs=kwargs, log=lambda _: None)
+    assert len(exported) == 1
+    assert [p.stat().st_ino for p in onnx_dir.rglob("*.onnx")] == exported  # a worker re-export would have replaced the file
+
+    classify_parquet(str(chunks_parquet), str(tmp_path / "one.parquet"), workers=1, threads=1, batch_size=3, model_kwargs=kwargs, log=lambda _: None)
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "one.parquet"), pd.read_parquet(tmp_path / "two.parquet"), atol=1e-5)
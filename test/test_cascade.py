@@ -0,0 +1,71 @@
+import sys
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from helpers import TINY_TEXTS
+
+from risk_analysis_agent.cascade import LabelPrefilter, recall_at_m
+from risk_analysis_agent.classifier import ZeroShotRisk
+from risk_analysis_agent.taxonomy import canonical_labels
+
+
+class HashEmbedder:
+    """Bag-of-words hashing embedder: texts sharing words get similar vectors, no model download."""
+
+    dim = 64
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        out = []
+        for t in texts:
+            v = np.zeros(self.dim, dtype=np.float32)
+            for w in t.lower().replace(",", " ").replace(".", " ").split():
+                v[zlib.crc32(w.encode()) % self.dim] += 1.0
+            out.append(v.tolist())
+        return out
+
+
+def test_prefilter_ranks_matching_description_first() -> None:
+    """
+    Test that the prefilter keeps the label whose description shares the chunk's vocabulary.
+    """
+    pre = LabelPrefilter(canonical_labels(), HashEmbedder())
+    cands = pre.candidates(["cyber attacks, data breaches, hacking and ransomware incidents"], m=2)
+    assert len(cands[0]) == 2  # noqa: PLR2004
+    assert canonical_labels().index("Cybersecurity Risk") in cands[0]
+    assert pre.candidates(["anything"], m=0) == [list(range(len(canonical_labels())))]
+
+
+def test_cascade_scores_only_candidates(tiny_mnli_dir: str) -> None:
+    """
+    Test that cascaded scoring matches full scoring on candidate labels and zeroes the others.
+    """
+    full = ZeroShotRisk(model_id=tiny_mnli_dir, cache=False)._score_texts(TINY_TEXTS)
+    zsl = ZeroShotRisk(model_id=tiny_mnli_dir, cache=False, cascade_m=3, embedder=HashEmbedder())
+    assert zsl.prefilter is not None
+    cands = zsl.prefilter.candidates(TINY_TEXTS, 3)
+    got = zsl._score_texts(TINY_TEXTS)
+    for row_full, row_got, keep in zip(full, got, cands, strict=True):
+        for j, ((lab, f), (lab2, g)) in enumerate(zip(row_full, row_got, strict=True)):
+            assert lab == lab2
+            if j in keep:
+                assert g == pytest.approx(f, abs=1e-5)
+            else:
+                assert g == 0.0
+
+
+def test_cascade_with_m_at_least_labels_is_full_scoring(tiny_mnli_dir: str) -> None:
+    zsl = ZeroShotRisk(model_id=tiny_mnli_dir, cache=False, cascade_m=len(canonical_labels()))
+    assert zsl.prefilter is None
+
+
+def test_recall_at_m() -> None:
+    full = [[("A", 0.9), ("B", 0.8), ("C", 0.1)], [("A", 0.1), ("B", 0.2), ("C", 0.3)]]
+    assert recall_at_m(full, [["A", "B"], ["C", "B"]], top_k=2) == 1.0
+    assert recall_at_m(full, [["A"], ["A"]], top_k=1) == 0.5  # noqa: PLR2004
@@ -0,0 +1,86 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from risk_analysis_agent.chunk_store import ChunkStore, read_chunks
+from risk_analysis_agent.ingest import SCHEMA, iter_record_batches, list_filings
+
+
+def _chunks(issuers: list[str], years: list[str], n: int = 3) -> pd.DataFrame:
+    rows = [
+        {"issuer": iss, "fiscal_year": y, "section": "Item 1A", "filepath": f"{iss}/{y}/a.txt", "text": f"{iss} {y} risk {i}", "chunk_id": f"{iss}/{y}/a.txt:::{i}"}
+        for iss in issuers
+        for y in years
+        for i in range(n)
+    ]
+    return pd.DataFrame(rows, columns=SCHEMA)
+
+
+def test_partitioned_write_and_pushdown_read(tmp_path: Path) -> None:
+    """
+    Test that chunks land in issuer/fiscal_year partitions and reads load only the requested slices.
+    """
+    store = ChunkStore(str(tmp_path / "chunks"))
+    assert store.write(_chunks(["ACME", "BETA CO"], ["2023", "2024"])) == 12  # noqa: PLR2004
+    assert store.partitions() == [("ACME", "2023"), ("ACME", "2024"), ("BETA CO", "2023"), ("BETA CO", "2024")]
+    assert (tmp_path / "chunks" / "issuer=ACME" / "fiscal_year=2024").is_dir()
+
+    df = store.read(issuers=["ACME"], years=[2024])
+    assert list(df.columns) == SCHEMA
+    assert set(df["text"]) == {f"ACME 2024 risk {i}" for i in range(3)}
+    assert list(store.read(years=["2023"], columns=["text"]).columns) == ["text"]
+    assert sum(b.num_rows for b in store.iter_batches(issuers=["BETA CO"])) == 6  # noqa: PLR2004
+
+
+def test_overwrite_replaces_only_written_partitions(tmp_path: Path) -> None:
+    """
+    Test that re-writing an issuer/year replaces that partition and leaves the others untouched.
+    """
+    store = ChunkStore(str(tmp_path / "chunks"))
+    store.write(_chunks(["ACME", "BETA"], ["2024"]))
+    store.write(_chunks(["ACME"], ["2024"], n=1))
+    assert len(store.read(issuers=["ACME"])) == 1
+    assert len(store.read(issuers=["BETA"])) == 3  # noqa: PLR2004
+    store.write(_chunks(["ACME"], ["2024"], n=2), overwrite=False)
+    assert len(store.read(issuers=["ACME"])) == 3  # noqa: PLR2004
+
+
+def test_streaming_ingest_into_store(tmp_path: Path) -> None:
+    """
+    Test that ingestion record batches stream into the store and read back via read_chunks.
+    """
+    d = tmp_path / "filings" / "ACME" / "2024"
+    d.mkdir(parents=True)
+    (d / "item1a.txt").write_text("Liquidity risk. " * 200, encoding="utf-8")
+    store = ChunkStore(str(tmp_path / "chunks"))
+    n = store.write(iter_record_batches(list_filings(str(tmp_path / "filings")), mode="chars", batch_rows=2))
+    assert n > 2  # noqa: PLR2004
+    assert len(read_chunks(str(store.root), issuers=["ACME"])) == n
+    assert store.write(iter([])) == 0
+
+
+def test_refresh_rewrites_only_touched_partitions(tmp_path: Path) -> None:
+    """
+    Test that refresh re-chunks every filing of a touched partition, drops emptied ones and keeps the rest.
+    """
+    base = tmp_path / "filings"
+    for iss, y in [("ACME", "2024"), ("BETA", "2024"), ("GONE", "2023")]:
+        (base / iss / y).mkdir(parents=True)
+        (base / iss / y / "a.txt").write_text(f"{iss} liquidity risk.", encoding="utf-8")
+    (base / "ACME" / "2024" / "b.txt").write_text("ACME tariff risk.", encoding="utf-8")
+    store = ChunkStore(str(tmp_path / "chunks"))
+    store.write(iter_record_batches(list_filings(str(base)), mode="chars"))
+    beta_files = sorted(p.name for p in (store.root / "issuer=BETA" / "fiscal_year=2024").iterdir())
+
+    (base / "ACME" / "2024" / "b.txt").write_text("ACME cyber risk.", encoding="utf-8")
+    for fp in (base / "GONE" / "2023").iterdir():
+        fp.unlink()
+    assert store.refresh(list_filings(str(base)), {("ACME", "2024"), ("GONE", "2023")}) == 2  # noqa: PLR2004
+    assert store.partitions() == [("ACME", "2024"), ("BETA", "2024")]
+    assert sorted(store.read(issuers=["ACME"])["text"]) == ["ACME cyber risk.", "ACME liquidity risk."]
+    assert sorted(p.name for p in (store.root / "issuer=BETA" / "fiscal_year=2024").iterdir()) == beta_files
@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from risk_analysis_agent.ingest import SCHEMA, ModelWindow, ingest_folder, make_splitter, truncation_report
+
+
+class WordTokenizer:
+    """One token per whitespace-separated word, with the HF call signature used by ModelWindow."""
+
+    def __call__(self, text: str, add_special_tokens: bool = True) -> dict:
+        return {"input_ids": list(range(len(text.split())))}
+
+
+@pytest.fixture
+def windows() -> list[ModelWindow]:
+    return [ModelWindow("embed", WordTokenizer(), 40), ModelWindow("zsl", WordTokenizer(), 60)]
+
+
+@pytest.fixture
+def long_filing(tmp_path: Path) -> Path:
+    d = tmp_path / "ACME_CORP" / "2024"
+    d.mkdir(parents=True)
+    sentences = [f"Risk factor {i} describes exposure to rates, liquidity and vendors." for i in range(120)]
+    (d / "item_1a.txt").write_text(" ".join(sentences), encoding="utf-8")
+    return tmp_path
+
+
+def test_token_mode_fits_every_window_and_records_counts(long_filing: Path, windows: list[ModelWindow]) -> None:
+    """
+    Test that token chunking keeps chunks within the smallest model window and stores token counts.
+    """
+    df = ingest_folder(str(long_filing), mode="tokens", windows=windows)
+    assert list(df.columns) == [*SCHEMA, "n_tokens_embed", "n_tokens_zsl"]
+    assert (df["n_tokens_embed"] <= 40).all()  # noqa: PLR2004
+    assert truncation_report(df["text"].tolist(), windows)["embed"]["tokens_lost"] == 0
+
+
+def test_char_mode_truncation_is_reported(long_filing: Path, windows: list[ModelWindow]) -> None:
+    """
+    Test that the report shows text lost by the fixed 1200-char chunks before token chunking.
+    """
+    df = ingest_folder(str(long_filing), mode="chars")
+    assert list(df.columns) == SCHEMA
+    report = truncation_report(df["text"].tolist(), windows)
+    assert report["embed"]["truncated_chunks"] > 0
+    assert report["embed"]["lost_pct"] > report["zsl"]["lost_pct"]
+
+
+def test_unknown_mode_rejected() -> None:
+    with pytest.raises(ValueError, match="Unsupported CHUNK_MODE"):
+        make_splitter("sentences")
@@ -0,0 +1,85 @@
+import sys
+from pathlib import Path
+
+import pytest
+import torch
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from helpers import TINY_TEXTS
+
+from risk_analysis_agent.classifier import HYPOTHESIS_TEMPLATE, MAX_LEN, ZeroShotRisk, pack_by_tokens
+
+
+def _per_text_reference(zsl: ZeroShotRisk, text: str) -> list[tuple[str, float]]:
+    """Scores one premise against every label in a single padded batch (the pre-batching behaviour)."""
+    enc = zsl.tok([text] * len(zsl.labels), [HYPOTHESIS_TEMPLATE.format(lab) for lab in zsl.labels], truncation=True, max_length=MAX_LEN, padding=True, return_tensors="pt")
+    with torch.inference_mode():
+        probs = torch.softmax(zsl.mdl(**enc).logits, dim=-1)[:, -1].tolist()
+    return list(zip(zsl.labels, probs, strict=True))
+
+
+def test_pack_by_tokens_respects_budget() -> None:
+    """
+    Test that batches never exceed the padded-token budget and cover every item exactly once.
+    """
+    lengths = [5, 40, 12, 12, 33, 7, 100]
+    batches = pack_by_tokens(lengths, budget=60)
+    assert sorted(i for b in batches for i in b) == list(range(len(lengths)))
+    for b in batches:
+        assert len(b) == 1 or len(b) * max(lengths[i] for i in b) <= 60  # noqa: PLR2004
+
+
+@pytest.mark.parametrize("budget", [16, 64, 4096])
+def test_batched_scores_match_per_text(tiny_mnli_dir: str, budget: int) -> None:
+    """
+    Test that cross-text batching returns the same scores as scoring each text on its own.
+    """
+    zsl = ZeroShotRisk(model_id=tiny_mnli_dir, token_budget=budget, cache=False)
+    batched = zsl._score_texts(TINY_TEXTS)
+    assert len(batched) == len(TINY_TEXTS)
+    for text, got in zip(TINY_TEXTS, batched, strict=True):
+        ref = _per_text_reference(zsl, text)
+        assert [lab for lab, _ in got] == [lab for lab, _ in ref]
+        for (_, a), (_, b) in zip(got, ref, strict=True):
+            assert a == pytest.approx(b, abs=1e-5)
+
+
+def test_classify_and_threshold_use_batched_scores(tiny_mnli_dir: str) -> None:
+    """
+    Test that both public methods are consistent with the batched scores.
+    """
+    zsl = ZeroShotRisk(model_id=tiny_mnli_dir, cache=False)
+    scores = zsl._score_texts(TINY_TEXTS)
+    top = zsl.classify(TINY_TEXTS, top_k=2)
+    thr = zsl.classify_threshold(TINY_TEXTS, threshold=0.0, max_labels=2)
+    for full, t, h in zip(scores, top, thr, strict=True):
+        best = sorted(full, key=lambda x: x[1], reverse=True)[:2]
+        assert t == best
+        assert h == best
+    assert zsl.classify([], top_k=3) == []
+
+
+def test_batches_are_padded_by_the_tokenizer(tiny_mnli_dir: str) -> None:
+    """
+    Test that batches follow the tokenizer's padding side and pad token, and keep every model input it returns.
+    """
+    zsl = ZeroShotRisk(model_id=tiny_mnli_dir, cache=False)
+    zsl.tok.padding_side = "left"
+    seen: list[dict[str, torch.Tensor]] = []
+    model = zsl.mdl
+
+    def recording_model(**inputs: torch.Tensor) -> torch.Tensor:
+        seen.append(inputs)
+        return model(**inputs)
+
+    zsl.mdl = recording_model
+    zsl._score_texts(TINY_TEXTS)
+    assert all(set(inputs) == set(zsl.tok.model_input_names) for inputs in seen)
+    padded = [inputs for inputs in seen if not inputs["attention_mask"].all()]
+    assert padded
+    for inputs in padded:
+        assert (inputs["attention_mask"][:, -1] == 1).all()
+        assert (inputs["input_ids"][inputs["attention_mask"] == 0] == zsl.tok.pad_token_id).all()
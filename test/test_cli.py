@@ -1,8 +1,20 @@
 # test/test_cli_smoke.py
 import subprocess
 import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
 
 
 def test_cli_help() -> None:
     """Test that the CLI help command runs successfully and exits with code 0."""
     assert subprocess.call([sys.executable, "risk_analysis_agent/cli.py", "-h"]) == 0
+
+
+def test_cache_commands_share_one_flow(tmp_path: Path) -> None:
+    """Test that zsl-cache, embed-cache and llm-cache all report stats, prune and clear through the CLI."""
+    for cmd in ("zsl-cache", "embed-cache", "llm-cache"):
+        path = str(tmp_path / cmd)
+        for action in (["stats"], ["prune", "--max-mb", "1"], ["clear"]):
+            out = subprocess.run([sys.executable, "-m", "risk_analysis_agent.cli", cmd, *action, "--path", path], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+            assert "0 entries, 0.0 MB" in out
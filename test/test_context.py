@@ -0,0 +1,80 @@
+import sys
+from pathlib import Path
+
+import pytest
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from risk_analysis_agent import context as ctx
+from risk_analysis_agent.context import build_context, estimate_tokens
+
+BOILERPLATE = (
+    "Our business is subject to numerous risks. Changes in interest rates, inflation and foreign exchange rates "
+    "could adversely affect our results of operations, financial condition and liquidity. We are exposed to "
+    "credit risk from counterparties and may incur losses if they fail to perform. Regulatory changes, including "
+    "capital and liquidity requirements, may increase our compliance costs, limit our ability to pay dividends "
+    "and require us to change business practices in ways that reduce revenue."
+)
+
+
+def _doc(cid: str, text: str) -> Document:
+    return Document(page_content=text, metadata={"chunk_id": cid})
+
+
+def test_ingest_overlap_is_sent_once() -> None:
+    """
+    Test that the character overlap between neighbouring chunks of a file is trimmed, keeping citations.
+    """
+    text = " ".join(f"Sentence {i} describes a distinct operational risk of the company." for i in range(120))
+    parts = RecursiveCharacterTextSplitter(chunk_size=1200, chunk_overlap=150).split_text(text)
+    docs = [_doc(f"ACME/2024/a.txt:::{i}", t) for i, t in enumerate(parts)]
+    packed = build_context(list(reversed(docs)), budget=100_000)  # relevance order need not be file order
+    assert packed.chunk_ids == [d.metadata["chunk_id"] for d in reversed(docs)]
+    assert packed.overlap_chars > 100 * (len(parts) - 2)
+    assert packed.tokens_saved > 0
+    assert packed.text.count("describes a distinct") == 120  # each sentence once  # noqa: PLR2004
+
+
+def test_near_duplicate_boilerplate_is_dropped() -> None:
+    """
+    Test that a chunk repeated across fiscal years with minor edits is only sent once.
+    """
+    docs = [
+        _doc("ACME/2023/a.txt:::0", BOILERPLATE),
+        _doc("ACME/2024/a.txt:::0", BOILERPLATE.replace("numerous", "many")),
+        _doc("ACME/2024/a.txt:::5", "A cyber attack on our payment systems could disrupt operations."),
+        _doc("ACME/2023/a.txt:::0", BOILERPLATE),  # same chunk retrieved twice
+    ]
+    packed = build_context(docs, budget=100_000)
+    assert packed.chunk_ids == ["ACME/2023/a.txt:::0", "ACME/2024/a.txt:::5"]
+    assert packed.duplicates == 2  # noqa: PLR2004
+    assert packed.text.startswith("[ACME/2023/a.txt:::0] Our business")
+    assert packed.tokens_saved >= 2 * estimate_tokens(BOILERPLATE)
+
+
+def test_budget_keeps_most_relevant_chunks() -> None:
+    """
+    Test that chunks are packed in relevance order until the token budget is spent.
+    """
+    docs = [_doc(f"X/2024/f{i}.txt:::0", f"Risk {i}: " + ("distinct words " * 20) + f"unique marker {i} " * (5 + i)) for i in range(10)]
+    packed = build_context(docs, budget=400)
+    assert packed.tokens_out <= 400  # noqa: PLR2004
+    assert packed.chunk_ids == [f"X/2024/f{i}.txt:::0" for i in range(len(packed.chunk_ids))]
+    assert packed.over_budget == 10 - len(packed.chunk_ids)
+    assert packed.over_budget > 0
+    assert build_context([]).text == ""
+
+
+def test_context_budget_per_model(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that CONTEXT_TOKEN_BUDGETS overrides the default budget for named models.
+    """
+    monkeypatch.setattr(ctx, "CONTEXT_TOKEN_BUDGETS", "gemma3:1b=1500, gpt-4o=12000")
+    monkeypatch.setattr(ctx, "CONTEXT_TOKEN_BUDGET", 3000)
+    assert ctx.context_budget("gemma3:1b") == 1500  # noqa: PLR2004
+    assert ctx.context_budget("gpt-4o") == 12000  # noqa: PLR2004
+    assert ctx.context_budget("mistral") == 3000  # noqa: PLR2004
@@ -0,0 +1,101 @@
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from helpers import CountingEmbedder
+
+from risk_analysis_agent import embed_cache
+from risk_analysis_agent import retriever as retr
+from risk_analysis_agent.embed_cache import CachedEmbeddings, EmbeddingCache
+
+
+def test_repeated_texts_skip_the_model(tmp_path: Path) -> None:
+    """
+    Test that cached texts are served from disk (also by a new instance) with identical vectors.
+    """
+    inner = CountingEmbedder()
+    emb = CachedEmbeddings(inner, "fake-model", EmbeddingCache("fake-model", root=str(tmp_path)))
+    first = emb.embed_documents(["a", "bb", "a"])
+    assert inner.embedded == ["a", "bb"]
+    assert emb.embed_documents(["bb", "ccc"])[0] == first[1]
+    assert inner.embedded == ["a", "bb", "ccc"]
+
+    reopened = CachedEmbeddings(inner, "fake-model", EmbeddingCache("fake-model", root=str(tmp_path)))
+    assert reopened.embed_documents(["ccc", "a"]) == [inner.embed_documents(["ccc"])[0], first[0]]
+    st = reopened.stats()
+    assert st["hits"] == 2 and st["misses"] == 0 and st["entries"] == 3  # noqa: PLR2004
+
+
+def test_models_are_namespaced_and_dims_checked(tmp_path: Path) -> None:
+    """
+    Test that caches of different models do not mix and a dimension change is rejected.
+    """
+    a = EmbeddingCache("model-a", root=str(tmp_path))
+    b = EmbeddingCache("model-b", root=str(tmp_path))
+    a.put_many({"k": np.ones(4, dtype=np.float32)})
+    assert b.get_many(["k"]) == {}
+    with pytest.raises(ValueError, match="dim"):
+        a.put_many({"k2": np.ones(8, dtype=np.float32)})
+
+
+def test_size_limit_evicts_least_recently_used(tmp_path: Path) -> None:
+    """
+    Test that exceeding max_bytes compacts the file down to the most recently used vectors.
+    """
+    cache = EmbeddingCache("m", root=str(tmp_path), max_bytes=4 * 4 * 10)  # room for 10 vectors of dim 4
+    for i in range(8):
+        cache.put_many({f"k{i}": np.full(4, i, dtype=np.float32)})
+    cache.get_many(["k0"])  # k0 becomes most recently used
+    cache.put_many({f"n{i}": np.full(4, 100 + i, dtype=np.float32) for i in range(4)})
+    assert cache.vec_path.stat().st_size <= 4 * 4 * 10
+    got = cache.get_many(["k0", "k1", "n3"])
+    assert set(got) == {"k0", "n3"}
+    assert got["k0"].tolist() == [0.0] * 4 and got["n3"].tolist() == [103.0] * 4
+    entries = cache.stats()["entries"]
+    assert cache.prune(0) == 0  # 0 = unlimited, as for max_bytes, not "drop everything"
+    assert cache.stats()["entries"] == entries
+    cache.clear()
+    assert cache.stats()["entries"] == 0
+
+
+def test_read_is_consistent_with_a_concurrent_prune(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that another process compacting the file mid-read never hands back vectors of other texts.
+    """
+    reader = EmbeddingCache("m", root=str(tmp_path), max_bytes=0)
+    writer = EmbeddingCache("m", root=str(tmp_path), max_bytes=0)  # second connection, as another process would have
+    writer.put_many({f"k{i}": np.full(4, i, dtype=np.float32) for i in range(8)})
+    writer.get_many(["k6", "k7"])  # most recently used: the prune below keeps them and moves them to rows 0-1
+
+    pruner = threading.Thread(target=writer.prune, args=(2 * 4 * 4,))
+    vectors = reader._vectors
+
+    def prune_between_index_and_vectors(dim: int, rows_needed: int) -> np.ndarray:
+        pruner.start()
+        pruner.join(0.3)  # without the lock it finishes here, between the row lookup and the vector read
+        return vectors(dim, rows_needed)
+
+    monkeypatch.setattr(reader, "_vectors", prune_between_index_and_vectors)
+    got = reader.get_many(["k0", "k1"])
+    pruner.join()
+    assert {k: v.tolist() for k, v in got.items()} == {"k0": [0.0] * 4, "k1": [1.0] * 4}
+    assert writer.stats()["entries"] == 2  # noqa: PLR2004
+
+
+def test_registry_embedder_is_cached(counting_store: CountingEmbedder, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """
+    Test that get_embedder wraps the model in the cache, so re-indexing a rebuilt collection embeds nothing.
+    """
+    monkeypatch.setattr(embed_cache, "EMBED_CACHE_DIR", str(tmp_path / "emb"))
+    chunks = [{"issuer": "ACME", "fiscal_year": "2024", "chunk_id": f"ACME/2024/a.txt:::{i}", "text": f"risk text {i}"} for i in range(5)]
+    retr.index_chunks(iter(chunks), "first")
+    retr.index_chunks(iter(chunks), "second")  # A/B collection: same texts
+    assert len(counting_store.embedded) == 5  # noqa: PLR2004
+    assert isinstance(retr.get_embedder(), CachedEmbeddings)
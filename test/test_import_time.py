@@ -0,0 +1,30 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+# packages that take seconds to import; they must load with the first model/client, never on import
+HEAVY = ("torch", "transformers", "streamlit", "chromadb", "langchain_chroma", "langchain_huggingface", "langchain_anthropic", "langchain_openai", "langchain_ollama")
+ENTRY_POINTS = ("risk_analysis_agent.cli", "risk_analysis_agent.classifier", "risk_analysis_agent.public_api")
+
+
+def _imported_modules(module: str) -> set[str]:
+    """Names of every module loaded by ``import module`` in a fresh interpreter, from ``-X importtime``."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=root, capture_output=True, text=True, check=True)
+    return {line.split("|")[-1].strip() for line in proc.stderr.splitlines() if line.startswith("import time:") and "|" in line}
+
+
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_headless_import_avoids_heavy_modules(module: str) -> None:
+    """
+    Test that the library entry points import without Streamlit or model runtimes.
+    """
+    modules = _imported_modules(module)
+    assert module in modules
+    assert not [name for name in HEAVY if name in modules]
+    assert "risk_analysis_agent.ui_streamlit" not in modules
@@ -0,0 +1,160 @@
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from helpers import CountingEmbedder, FakeZSL
+
+from risk_analysis_agent import indexer
+from risk_analysis_agent import retriever as retr
+
+
+def _write(base: Path, issuer: str, name: str, text: str) -> Path:
+    fp = base / issuer / "2024" / name
+    fp.parent.mkdir(parents=True, exist_ok=True)
+    fp.write_text(text, encoding="utf-8")
+    return fp
+
+
+def _para(word: str, n: int = 40) -> str:
+    return " ".join([word] * n)
+
+
+def test_sync_is_incremental_and_idempotent(counting_store: CountingEmbedder, tmp_path: Path) -> None:
+    """
+    Test that a second sync embeds nothing, an edit re-embeds only new chunks, and removals are deleted.
+    """
+    base = tmp_path / "filings"
+    a = _write(base, "ACME", "item1a.txt", _para("supply") + "\n\n" + _para("cyber"))
+    _write(base, "BETA", "item1a.txt", _para("liquidity"))
+
+    first = indexer.sync_folder(str(base))
+    assert len(first.added_files) == 2  # noqa: PLR2004
+    assert first.chunks_embedded == len(counting_store.embedded) > 0
+    n_ids = len(retr.get_vectorstore().get(include=[])["ids"])
+
+    second = indexer.sync_folder(str(base))
+    assert second.unchanged_files == 2  # noqa: PLR2004
+    assert second.chunks_embedded == 0
+    assert len(retr.get_vectorstore().get(include=[])["ids"]) == n_ids
+
+    a.write_text(_para("supply") + "\n\n" + _para("inflation"), encoding="utf-8")
+    third = indexer.sync_folder(str(base))
+    assert third.changed_files == [str(a.resolve())]
+    assert third.chunks_embedded >= 1
+    assert third.chunks_deleted >= 1
+    docs = retr.get_vectorstore().get(include=["documents"])["documents"]
+    assert not any("cyber" in d for d in docs)
+
+    a.unlink()
+    fourth = indexer.sync_folder(str(base))
+    assert fourth.removed_files == [str(a.resolve())]
+    docs = retr.get_vectorstore().get(include=["documents"])["documents"]
+    assert docs and all("liquidity" in d for d in docs)
+
+
+def test_same_text_in_two_issuers_gets_two_ids(counting_store: CountingEmbedder, tmp_path: Path) -> None:
+    """
+    Test that identical filings under different issuers do not collide.
+    """
+    base = tmp_path / "filings"
+    _write(base, "ACME", "item1a.txt", _para("tariffs"))
+    _write(base, "BETA", "item1a.txt", _para("tariffs"))
+    indexer.sync_folder(str(base))
+    metas = retr.get_vectorstore().get(include=["metadatas"])["metadatas"]
+    assert sorted(m["issuer"] for m in metas) == ["ACME", "BETA"]
+
+
+def test_export_collection(counting_store: CountingEmbedder, tmp_path: Path) -> None:
+    """
+    Test that export_collection snapshots text and metadata to parquet.
+    """
+    base = tmp_path / "filings"
+    _write(base, "ACME", "item1a.txt", _para("supply"))
+    indexer.sync_folder(str(base))
+    df = indexer.export_collection(str(tmp_path / "out.parquet"))
+    assert (tmp_path / "out.parquet").exists()
+    assert set(df["issuer"]) == {"ACME"}
+    assert "text" in df.columns
+
+
+def test_index_chunks_streams_in_bounded_batches(counting_store: CountingEmbedder, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that index_chunks consumes a generator lazily, embeds per batch and caps upsert sizes.
+    """
+    calls: list[int] = []
+    embed = counting_store.embed_documents
+    monkeypatch.setattr(counting_store, "embed_documents", lambda texts: calls.append(len(texts)) or embed(texts))
+    consumed = 0
+
+    def gen() -> Iterator[dict]:
+        nonlocal consumed
+        for i in range(25):
+            consumed += 1
+            yield {"issuer": "ACME", "fiscal_year": "2024", "chunk_id": f"ACME/2024/a.txt:::{i}", "text": f"chunk {i % 20}", "note": None}
+
+    logs: list[str] = []
+    stats = retr.index_chunks(gen(), embed_batch=10, write_batch=7, log=logs.append)
+    assert consumed == stats.seen == 25  # noqa: PLR2004
+    assert calls == [10, 10]  # 5 duplicate texts skipped, the last batch had nothing new
+    assert stats.embedded == 20 and stats.skipped == 5  # noqa: PLR2004
+    assert logs and stats.peak_rss_mb > 0
+    assert len(retr.get_vectorstore().get(include=[])["ids"]) == 20  # noqa: PLR2004
+    assert retr.index_chunks(gen(), embed_batch=10).embedded == 0
+
+
+def test_untagged_chunks_get_scores_without_reembedding(counting_store: CountingEmbedder, tmp_path: Path) -> None:
+    """
+    Test that chunks indexed without label scores are tagged later by a tagged re-index or retag_collection.
+    """
+    from risk_analysis_agent.ingest import ingest_files
+    from risk_analysis_agent.tagging import tag_dataframe, tags_from_metadata
+
+    base = tmp_path / "filings"
+    _write(base, "ACME", "item1a.txt", _para("supply") + "\n\n" + _para("cyber"))
+    _write(base, "BETA", "item1a.txt", _para("liquidity"))
+    indexer.sync_folder(str(base))  # no classifier: stored without scores
+    embedded = len(counting_store.embedded)
+
+    df = tag_dataframe(ingest_files([base / "ACME" / "2024" / "item1a.txt"]), FakeZSL())
+    stats = retr.index_chunks(df.to_dict("records"))
+    assert (stats.embedded, stats.retagged) == (0, len(df))
+    metas = retr.get_vectorstore().get(include=["metadatas"])["metadatas"]
+    assert sorted(m["issuer"] for m in metas if tags_from_metadata(m)) == ["ACME"] * len(df)
+
+    zsl = FakeZSL()
+    assert indexer.retag_collection(lambda: zsl) == len(metas) - len(df)
+    assert sum(len(c) for c in zsl.calls) == len(metas) - len(df)
+    assert all(tags_from_metadata(m) for m in retr.get_vectorstore().get(include=["metadatas"])["metadatas"])
+    assert len(counting_store.embedded) == embedded
+
+    def _no_model() -> FakeZSL:
+        raise AssertionError("nothing left to tag")
+
+    assert indexer.retag_collection(_no_model) == 0
+
+
+def test_sync_builds_classifier_only_for_new_chunks(counting_store: CountingEmbedder, tmp_path: Path) -> None:
+    """
+    Test that a no-op incremental sync never calls the classifier factory.
+    """
+    from risk_analysis_agent.tagging import tags_from_metadata
+
+    base = tmp_path / "filings"
+    _write(base, "ACME", "item1a.txt", _para("supply"))
+    built: list[FakeZSL] = []
+
+    def get_zsl() -> FakeZSL:
+        built.append(FakeZSL())
+        return built[-1]
+
+    indexer.sync_folder(str(base), get_zsl=get_zsl)
+    assert len(built) == 1
+    assert all(tags_from_metadata(m) for m in retr.get_vectorstore().get(include=["metadatas"])["metadatas"])
+    assert indexer.sync_folder(str(base), get_zsl=get_zsl).unchanged_files == 1
+    assert len(built) == 1
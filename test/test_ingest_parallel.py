@@ -0,0 +1,42 @@
+import sys
+from pathlib import Path
+
+import pyarrow as pa
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from risk_analysis_agent.ingest import PARALLEL_MIN_FILES, SCHEMA, ingest_folder, iter_chunks, iter_record_batches, list_filings
+
+
+def _tree(base: Path, n: int) -> Path:
+    for i in range(n):
+        d = base / f"ISSUER_{i % 7}" / str(2020 + i % 4)
+        d.mkdir(parents=True, exist_ok=True)
+        (d / f"item1a_{i}.txt").write_text(" ".join(f"Risk {i}.{j} affects liquidity and supply." for j in range(60)), encoding="utf-8")
+    return base
+
+
+def test_parallel_ingest_matches_serial(tmp_path: Path) -> None:
+    """
+    Test that a 2-process ingest yields exactly the serial chunks, in the same order.
+    """
+    base = _tree(tmp_path, PARALLEL_MIN_FILES + 6)
+    serial = ingest_folder(str(base), mode="chars", workers=1)
+    parallel = ingest_folder(str(base), mode="chars", workers=2)
+    assert list(parallel.columns) == SCHEMA
+    assert parallel.equals(serial)
+
+
+def test_iter_chunks_is_lazy_and_batches_are_bounded(tmp_path: Path) -> None:
+    """
+    Test that iter_chunks yields before reading every file and record batches respect batch_rows.
+    """
+    base = _tree(tmp_path, 3)
+    fps = list_filings(str(base))
+    first = next(iter_chunks(iter(fps), mode="chars", workers=1))
+    assert set(first) == set(SCHEMA)
+    batches = list(iter_record_batches(fps, mode="chars", workers=1, batch_rows=2))
+    assert all(isinstance(b, pa.RecordBatch) and b.num_rows <= 2 for b in batches)  # noqa: PLR2004
+    assert sum(b.num_rows for b in batches) == len(ingest_folder(str(base), mode="chars"))
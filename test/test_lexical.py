@@ -0,0 +1,96 @@
+import sys
+from pathlib import Path
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from helpers import FakeStore
+
+from risk_analysis_agent import retriever as retr
+from risk_analysis_agent.lexical import LexicalIndex, matches, rrf_fuse, tokenize
+
+
+def _chunks() -> list[dict]:
+    texts = [f"General operating risk discussion number {i} about markets and competition." for i in range(30)]
+    texts[17] = "Our notes reference LIBOR and we must disclose under Regulation S-K Item 105."
+    issuers = ["ACME" if i % 2 else "BETA" for i in range(30)]
+    return [{"issuer": iss, "fiscal_year": "2024", "chunk_id": f"{iss}/2024/a.txt:::{i}", "text": t} for i, (iss, t) in enumerate(zip(issuers, texts, strict=True))]
+
+
+def test_tokenize_keeps_compound_terms() -> None:
+    """
+    Test that filing identifiers survive tokenisation whole and as parts.
+    """
+    toks = tokenize("Regulation S-K, 10-K and LIBOR.")
+    assert {"regulation", "s-k", "10-k", "10", "libor"} <= set(toks)
+    assert "s" not in toks
+
+
+def test_where_filter_semantics() -> None:
+    """
+    Test that the in-process filter follows Chroma's where syntax.
+    """
+    meta = {"issuer": "ACME", "fiscal_year": "2024", "page": 3}
+    assert matches(meta, {"issuer": "ACME"})
+    assert matches(meta, {"$and": [{"issuer": {"$in": ["ACME", "BETA"]}}, {"page": {"$gte": 2}}]})
+    assert not matches(meta, {"$or": [{"issuer": "BETA"}, {"fiscal_year": {"$ne": "2024"}}]})
+    assert rrf_fuse([["a", "b"], ["b", "c"]], k=2) == ["b", "a"]
+
+
+def test_hybrid_finds_exact_term_with_small_k(flat_store: FakeStore) -> None:
+    """
+    Test that hybrid retrieval returns the chunk naming LIBOR among only 3 results.
+    FlatEmbedder gives every text the same vector, so only the lexical side can rank the exact term.
+    """
+    retr.index_chunks(iter(_chunks()))
+    docs = retr.get_retriever(k=3, search_type="hybrid").invoke("LIBOR exposure")
+    assert len(docs) == 3  # noqa: PLR2004
+    hit = [d for d in docs if "LIBOR" in d.page_content]
+    assert hit and hit[0].metadata["issuer"] == "ACME"
+
+    beta = retr.get_retriever(k=3, where={"issuer": "BETA"}, search_type="hybrid").invoke("LIBOR exposure")
+    assert {d.metadata["issuer"] for d in beta} == {"BETA"}
+
+
+def test_index_persists_removes_and_rebuilds(flat_store: FakeStore) -> None:
+    """
+    Test that the BM25 index is saved next to Chroma, drops removed ids and can be rebuilt.
+    """
+    retr.index_chunks(iter(_chunks()))
+    path = Path(flat_store.settings.chroma_persist_dir) / "risk_docs.bm25.json.gz"
+    assert len(LexicalIndex(path)) == 30  # noqa: PLR2004
+    top = LexicalIndex(path).search("Regulation S-K", k=1)[0][0]
+
+    lex = LexicalIndex(path)
+    lex.remove([top])
+    lex.save()
+    assert len(LexicalIndex(path)) == 29  # noqa: PLR2004
+    assert all(cid != top for cid, _ in LexicalIndex(path).search("Regulation S-K"))
+
+    path.unlink()
+    retr.reset_lexical_indexes()
+    assert retr.rebuild_lexical_index() == 30  # noqa: PLR2004
+    assert LexicalIndex(path).search("LIBOR", k=1)[0][0] == top
+
+
+def test_concurrent_indexers_merge_their_postings(tmp_path: Path) -> None:
+    """
+    Test that two writers of one index file (e.g. CLI and UI) keep each other's adds and removes on save.
+    """
+    path = tmp_path / "risk_docs.bm25.json.gz"
+    seed = LexicalIndex(path)
+    seed.add(["old"], ["stale liquidity note"], [{"issuer": "ACME"}])
+    seed.save()
+
+    cli, ui = LexicalIndex(path), LexicalIndex(path)
+    cli.add(["cli"], ["tariff exposure"], [{"issuer": "ACME"}])
+    cli.remove(["old"])
+    ui.add(["ui"], ["cyber incident"], [{"issuer": "BETA"}])
+    cli.save()
+    ui.save()  # loaded before cli saved: must merge, not overwrite
+
+    merged = LexicalIndex(path)
+    assert sorted(merged.ids) == ["cli", "ui"]
+    assert merged.search("tariff", k=1)[0][0] == "cli"
+    assert merged.search("cyber", k=1)[0][0] == "ui"
@@ -0,0 +1,101 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from helpers import STUB_TOKENS, StubServer
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+from risk_analysis_agent import llm as llm_mod
+from risk_analysis_agent import llm_cache
+from risk_analysis_agent.llm_cache import CacheMissError, ResponseCache
+from risk_analysis_agent.setting import Settings
+
+ANSWER = "".join(STUB_TOKENS)
+
+
+@pytest.fixture
+def cache_path(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, stub_ollama: StubServer) -> Path:
+    path = tmp_path / "llm.sqlite"
+    llm_cache.close_response_caches()
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_PATH", str(path))
+    monkeypatch.setattr(llm_mod, "Settings", lambda: Settings(llm_provider="ollama", llm_model="stub", ollama_base_url=stub_ollama.url))
+    yield path
+    llm_cache.close_response_caches()
+
+
+def test_repeat_prompts_are_served_from_cache(cache_path: Path, stub_ollama: StubServer) -> None:
+    """
+    Test that invoke and stream_text share cached answers and that use_cache=False regenerates.
+    """
+    llm = llm_mod.get_llm(temperature=0.0)
+    assert llm.invoke("Summarize ACME 2024").content == ANSWER
+    assert llm.invoke("Summarize ACME 2024").content == ANSWER
+    assert "".join(llm_mod.stream_text(llm, "Summarize ACME 2024")) == ANSWER
+    assert stub_ollama.prompts == ["Summarize ACME 2024"]
+
+    assert "".join(llm_mod.stream_text(llm, "Q&A: liquidity?")) == ANSWER  # streamed, then stored
+    assert llm.invoke("Q&A: liquidity?").content == ANSWER
+    assert "".join(llm_mod.stream_text(llm, "Q&A: liquidity?", use_cache=False)) == ANSWER
+    assert stub_ollama.prompts.count("Q&A: liquidity?") == 2  # noqa: PLR2004
+
+    other = llm_mod.get_llm(model="other-model", temperature=0.0)
+    other.invoke("Summarize ACME 2024")  # different model: separate entry
+    assert stub_ollama.prompts.count("Summarize ACME 2024") == 2  # noqa: PLR2004
+
+
+def test_hot_temperature_and_explicit_bypass(cache_path: Path, stub_ollama: StubServer) -> None:
+    """
+    Test that sampling above LLM_CACHE_MAX_TEMPERATURE, or cache=False, never replays answers.
+    """
+    for llm in (llm_mod.get_llm(temperature=0.9), llm_mod.get_llm(temperature=0.0, cache=False)):
+        assert llm.cache is False
+        llm.invoke("Summarize")
+        llm.invoke("Summarize")
+    assert len(stub_ollama.prompts) == 4  # noqa: PLR2004
+
+
+def test_replay_mode_needs_no_model(cache_path: Path, stub_ollama: StubServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that LLM_CACHE_MODE=replay answers recorded prompts offline and raises on unknown ones.
+    """
+    llm_mod.get_llm(temperature=0.0).invoke("Summarize ACME 2024")
+    llm_cache.close_response_caches()
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_MODE", "replay")
+    monkeypatch.setattr(llm_mod, "Settings", lambda: Settings(llm_provider="ollama", llm_model="stub", ollama_base_url="http://127.0.0.1:9"))
+    llm = llm_mod.get_llm(temperature=0.0)  # no liveness check against the dead URL
+    assert llm.invoke("Summarize ACME 2024").content == ANSWER
+    with pytest.raises(CacheMissError):
+        llm.invoke("never recorded")
+
+
+def test_ttl_and_size_limit(tmp_path: Path) -> None:
+    """
+    Test that expired entries are ignored and the table is pruned least-recently-used first.
+    """
+    gen = [ChatGeneration(message=AIMessage(content="x" * 2000))]
+    cache = ResponseCache(str(tmp_path / "c.sqlite"), namespace="ns", ttl_s=0.2, max_bytes=0)
+    cache.update("p", "llm", gen)
+    assert cache.lookup("p", "llm")[0].text == "x" * 2000
+    time.sleep(0.3)
+    assert cache.lookup("p", "llm") is None
+    assert cache.prune() == 1
+    cache.update("q", "llm", gen)
+    assert cache.prune(0) == 0  # 0 = unlimited, as for max_bytes: only expired entries go
+    assert cache.lookup("q", "llm") is not None
+
+    cache = ResponseCache(str(tmp_path / "d.sqlite"), ttl_s=0, max_bytes=6000)
+    for i in range(5):
+        cache.update(f"p{i}", "llm", gen)
+        cache.lookup("p0", "llm")  # keep p0 recently used
+    st = cache.stats()
+    assert st["bytes"] <= 6000  # noqa: PLR2004
+    assert cache.lookup("p0", "llm") is not None
+    assert cache.lookup("p1", "llm") is None
+    cache.close()
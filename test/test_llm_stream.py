@@ -0,0 +1,68 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from helpers import STUB_TOKENS, StubServer
+
+from risk_analysis_agent import llm as llm_mod
+from risk_analysis_agent.setting import Settings
+
+
+@pytest.fixture
+def stub_llm(monkeypatch: pytest.MonkeyPatch, stub_ollama: StubServer) -> object:
+    monkeypatch.setattr(llm_mod, "Settings", lambda: Settings(llm_provider="ollama", llm_model="stub", ollama_base_url=stub_ollama.url))
+    return llm_mod.get_llm()
+
+
+def test_stream_first_token_arrives_before_the_answer_is_done(stub_llm: object) -> None:
+    """
+    Test that stream_text yields tokens as the server sends them (time-to-first-token << total).
+    """
+    t0 = time.perf_counter()
+    pieces, first = [], None
+    for piece in llm_mod.stream_text(stub_llm, "Summarize"):
+        first = first or time.perf_counter() - t0
+        pieces.append(piece)
+    total = time.perf_counter() - t0
+    assert "".join(pieces) == "".join(STUB_TOKENS)
+    assert len(pieces) == len(STUB_TOKENS)
+    assert first < total / 2
+
+    async def collect() -> list[str]:
+        return [p async for p in llm_mod.astream_text(stub_llm, "Summarize")]
+
+    assert "".join(asyncio.run(collect())) == "".join(STUB_TOKENS)
+
+
+def test_concurrent_prompts_overlap(stub_llm: object, stub_ollama: StubServer) -> None:
+    """
+    Test that generate_many keeps `concurrency` requests in flight, and no more.
+    """
+    prompts = [f"prompt {i}" for i in range(8)]
+    answers = llm_mod.generate_many(stub_llm, prompts, concurrency=8)
+    assert answers == ["".join(STUB_TOKENS)] * 8
+    assert stub_ollama.max_in_flight == 8  # noqa: PLR2004
+
+    stub_ollama.max_in_flight = 0
+    llm_mod.generate_many(stub_llm, prompts[:4], concurrency=2)
+    assert stub_ollama.max_in_flight == 2  # noqa: PLR2004
+
+
+def test_helpers_fall_back_to_invoke() -> None:
+    """
+    Test that clients without stream/ainvoke still work through the helpers.
+    """
+
+    class Blocking:
+        def invoke(self, prompt: str) -> str:
+            return prompt.upper()
+
+    assert list(llm_mod.stream_text(Blocking(), "abc")) == ["ABC"]
+    assert llm_mod.generate_many(Blocking(), ["a", "b"], concurrency=2) == ["A", "B"]
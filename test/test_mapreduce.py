@@ -0,0 +1,102 @@
+import asyncio
+import re
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+from langchain_core.documents import Document
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from risk_analysis_agent.mapreduce import amap_reduce, filing_chunks, group_chunks, summarize_filing
+
+CHUNK_ID = re.compile(r"[A-Z]+/\d{4}/[\w.]+:::\d+")
+
+
+class EchoLLM:
+    """Async stand-in for a remote model: answers with the chunk_ids of its prompt after a fixed delay."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prompts: list[str] = []
+
+    async def ainvoke(self, prompt: str) -> str:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        self.prompts.append(prompt)
+        return "- Risk Category: Market\n  - Evidence (chunk_ids): " + ", ".join(dict.fromkeys(CHUNK_ID.findall(prompt)))
+
+
+def _filing(n: int, chars: int = 2000) -> list[Document]:
+    return [Document(page_content=f"risk {i} " + "x" * chars, metadata={"chunk_id": f"ACME/2024/10k.txt:::{i}"}) for i in range(n)]
+
+
+def test_group_chunks_keeps_order_within_budget() -> None:
+    """
+    Test that chunks are grouped consecutively under the token budget, an oversized chunk alone.
+    """
+    docs = [*_filing(5, chars=400), Document(page_content="y" * 8000, metadata={"chunk_id": "ACME/2024/10k.txt:::5"})]
+    groups = group_chunks(docs, 250)
+    assert [len(g) for g in groups] == [2, 2, 1, 1]
+    assert [d for g in groups for d in g] == docs
+
+
+def test_map_reduce_is_concurrent_hierarchical_and_keeps_citations() -> None:
+    """
+    Test that map calls overlap, partials reduce in log rounds and every chunk_id reaches the final summary.
+    """
+    docs = _filing(16)
+    llm = EchoLLM(0.05)
+    res = asyncio.run(amap_reduce(llm, docs, "ACME", 2024, concurrency=8, group_tokens=1100, fan_in=4))
+    assert res.groups == 8  # noqa: PLR2004
+    assert res.levels == 2  # noqa: PLR2004
+    assert res.llm_calls == 8 + 2 + 1
+    assert llm.max_in_flight == 8  # noqa: PLR2004  all map calls overlap
+    assert res.cited == [d.metadata["chunk_id"] for d in docs]
+    assert "Part 1:" in llm.prompts[-1]
+
+
+def test_map_reduce_bounds_concurrency_and_skips_lone_partials() -> None:
+    """
+    Test that no more than ``concurrency`` calls run at once and a leftover partial is not re-summarized.
+    """
+    llm = EchoLLM(0.01)
+    res = asyncio.run(amap_reduce(llm, _filing(5), "ACME", 2024, concurrency=2, group_tokens=600, fan_in=2))
+    assert llm.max_in_flight == 2  # noqa: PLR2004
+    # 5 maps -> 2 merges (+1 carried) -> 1 merge (+1 carried) -> 1 merge
+    assert (res.groups, res.levels, res.llm_calls) == (5, 3, 5 + 2 + 1 + 1)
+    assert asyncio.run(amap_reduce(llm, [], "ACME", 2024)).summary == ""
+
+
+class FakeStore:
+    """Chroma stand-in serving stored chunks out of order, in pages."""
+
+    def __init__(self, ids: list[str]) -> None:
+        self.ids = ids
+        self.calls: list[dict] = []
+
+    def get(self, where: dict, include: list[str], limit: int, offset: int) -> dict:
+        self.calls.append(where)
+        ids = self.ids[offset : offset + limit]
+        return {"ids": ids, "documents": [f"text {i}" for i in ids], "metadatas": [{"chunk_id": i, "filepath": i.split(":::")[0]} for i in ids]}
+
+
+def test_summarize_filing_reads_whole_filing_in_order() -> None:
+    """
+    Test that summarize_filing pages through every chunk of the issuer/year and cites them with their file.
+    """
+    ids = ["ACME/2024/b.txt:::0", "ACME/2024/a.txt:::10", "ACME/2024/a.txt:::2", "ACME/2024/a.txt:::1"]
+    store = FakeStore(ids)
+    with patch("risk_analysis_agent.mapreduce.get_vectorstore", return_value=store):
+        assert [d.id for d in filing_chunks("ACME", 2024, batch=3)] == ["ACME/2024/a.txt:::1", "ACME/2024/a.txt:::2", "ACME/2024/a.txt:::10", "ACME/2024/b.txt:::0"]
+        assert store.calls[0] == {"$and": [{"issuer": "ACME"}, {"$or": [{"fiscal_year": "2024"}, {"fiscal_year": 2024}]}]}
+        res = summarize_filing("ACME", 2024, llm=EchoLLM(0))
+    assert res["stats"] == {"chunks": 4, "groups": 1, "levels": 0, "llm_calls": 1}
+    assert res["sources"][0] == {"path": "ACME/2024/a.txt", "chunk_id": "ACME/2024/a.txt:::1", "page": None}
+    assert len(res["sources"]) == len(ids)
@@ -0,0 +1,91 @@
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from helpers import FakeStore
+from langchain_chroma.vectorstores import maximal_marginal_relevance
+
+from risk_analysis_agent import retriever as retr
+from risk_analysis_agent.mmr import mmr_select
+
+
+class HashEmbedder:
+    """Deterministic 8-dim vectors derived from the text, so neighbours are stable."""
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        rng = np.random.default_rng(sum(map(ord, text)))
+        return rng.normal(size=8).tolist()
+
+
+@pytest.fixture
+def store(fake_store: Callable[..., FakeStore]) -> FakeStore:
+    return fake_store(HashEmbedder(), mmr_fetch_k=12, mmr_lambda=0.3)
+
+
+@pytest.mark.parametrize("lambda_mult", [0.0, 0.5, 1.0])
+def test_mmr_select_matches_langchain(lambda_mult: float) -> None:
+    """
+    Test that the vectorised selection picks the same candidates, in the same order, as LangChain's loop.
+    """
+    rng = np.random.default_rng(7)
+    query, cands = rng.normal(size=16), rng.normal(size=(40, 16))
+    assert mmr_select(query, cands, 10, lambda_mult) == maximal_marginal_relevance(query, list(cands), lambda_mult, 10)
+    assert mmr_select(query, cands[:3], 10) == maximal_marginal_relevance(query, list(cands[:3]), 0.5, 10)
+    assert mmr_select(query, cands[:0], 5) == []
+
+
+def test_retriever_uses_one_query_with_settings(store: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that MMR retrieval fetches candidates and embeddings in one Chroma call, honouring MMR_FETCH_K/MMR_LAMBDA.
+    """
+    chunks = [{"issuer": "ACME" if i % 3 else "BETA", "fiscal_year": "2024", "chunk_id": f"X/2024/a.txt:::{i}", "text": f"risk factor {i}"} for i in range(30)]
+    retr.index_chunks(iter(chunks))
+    vs = retr.get_vectorstore()
+    calls = []
+    query = vs._collection.query
+    monkeypatch.setattr(vs._collection, "query", lambda **kw: calls.append(kw) or query(**kw))
+
+    docs = retr.get_retriever(k=5, where={"issuer": "ACME"}, search_type="mmr").invoke("liquidity")
+    assert len(calls) == 1
+    assert calls[0]["n_results"] == 20  # 4 * k  # noqa: PLR2004
+    assert "embeddings" in calls[0]["include"]
+    assert len(docs) == 5  # noqa: PLR2004
+    assert {d.metadata["issuer"] for d in docs} == {"ACME"}
+    assert all(d.id for d in docs)
+
+    expected = vs.max_marginal_relevance_search("liquidity", k=5, fetch_k=20, lambda_mult=0.3, filter={"issuer": "ACME"})
+    assert {d.id for d in docs} == {d.id for d in expected}
+
+    retr.get_retriever(k=2, search_type="mmr").invoke("liquidity")
+    assert calls[-1]["n_results"] == 12  # MMR_FETCH_K is the floor  # noqa: PLR2004
+
+
+def test_mmr_at_k_equal_fetch_k_still_diversifies(store: FakeStore, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that MMR and hybrid size their pools alike, and k == MMR_FETCH_K still draws from a larger pool than k.
+    """
+    k = store.settings.mmr_fetch_k
+    chunks = [{"issuer": "ACME", "fiscal_year": "2024", "chunk_id": f"X/2024/a.txt:::{i}", "text": f"risk factor {i}"} for i in range(80)]
+    retr.index_chunks(iter(chunks))
+    vs = retr.get_vectorstore()
+    calls = []
+    query = vs._collection.query
+    monkeypatch.setattr(vs._collection, "query", lambda **kw: calls.append(kw) or query(**kw))
+
+    docs = retr.get_retriever(k=k, search_type="mmr").invoke("liquidity")
+    assert calls[-1]["n_results"] == retr.fetch_size(k) == 4 * k
+    nearest = [d.id for d in vs.similarity_search("liquidity", k=k)]
+    assert {d.id for d in docs} != set(nearest)  # re-selected from the wider pool, not just re-ordered
+    retr.get_retriever(k=k, search_type="hybrid").invoke("liquidity")
+    assert calls[-1]["n_results"] == 4 * k
+    assert retr.fetch_size(k, fetch_k=k + 1) == k + 1  # an explicit fetch_k pins the pool
@@ -0,0 +1,86 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("onnx")
+
+from helpers import TINY_TEXTS
+
+from risk_analysis_agent import onnx_backend
+from risk_analysis_agent.classifier import ZeroShotRisk
+
+
+@pytest.fixture
+def onnx_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point the ONNX export cache at a temp dir."""
+    monkeypatch.setattr(onnx_backend, "ONNX_DIR", str(tmp_path / "onnx"))
+    return tmp_path / "onnx"
+
+
+@pytest.mark.parametrize(("backend", "tol"), [("onnx", 1e-4), ("onnx-int8", 5e-2)])
+def test_onnx_scores_match_torch(tiny_mnli_dir: str, onnx_dir: Path, backend: str, tol: float) -> None:
+    """
+    Test entailment-score parity between the torch path and ONNX Runtime (fp32 and int8).
+    """
+    ref = ZeroShotRisk(model_id=tiny_mnli_dir, cache=False)._score_texts(TINY_TEXTS)
+    got = ZeroShotRisk(model_id=tiny_mnli_dir, cache=False, backend=backend)._score_texts(TINY_TEXTS)
+    for r_row, g_row in zip(ref, got, strict=True):
+        for (r_lab, r_sc), (g_lab, g_sc) in zip(r_row, g_row, strict=True):
+            assert r_lab == g_lab
+            assert g_sc == pytest.approx(r_sc, abs=tol)
+
+
+def test_onnx_export_is_cached(tiny_mnli_dir: str, onnx_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that the model is exported once and reused by later instances.
+    """
+    ZeroShotRisk(model_id=tiny_mnli_dir, cache=False, backend="onnx-int8")
+    files = sorted(p.name for p in onnx_dir.rglob("*.onnx"))
+    assert files == ["model-int8.onnx", "model.onnx"]
+
+    def _no_export(*a: object, **k: object) -> None:
+        raise AssertionError("export should come from the cache")
+
+    monkeypatch.setattr(onnx_backend, "export_onnx", _no_export)
+    monkeypatch.setattr(onnx_backend, "quantize_int8", _no_export)
+    ZeroShotRisk(model_id=tiny_mnli_dir, cache=False, backend="onnx-int8")
+
+
+def test_every_backend_scores_large_batches(tiny_mnli_dir: str, onnx_dir: Path) -> None:
+    """
+    Test that each backend scores a multi-batch run in label order (throughput: scripts/bench_zsl_backends.py).
+    """
+    texts = TINY_TEXTS * 8
+    for backend in ("torch", "onnx", "onnx-int8"):
+        zsl = ZeroShotRisk(model_id=tiny_mnli_dir, cache=False, backend=backend, token_budget=64)
+        out = zsl._score_texts(texts)
+        assert len(out) == len(texts)
+        assert all([lab for lab, _ in row] == zsl.labels and all(0.0 <= sc <= 1.0 for _, sc in row) for row in out)
+
+
+def test_staged_writes_never_share_a_temp_file(tmp_path: Path) -> None:
+    """
+    Test that concurrent writers of one model file each get their own temp file and a failed one leaves nothing behind.
+    """
+    dst = tmp_path / "onnx" / "model.onnx"
+    with onnx_backend._staged(dst) as a, onnx_backend._staged(dst) as b:
+        assert a != b
+        a.write_bytes(b"first")
+        b.write_bytes(b"second")
+    assert dst.read_bytes() == b"first"  # published last
+    with pytest.raises(RuntimeError), onnx_backend._staged(dst) as c:
+        c.write_bytes(b"torn")
+        raise RuntimeError("export crashed")
+    assert dst.read_bytes() == b"first"
+    assert [p.name for p in dst.parent.iterdir()] == ["model.onnx"]
+
+
+def test_unknown_backend_rejected(tiny_mnli_dir: str) -> None:
+    with pytest.raises(ValueError, match="Unsupported ZSL_BACKEND"):
+        ZeroShotRisk(model_id=tiny_mnli_dir, cache=False, backend="tensorrt")
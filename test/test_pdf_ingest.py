@@ -0,0 +1,101 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from helpers import FakeStore, make_pdf
+
+from risk_analysis_agent import pdf_text
+from risk_analysis_agent import retriever as retr
+from risk_analysis_agent.ingest import SCHEMA, ingest_folder
+
+pytest.importorskip("pypdf")
+
+
+@pytest.fixture
+def pdf_cache(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    cache_dir = tmp_path / "pdf_cache"
+    monkeypatch.setattr(pdf_text, "PDF_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+def test_pdf_chunks_carry_page_numbers(pdf_cache: Path, tmp_path: Path) -> None:
+    """
+    Test that PDF filings are ingested page by page with 1-based page metadata next to TXT filings.
+    """
+    base = tmp_path / "filings"
+    make_pdf(base / "ACME" / "2024" / "prospectus.pdf", ["Liquidity risk on page one", "Cyber risk on page two", "Tariff risk on page three"])
+    (base / "ACME" / "2024" / "item1a.txt").write_text("Text filing risk.", encoding="utf-8")
+    df = ingest_folder(str(base), mode="chars")
+    assert list(df.columns) == [*SCHEMA, "page"]
+    pdf = df[df["filepath"].str.endswith(".pdf")].reset_index(drop=True)
+    assert pdf["page"].tolist() == [1, 2, 3]
+    assert "Cyber risk" in pdf.loc[1, "text"]
+    assert df.loc[df["filepath"].str.endswith(".txt"), "page"].isna().all()
+
+
+def test_mixed_folder_stores_int_pages(pdf_cache: Path, tmp_path: Path, flat_store: FakeStore) -> None:
+    """
+    Test that a TXT + PDF folder keeps ``page`` integer: PDF chunks store int pages in Chroma, TXT chunks none.
+    """
+    base = tmp_path / "filings"
+    make_pdf(base / "ACME" / "2024" / "prospectus.pdf", ["Liquidity risk on page one", "Cyber risk on page two"])
+    (base / "ACME" / "2024" / "item1a.txt").write_text("Text filing risk.", encoding="utf-8")
+    df = ingest_folder(str(base), mode="chars")
+    assert str(df["page"].dtype) == "Int64"
+
+    retr.index_dataframe(df)
+    metas = retr.get_vectorstore().get(include=["metadatas"])["metadatas"]
+    pages = {m["filepath"].rsplit("/", 1)[-1]: m.get("page") for m in metas if not m["filepath"].endswith(".pdf")}
+    pdf_pages = sorted(m["page"] for m in metas if m["filepath"].endswith(".pdf"))
+    assert pdf_pages == [1, 2]
+    assert all(type(p) is int for p in pdf_pages)
+    assert pages == {"item1a.txt": None}
+
+
+def test_extraction_is_cached_by_file_hash(pdf_cache: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that a re-ingest (even of a renamed copy) reads the cache instead of re-extracting.
+    """
+    fp = make_pdf(tmp_path / "a" / "ACME" / "2024" / "kiid.pdf", [f"Page {i} market risk" for i in range(20)])
+    stats = pdf_text.extract_pdfs([fp])
+    assert stats["pages"] == 20 and stats["cached"] == 0  # noqa: PLR2004
+
+    calls = []
+    monkeypatch.setattr(pdf_text, "_extract_range", calls.append)
+    copy = tmp_path / "b" / "ACME" / "2024" / "renamed.pdf"
+    copy.parent.mkdir(parents=True)
+    copy.write_bytes(fp.read_bytes())
+    assert pdf_text.extract_pdfs([copy])["cached"] == 1
+    assert pdf_text.pdf_pages(copy)[19] == "Page 19 market risk"
+    assert calls == []
+
+
+def test_parallel_page_extraction_matches_serial(pdf_cache: Path, tmp_path: Path) -> None:
+    """
+    Test that page ranges extracted across processes are reassembled in page order.
+    """
+    fp = make_pdf(tmp_path / "big.pdf", [f"Page {i} text" for i in range(pdf_text.PAGES_PER_TASK * 2 + 3)])
+    stats = pdf_text.extract_pdfs([fp], workers=2, cache=pdf_text.PdfTextCache(str(pdf_cache / "parallel")))
+    assert stats["pages_per_sec"] > 0
+    parallel = pdf_text.pdf_pages(fp, cache=pdf_text.PdfTextCache(str(pdf_cache / "parallel")))
+    assert parallel == pdf_text.pdf_pages(fp) == [f"Page {i} text" for i in range(pdf_text.PAGES_PER_TASK * 2 + 3)]
+
+
+def test_ingest_hashes_each_pdf_once(pdf_cache: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that ingest reads a PDF's bytes for hashing once, and cache writes leave no staging files behind.
+    """
+    base = tmp_path / "filings"
+    make_pdf(base / "ACME" / "2024" / "prospectus.pdf", ["Liquidity risk", "Cyber risk"])
+    hashed: list[Path] = []
+    sha256 = pdf_text.file_sha256
+    monkeypatch.setattr(pdf_text, "file_sha256", lambda fp: hashed.append(fp) or sha256(fp))
+    df = ingest_folder(str(base), mode="chars")
+    assert df["page"].tolist() == [1, 2]
+    assert [fp.name for fp in hashed] == ["prospectus.pdf"]
+    assert list(pdf_cache.rglob("*.tmp")) == []
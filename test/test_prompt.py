@@ -4,7 +4,7 @@ from pathlib import Path
 root = Path(__file__).resolve().parents[1]
 if str(root) not in sys.path:
     sys.path.insert(0, str(root))
-from risk_analysis_agent.prompts import QA_PROMPT, RISK_SUMMARY_PROMPT
+from risk_analysis_agent.prompts import MAP_PROMPT, QA_PROMPT, REDUCE_PROMPT, RISK_SUMMARY_PROMPT
 
 
 def test_risk_summary_prompt_exists() -> None:
@@ -24,3 +24,13 @@ def test_qa_prompt_exists() -> None:
     assert isinstance(QA_PROMPT, str)
     assert "{question}" in QA_PROMPT
     assert "{context}" in QA_PROMPT
+
+
+def test_map_reduce_prompts_exist() -> None:
+    """
+    Test that the map-reduce prompts take the issuer, year and context placeholders.
+    """
+    for prompt in (MAP_PROMPT, REDUCE_PROMPT):
+        assert "{issuer}" in prompt
+        assert "{year}" in prompt
+        assert "{context}" in prompt
@@ -1,4 +1,7 @@
+import json
 import sys
+import threading
+import time
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -8,7 +11,10 @@ root = Path(__file__).resolve().parents[1]
 if str(root) not in sys.path:
     sys.path.insert(0, str(root))
 
-from risk_analysis_agent.public_api import summarize_risk
+from helpers import FakeStore
+
+from risk_analysis_agent import retriever as retr
+from risk_analysis_agent.public_api import summarize_many, summarize_risk
 
 
 @pytest.fixture
@@ -41,7 +47,7 @@ def test_summarize_risk_basic(mock_docs: list) -> None:
     """
     with (
         patch("risk_analysis_agent.public_api.get_retriever") as mock_retriever,
-        patch("risk_analysis_agent.public_api._get_zsl") as mock_zsl,
+        patch("risk_analysis_agent.public_api.get_zsl") as mock_zsl,
         patch("risk_analysis_agent.public_api.get_llm") as mock_llm,
     ):
         mock_retriever.return_value.invoke.return_value = mock_docs
@@ -53,3 +59,77 @@ def test_summarize_risk_basic(mock_docs: list) -> None:
         assert result["year"] == year
         assert result["summary"] == "Summary text"
         assert isinstance(result["categories"], list)
+
+
+class SlowLLM:
+    """Stands in for a remote model: every call blocks for a fixed time; counts the calls running at once."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.prompts: list[str] = []
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def invoke(self, prompt: str) -> str:
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+            self.prompts.append(prompt)
+            return f"summary {len(self.prompts)}"
+
+
+def _doc(issuer: str, i: int) -> MagicMock:
+    doc = MagicMock()
+    doc.page_content = f"{issuer} risk {i}"
+    doc.metadata = {"source": f"{issuer}.txt", "chunk_id": f"{issuer}:::{i}"}
+    return doc
+
+
+def test_summarize_many_is_concurrent_batched_and_resumable(tmp_path: Path) -> None:
+    """
+    Test that summarize_many overlaps LLM calls, classifies all pairs in one pass and resumes from its JSONL.
+    """
+    pairs = [(f"ISS{i}", 2024) for i in range(8)]
+    llm = SlowLLM(0.2)
+    out = tmp_path / "summaries.jsonl"
+    with (
+        patch("risk_analysis_agent.public_api.get_retriever") as mock_retriever,
+        patch("risk_analysis_agent.public_api.tag_documents", side_effect=lambda docs, *_a, **_k: [[("Market", 0.5)]] * len(docs)) as mock_tags,
+        patch("risk_analysis_agent.public_api.get_llm", return_value=llm),
+    ):
+        mock_retriever.side_effect = lambda k, where: MagicMock(invoke=lambda q: [_doc(where["$and"][0]["issuer"], i) for i in range(3)])
+        results = summarize_many(pairs[:6], concurrency=4, out_path=str(out))
+        assert [r["issuer"] for r in results] == [f"ISS{i}" for i in range(6)]
+        assert llm.max_in_flight == 4  # noqa: PLR2004
+        assert mock_tags.call_count == 1
+        assert len(mock_tags.call_args[0][0]) == 18  # noqa: PLR2004
+        assert mock_retriever.call_args.kwargs["where"]["$and"][1] == {"$or": [{"fiscal_year": "2024"}, {"fiscal_year": 2024}]}
+
+        again = summarize_many(pairs, concurrency=4, out_path=str(out))
+        assert [r["issuer"] for r in again] == ["ISS6", "ISS7"]
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert sorted(r["issuer"] for r in rows) == [f"ISS{i}" for i in range(8)]
+    assert rows[0]["sources"][0]["chunk_id"].endswith(":::0")
+
+
+@pytest.mark.parametrize("year", [2024, "2024"])
+def test_year_filter_matches_str_and_int_metadata(year: int | str, flat_store: FakeStore) -> None:
+    """
+    Test that an int or str year finds chunks whose fiscal_year was stored as a string (folder ingest) or an int.
+    """
+    retr.index_chunks(
+        iter(
+            [
+                {"issuer": "ACME", "fiscal_year": "2024", "chunk_id": "ACME/2024/a.txt:::0", "text": "Rates may rise."},
+                {"issuer": "ACME", "fiscal_year": 2024, "chunk_id": "ACME/2024/b.txt:::0", "text": "Suppliers may fail."},
+                {"issuer": "ACME", "fiscal_year": "2023", "chunk_id": "ACME/2023/a.txt:::0", "text": "Old risk."},
+            ]
+        )
+    )
+    with patch("risk_analysis_agent.public_api.tag_documents", return_value=[]), patch("risk_analysis_agent.public_api.get_llm", return_value=None):
+        result = summarize_risk("ACME", year, k=5)
+    assert sorted(s["chunk_id"] for s in result["sources"]) == ["ACME/2024/a.txt:::0", "ACME/2024/b.txt:::0"]
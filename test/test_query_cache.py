@@ -0,0 +1,69 @@
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from helpers import CountingEmbedder, FakeStore
+
+from risk_analysis_agent import retriever as retr
+
+
+def _chunks(start: int, n: int) -> list[dict]:
+    return [{"issuer": "ACME", "fiscal_year": "2024", "chunk_id": f"ACME/2024/a.txt:::{i}", "text": f"risk text number {i}"} for i in range(start, start + n)]
+
+
+def test_repeat_queries_hit_the_caches(counting_store: CountingEmbedder, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that repeated questions reuse the query embedding and the retrieval result.
+    """
+    retr.index_chunks(iter(_chunks(0, 6)))
+    searches = []
+    mmr = retr.mmr_search
+    monkeypatch.setattr(retr, "mmr_search", lambda vs, q, kw: searches.append(q) or mmr(vs, q, kw))
+
+    first = retr.get_retriever(k=3, where={"issuer": "ACME"}).invoke("liquidity")
+    first[0].metadata["issuer"] = "mutated by caller"
+    again = retr.get_retriever(k=3, where={"issuer": "ACME"}).invoke("liquidity")
+    assert [d.page_content for d in again] == [d.page_content for d in first]
+    assert again[0].metadata["issuer"] == "ACME"
+    assert searches == ["liquidity"]
+    assert retr.result_cache_stats()["hits"] == 1
+
+    retr.get_retriever(k=2, where={"issuer": "ACME"}).invoke("liquidity")  # different k: new search, cached query vector
+    assert len(searches) == 2  # noqa: PLR2004
+    assert counting_store.queries == 1
+
+
+def test_index_write_invalidates_results(counting_store: CountingEmbedder) -> None:
+    """
+    Test that a write through index_chunks bumps the collection version and refreshes results.
+    """
+    retr.index_chunks(iter(_chunks(0, 2)))
+    v1 = retr.collection_version()
+    assert len(retr.get_retriever(k=10).invoke("risk")) == 2  # noqa: PLR2004
+    retr.index_chunks(iter(_chunks(0, 2)))  # nothing new: version unchanged
+    assert retr.collection_version() == v1
+    retr.index_chunks(iter(_chunks(2, 3)))
+    assert retr.collection_version() != v1
+    assert len(retr.get_retriever(k=10).invoke("risk")) == 5  # noqa: PLR2004
+
+
+def test_results_are_not_shared_across_embedding_models(fake_store: Callable[..., FakeStore], monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that switching EMBEDDING_MODEL over the same store and collection misses the result cache.
+    """
+    fake_store(CountingEmbedder(), embedding_model="model-a")
+    retr.index_chunks(iter(_chunks(0, 4)))
+    searches = []
+    mmr = retr.mmr_search
+    monkeypatch.setattr(retr, "mmr_search", lambda vs, q, kw: searches.append(q) or mmr(vs, q, kw))
+    retr.get_retriever(k=2).invoke("liquidity")
+
+    fake_store(CountingEmbedder(), embedding_model="model-b")
+    retr.get_retriever(k=2).invoke("liquidity")
+    assert searches == ["liquidity", "liquidity"]
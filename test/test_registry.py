@@ -0,0 +1,51 @@
+import sys
+import threading
+from pathlib import Path
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from helpers import FakeStore
+
+from risk_analysis_agent import retriever as retr
+
+
+def test_vectorstore_built_once_and_shared(flat_store: FakeStore) -> None:
+    """
+    Test that repeated get_vectorstore/get_retriever calls reuse one store, client and embedder.
+    """
+    vs = retr.get_vectorstore()
+    assert retr.get_vectorstore() is vs
+    retr.get_retriever(k=2)
+    retr.get_retriever(k=3)
+    assert flat_store.loads == 1
+    assert retr.get_vectorstore("other") is not vs
+    assert flat_store.loads == 1  # embedder shared across collections
+
+
+def test_concurrent_first_calls_build_once(flat_store: FakeStore) -> None:
+    """
+    Test that threads racing on a cold registry still load the embedder once.
+    """
+    stores = []
+    threads = [threading.Thread(target=lambda: stores.append(retr.get_vectorstore())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(s) for s in stores}) == 1
+    assert flat_store.loads == 1
+
+
+def test_reload_and_close_hooks(flat_store: FakeStore) -> None:
+    """
+    Test that reload drops stores but keeps the embedder, and close drops everything.
+    """
+    vs = retr.get_vectorstore()
+    retr.reload_vectorstores()
+    assert retr.get_vectorstore() is not vs
+    assert flat_store.loads == 1
+    retr.close_registry()
+    retr.get_vectorstore()
+    assert flat_store.loads == 2  # noqa: PLR2004
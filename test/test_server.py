@@ -0,0 +1,188 @@
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import httpx
+import pytest
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from risk_analysis_agent import server as srv_mod
+from risk_analysis_agent.server import RiskAPIServer
+
+
+class SlowZSL:
+    """Classifier stand-in that takes ``delay`` seconds per call and counts them."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.calls = 0
+
+    def classify(self, texts: list[str], top_k: int = 3) -> list[list[tuple[str, float]]]:
+        self.calls += 1
+        time.sleep(self.delay)
+        return [[("Market", 0.9), ("Credit", 0.5)][:top_k] for _ in texts]
+
+
+def _start(server: RiskAPIServer) -> RiskAPIServer:
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def api(monkeypatch: pytest.MonkeyPatch) -> Iterator[RiskAPIServer]:
+    zsl = SlowZSL()
+    monkeypatch.setattr(srv_mod, "WARMUPS", {"classifier": lambda: None})
+    monkeypatch.setattr(srv_mod, "get_zsl", lambda: zsl)
+    server = RiskAPIServer("127.0.0.1", 0, limits={"/classify": 1}, queue_timeout_s=0.1)
+    server.zsl = zsl
+    server.warm_up()
+    yield _start(server)
+    server.shutdown()
+    server.server_close()
+
+
+def test_readiness_waits_for_warm_models(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that /readyz and POSTs answer 503 while models load, then 200; a failed load stays not-ready.
+    """
+    release = threading.Event()
+    monkeypatch.setattr(srv_mod, "WARMUPS", {"classifier": release.wait, "vectorstore": lambda: None})
+    monkeypatch.setattr(srv_mod, "get_zsl", SlowZSL)
+    server = _start(RiskAPIServer("127.0.0.1", 0))
+    threading.Thread(target=server.warm_up, daemon=True).start()
+    try:
+        with httpx.Client(base_url=server.url) as client:
+            assert client.get("/healthz").status_code == 200  # noqa: PLR2004
+            not_ready = client.get("/readyz")
+            assert not_ready.status_code == 503  # noqa: PLR2004
+            assert not_ready.json()["components"]["classifier"] == "loading"
+            busy = client.post("/classify", json={"texts": ["x"]})
+            assert (busy.status_code, busy.headers["Retry-After"]) == (503, "5")
+
+            release.set()
+            server.warmed.wait(1)
+            assert client.get("/readyz").json() == {"ready": True, "components": {"classifier": "ok", "vectorstore": "ok"}}
+            assert client.post("/classify", json={"texts": ["x"]}).status_code == 200  # noqa: PLR2004
+
+        monkeypatch.setattr(srv_mod, "WARMUPS", {"embedder": lambda: 1 / 0})
+        broken = RiskAPIServer("127.0.0.1", 0)
+        broken.warm_up()
+        assert not broken.ready
+        assert broken.warm["embedder"].startswith("error: division by zero")
+        broken.server_close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_endpoints_round_trip_json(api: RiskAPIServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test classify, search (issuer/year filter, mode) and summarize (top-k and full filing) over HTTP.
+    """
+    seen: dict[str, Any] = {}
+
+    def fake_retriever(k: int, where: Any, search_type: str | None) -> SimpleNamespace:
+        seen.update(k=k, where=where, search_type=search_type)
+        doc = SimpleNamespace(page_content="Rates may rise.", metadata={"chunk_id": "ACME/2024/10k.txt:::3", "issuer": "ACME"})
+        return SimpleNamespace(invoke=lambda q: [doc])
+
+    monkeypatch.setattr(srv_mod, "get_retriever", fake_retriever)
+    monkeypatch.setattr(srv_mod, "summarize_risk", lambda issuer, year, question, k: {"issuer": issuer, "year": year, "summary": question, "k": k})
+    monkeypatch.setattr(srv_mod, "summarize_filing", lambda issuer, year: {"issuer": issuer, "summary": "full"})
+    with httpx.Client(base_url=api.url) as client:
+        got = client.post("/classify", json={"texts": ["a", "b"], "top_k": 1}).json()
+        assert got == {"results": [[{"label": "Market", "score": 0.9}]] * 2}
+
+        got = client.post("/search", json={"query": "interest rates", "k": 3, "issuer": "ACME", "year": 2024, "mode": "hybrid"}).json()
+        assert got["results"][0]["chunk_id"] == "ACME/2024/10k.txt:::3"
+        assert seen == {"k": 3, "where": {"$and": [{"issuer": "ACME"}, {"$or": [{"fiscal_year": "2024"}, {"fiscal_year": 2024}]}]}, "search_type": "hybrid"}
+        client.post("/search", json={"query": "rates"})
+        assert seen["where"] is None
+
+        assert client.post("/summarize", json={"issuer": "ACME", "year": 2024, "question": "liquidity"}).json()["summary"] == "liquidity"
+        assert client.post("/summarize", json={"issuer": "ACME", "year": 2024, "full": True}).json()["summary"] == "full"
+
+        stats = client.get("/stats").json()
+        assert stats["endpoints"]["/search"]["requests"] == 2  # noqa: PLR2004
+        assert "llm" in stats
+
+
+def test_bad_requests_get_4xx(api: RiskAPIServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that malformed, incomplete, oversized and unknown requests are answered with a JSON error.
+    """
+    monkeypatch.setattr(srv_mod, "API_MAX_BODY_BYTES", 100)
+    with httpx.Client(base_url=api.url) as client:
+        assert client.post("/classify", content=b"{not json").status_code == 400  # noqa: PLR2004
+        missing = client.post("/summarize", json={"issuer": "ACME"})
+        assert (missing.status_code, missing.json()["error"]) == (400, "missing field 'year'")
+        assert client.post("/classify", json={"texts": "one string"}).status_code == 400  # noqa: PLR2004
+        assert client.post("/classify", json={"texts": ["x"], "top_k": "3"}).status_code == 400  # noqa: PLR2004
+        assert client.post("/search", json={"query": "rates", "mode": "bogus"}).status_code == 400  # noqa: PLR2004
+        assert client.post("/classify", json={"texts": ["x" * 200]}).status_code == 413  # noqa: PLR2004
+        assert client.post("/nope", json={}).status_code == 404  # noqa: PLR2004
+        assert client.get("/nope").status_code == 404  # noqa: PLR2004
+    assert api.stats["/classify"].errors == 4  # noqa: PLR2004
+    assert api.zsl.calls == 0
+
+
+def test_server_faults_are_500_not_400(api: RiskAPIServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that KeyError/ValueError raised inside an endpoint are answered 500 and logged, not blamed on the client.
+    """
+    logged: list[str] = []
+    monkeypatch.setattr(srv_mod._Handler, "log_error", lambda self, fmt, *args: logged.append(fmt % args))
+
+    def broken_summary(issuer: str, year: int, question: str, k: int) -> dict:
+        raise KeyError("metadata")
+
+    monkeypatch.setattr(srv_mod, "summarize_risk", broken_summary)
+    monkeypatch.setattr(srv_mod, "summarize_filing", lambda issuer, year: int("not a number"))
+    with httpx.Client(base_url=api.url) as client:
+        for body in ({"issuer": "ACME", "year": 2024}, {"issuer": "ACME", "year": 2024, "full": True}):
+            got = client.post("/summarize", json=body)
+            assert got.status_code == 500  # noqa: PLR2004
+        assert got.json()["error"].startswith("ValueError: invalid literal")
+    assert len(logged) == 2  # noqa: PLR2004
+    assert api.stats["/summarize"].errors == 2  # noqa: PLR2004
+
+
+def test_concurrency_limit_sheds_load(api: RiskAPIServer) -> None:
+    """
+    Test that requests beyond an endpoint's limit wait up to the queue timeout, then get 503.
+    """
+    api.zsl.delay = 0.5
+
+    def call(_: int) -> int:
+        return httpx.post(api.url + "/classify", json={"texts": ["x"]}, timeout=5).status_code
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        codes = sorted(pool.map(call, range(3)))
+    assert codes == [200, 503, 503]
+    assert api.zsl.calls == 1
+    assert api.stats["/classify"].rejected == 2  # noqa: PLR2004
+
+
+def test_shared_model_serves_many_clients(api: RiskAPIServer) -> None:
+    """
+    Test that one warm model answers a burst of keep-alive clients without reloading.
+    """
+    api.slots["/classify"] = threading.BoundedSemaphore(4)
+    api.queue_timeout_s = 5
+
+    def client_session(_: int) -> list[int]:
+        with httpx.Client(base_url=api.url) as client:
+            return [client.post("/classify", json={"texts": ["x"]}).status_code for _ in range(5)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        codes = [c for session in pool.map(client_session, range(8)) for c in session]
+    assert codes == [200] * 40
+    assert api.zsl.calls == 40  # noqa: PLR2004
@@ -0,0 +1,56 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pandas as pd
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from helpers import FakeZSL
+
+from risk_analysis_agent.tagging import score_column, tag_dataframe, tag_documents, tags_from_metadata
+from risk_analysis_agent.taxonomy import canonical_labels
+
+
+def test_tag_dataframe_adds_one_column_per_label() -> None:
+    """
+    Test that index-time tagging stores a score column per label, in batches.
+    """
+    df = pd.DataFrame({"text": ["a", "bb", "ccc"], "chunk_id": ["x:::0", "x:::1", "x:::2"]})
+    zsl = FakeZSL()
+    out = tag_dataframe(df, zsl, batch_size=2)
+    assert [len(c) for c in zsl.calls] == [2, 1]
+    for lab in canonical_labels():
+        assert score_column(lab) in out.columns
+    assert "zsl_market_risk" in out.columns
+    assert list(df.columns) == ["text", "chunk_id"]  # input left untouched
+
+
+def test_tag_documents_reads_metadata_and_classifies_only_untagged() -> None:
+    """
+    Test that stored scores are used as-is and the classifier only sees chunks without them.
+    """
+    zsl = FakeZSL()
+    tagged = tag_dataframe(pd.DataFrame({"text": ["stored"]}), zsl)
+    meta = tagged.drop(columns=["text"]).to_dict(orient="records")[0]
+    docs = [SimpleNamespace(page_content="stored", metadata=meta), SimpleNamespace(page_content="fresh", metadata={"chunk_id": "y"})]
+
+    zsl.calls.clear()
+    tags = tag_documents(docs, lambda: zsl, top_k=2)
+    assert zsl.calls == [["fresh"]]
+    assert tags[0] == tags_from_metadata(meta, top_k=2)
+    assert tags[0][0][0] == canonical_labels()[-1]
+    assert len(tags[1]) == 2  # noqa: PLR2004
+
+
+def test_tag_documents_never_builds_model_when_all_tagged() -> None:
+    zsl = FakeZSL()
+    meta = tag_dataframe(pd.DataFrame({"text": ["t"]}), zsl).drop(columns=["text"]).to_dict(orient="records")[0]
+
+    def _no_model() -> None:
+        raise AssertionError("classifier should not be built")
+
+    assert len(tag_documents([SimpleNamespace(page_content="t", metadata=meta)], _no_model)) == 1
+    assert tags_from_metadata({}) is None
@@ -0,0 +1,187 @@
+import asyncio
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+
+import httpx
+import pytest
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from helpers import STUB_TOKENS, StubServer
+
+from risk_analysis_agent import llm as llm_mod
+from risk_analysis_agent import transport
+from risk_analysis_agent.setting import Settings
+
+
+class Flaky(BaseHTTPRequestHandler):
+    """Answers 503 to the first ``server.failures`` requests, then 200, after ``server.delay`` seconds."""
+
+    protocol_version = "HTTP/1.1"
+    server: StubServer
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self) -> None:
+        self.server.paths.append(self.path)
+        time.sleep(self.server.delay)
+        failing = len(self.server.paths) <= self.server.failures
+        body = b"busy" if failing else b"ok"
+        self.send_response(503 if failing else 200)
+        if failing:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def flaky(monkeypatch: pytest.MonkeyPatch) -> Iterator[StubServer]:
+    monkeypatch.setattr(transport, "LLM_RETRY_BACKOFF_S", 0.01)
+    server = StubServer(Flaky)
+    server.failures, server.delay = 0, 0.0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_requests_share_one_keep_alive_connection(flaky: StubServer) -> None:
+    """
+    Test that clients of a provider reuse pooled connections and counters record every request.
+    """
+    for _ in range(5):
+        assert transport.http_client("ollama").get(flaky.url + "/x").text == "ok"
+    assert flaky.connections == 1
+    stats = transport.transport_stats()["ollama"]
+    assert (stats["requests"], stats["errors"], stats["circuit"]) == (5, 0, "closed")
+    assert stats["max_latency_s"] >= stats["mean_latency_s"] > 0
+
+
+def test_retries_transient_errors_with_backoff(flaky: StubServer) -> None:
+    """
+    Test that 503 answers are retried up to LLM_MAX_RETRIES times, then returned as they are.
+    """
+    flaky.failures = 2
+    assert transport.http_client("openai").get(flaky.url).status_code == 200  # noqa: PLR2004
+    stats = transport.transport_stats()["openai"]
+    assert (stats["requests"], stats["errors"], stats["retries"]) == (3, 2, 2)
+
+    flaky.failures = 10
+    assert transport.http_client("claude").get(flaky.url).status_code == 503  # noqa: PLR2004
+    assert len(flaky.paths) == 3 + 1 + transport.LLM_MAX_RETRIES
+
+
+def test_circuit_opens_fails_fast_and_recovers(flaky: StubServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that consecutive failures open the breaker, later calls skip the server, and a probe closes it.
+    """
+    monkeypatch.setattr(transport, "LLM_BREAKER_FAILURES", 3)
+    monkeypatch.setattr(transport, "LLM_BREAKER_RESET_S", 0.2)
+    monkeypatch.setattr(transport, "LLM_MAX_RETRIES", 0)
+    flaky.failures = 3
+    client = transport.http_client("ollama")
+    for _ in range(3):
+        client.get(flaky.url)
+    with pytest.raises(transport.CircuitOpenError):
+        client.get(flaky.url)
+    assert len(flaky.paths) == 3  # noqa: PLR2004
+    assert transport.transport_stats()["ollama"]["circuit"] == "open"
+    assert transport.transport_stats()["ollama"]["rejected"] == 1
+
+    time.sleep(0.25)
+    assert client.get(flaky.url).status_code == 200  # noqa: PLR2004
+    assert transport.transport_stats()["ollama"]["circuit"] == "closed"
+
+
+def test_stalled_call_is_bounded(flaky: StubServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that a server that never answers costs at most (retries + 1) timeouts, not forever.
+    """
+    monkeypatch.setattr(transport, "LLM_TIMEOUT_S", 0.2)
+    monkeypatch.setattr(transport, "LLM_MAX_RETRIES", 1)
+    flaky.delay = 2.0
+    t0 = time.perf_counter()
+    with pytest.raises(httpx.ReadTimeout):
+        transport.http_client("claude").get(flaky.url)
+    assert time.perf_counter() - t0 < 1.0
+    assert transport.transport_stats()["claude"]["errors"] == 2  # noqa: PLR2004
+
+
+def test_health_check_is_cached(flaky: StubServer) -> None:
+    """
+    Test that /api/version is fetched once per TTL, and failures are not remembered.
+    """
+    transport.check_health(flaky.url, ttl_s=0)
+    transport.check_health(flaky.url, ttl_s=0)
+    for _ in range(3):
+        transport.check_health(flaky.url, ttl_s=60)
+    assert flaky.paths == ["/api/version"] * 3
+
+    down = "http://127.0.0.1:9"
+    for _ in range(2):
+        with pytest.raises(httpx.ConnectError):
+            transport.check_health(down)
+
+
+def test_get_llm_reuses_connection_and_health(monkeypatch: pytest.MonkeyPatch, stub_ollama: StubServer) -> None:
+    """
+    Test that Ollama clients from get_llm share the pool (sync and async) and skip repeated health checks.
+    """
+    monkeypatch.setattr(llm_mod, "Settings", lambda: Settings(llm_provider="ollama", llm_model="stub", ollama_base_url=stub_ollama.url))
+    answers = [llm_mod.get_llm().invoke(f"prompt {i}").content for i in range(3)]
+    assert answers == ["".join(STUB_TOKENS)] * 3
+    assert stub_ollama.paths.count("/api/version") == 1
+    assert stub_ollama.connections == 1
+
+    llm = llm_mod.get_llm()
+    for _ in range(2):  # a fresh event loop each time
+        assert transport.run(llm_mod.ainvoke_text(llm, "async")) == "".join(STUB_TOKENS)
+    assert stub_ollama.connections == 1 + 2
+    assert transport.transport_stats()["ollama"]["requests"] == 1 + 3 + 2
+
+
+def _eventually(check: Callable[[], bool], timeout_s: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout_s
+    while not check() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return check()
+
+
+def test_connections_are_closed_with_their_loop_and_on_reset(monkeypatch: pytest.MonkeyPatch, stub_ollama: StubServer) -> None:
+    """
+    Test that run() closes its loop's pool when the loop ends, and reset_transports closes the sync pool.
+    """
+    monkeypatch.setattr(llm_mod, "Settings", lambda: Settings(llm_provider="ollama", llm_model="stub", ollama_base_url=stub_ollama.url))
+    llm = llm_mod.get_llm()
+    assert llm_mod.generate_many(llm, ["a", "b"], concurrency=2) == ["".join(STUB_TOKENS)] * 2
+    assert not transport.async_transport("ollama")._pools
+    assert _eventually(lambda: stub_ollama.closed == stub_ollama.connections - 1)  # only the sync health-check connection is left
+
+    transport.reset_transports()
+    assert _eventually(lambda: stub_ollama.closed == stub_ollama.connections)
+
+
+def test_reset_closes_pools_of_open_loops(flaky: StubServer) -> None:
+    """
+    Test that reset_transports also closes async pools of loops that are still open.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(transport.async_http_client("openai").get(flaky.url)).text == "ok"
+        pool = transport.async_transport("openai")._pools[loop]
+        transport.reset_transports()
+        assert pool._pool.connections == []
+    finally:
+        loop.close()
@@ -9,7 +9,6 @@ root = Path(__file__).resolve().parents[1]
 if str(root) not in sys.path:
     sys.path.insert(0, str(root))
 # test/test_ui_streamlit_analyze.py
-import pandas as pd
 
 from risk_analysis_agent.ui_streamlit import _get_llm, _get_zsl
 
@@ -57,17 +56,34 @@ def test_ingest_tab(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr("streamlit.success", lambda *a, **k: None)
     monkeypatch.setattr("streamlit.dataframe", lambda *a, **k: None)
 
-    # Mock risk_analysis_agent functions
+    # Mock risk_analysis_agent functions: the button runs the manifest-based incremental sync
+    from risk_analysis_agent.indexer import SyncReport
+
+    calls = []
+    monkeypatch.setattr(risk_analysis_agent.ui_streamlit, "_get_zsl", lambda: None)
     monkeypatch.setattr(
         risk_analysis_agent.ui_streamlit,
-        "ingest_folder",
-        lambda folder: pd.DataFrame([{"issuer": "ACME_CORP", "fiscal_year": "2024", "section": "Item 1A", "filepath": "somepath", "text": "txt", "chunk_id": "id"}]),
+        "sync_folder",
+        lambda folder, get_zsl: calls.append((folder, get_zsl)) or SyncReport(added_files=["ACME_CORP/2024/a.txt"], chunks_embedded=1),
     )
-    monkeypatch.setattr(risk_analysis_agent.ui_streamlit, "save_parquet", lambda df, path: None)
-    monkeypatch.setattr(risk_analysis_agent.ui_streamlit, "index_dataframe", lambda df: None)
+
+    refreshed = []
+
+    class Store:
+        def partitions(self) -> list[tuple[str, str]]:
+            return [("BETA", "2023")]
+
+        def refresh(self, fps: list[Path], partitions: set[tuple[str, str]]) -> int:
+            refreshed.append(partitions)
+            return 1
+
+    monkeypatch.setattr(risk_analysis_agent.ui_streamlit, "ChunkStore", Store)
+    monkeypatch.setattr(risk_analysis_agent.ui_streamlit, "list_filings", lambda folder: [Path("ACME_CORP/2024/a.txt"), Path("BETA/2023/b.txt")])
 
     # Run tab logic
     risk_analysis_agent.ui_streamlit.ingest_tab()
+    assert calls == [("data/samples", risk_analysis_agent.ui_streamlit._get_zsl)]
+    assert refreshed == [{("ACME_CORP", "2024")}]  # only the partition of the added file
 
 
 def test_analyze_tab(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -83,6 +99,8 @@ def test_analyze_tab(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr("streamlit.button", lambda *a, **k: True)
     monkeypatch.setattr("streamlit.warning", lambda *a, **k: None)
     monkeypatch.setattr("streamlit.write", lambda *a, **k: None)
+    streamed: list[str] = []
+    monkeypatch.setattr("streamlit.write_stream", streamed.extend)
     monkeypatch.setattr("streamlit.dataframe", lambda *a, **k: None)
 
     # Mock retriever
@@ -158,3 +176,4 @@ def test_analyze_tab(monkeypatch: pytest.MonkeyPatch) -> None:
 
     # Run tab logic
     risk_analysis_agent.ui_streamlit.analyze_tab()
+    assert "".join(streamed) == "Summary"
@@ -0,0 +1,97 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+root = Path(__file__).resolve().parents[1]
+if str(root) not in sys.path:
+    sys.path.insert(0, str(root))
+
+from helpers import TINY_TEXTS
+
+from risk_analysis_agent.classifier import ZeroShotRisk
+from risk_analysis_agent.zsl_cache import ClassificationCache, cache_namespace
+
+
+def test_cache_roundtrip_and_stats(tmp_path: Path) -> None:
+    """
+    Test that stored scores are served from memory, then from disk in a fresh instance.
+    """
+    path = str(tmp_path / "zsl.sqlite")
+    cache = ClassificationCache(path)
+    cache.put_many({"ns:a": [0.1, 0.9], "ns:b": [0.5, 0.5]})
+    assert cache.get_many(["ns:a", "ns:zzz"]) == {"ns:a": [0.1, 0.9]}
+    st = cache.stats()
+    assert (st["hits_memory"], st["hits_disk"], st["misses"], st["entries"]) == (1, 0, 1, 2)
+    cache.close()
+
+    reopened = ClassificationCache(path)
+    assert reopened.get_many(["ns:b"]) == {"ns:b": [0.5, 0.5]}
+    assert reopened.stats()["hits_disk"] == 1
+
+
+def test_cache_size_eviction_drops_least_recently_used(tmp_path: Path) -> None:
+    """
+    Test that the disk table is pruned oldest-first once it exceeds max_bytes.
+    """
+    cache = ClassificationCache(str(tmp_path / "zsl.sqlite"), max_bytes=0, memory_items=0)
+    for i in range(10):
+        cache.put_many({f"ns:{i}": [float(i)] * 10})
+    cache.get_many(["ns:0"])  # touch the oldest entry
+    removed = cache.prune(max_bytes=3 * 60)
+    assert removed > 0
+    left = cache.get_many([f"ns:{i}" for i in range(10)])
+    assert "ns:0" in left
+    assert "ns:1" not in left
+    assert cache.stats()["bytes"] <= 3 * 60
+    assert cache.prune(max_bytes=0) == 0  # 0 = unlimited, as for max_bytes, not "drop everything"
+    assert cache.prune() == 0
+    assert cache.stats()["entries"] == len(left)
+
+
+def test_namespace_depends_on_model_labels_template_and_length() -> None:
+    """
+    Test that anything that changes the scores also changes the cache namespace.
+    """
+    base = cache_namespace("m", ["A", "B"], "t {}", 512)
+    assert base == cache_namespace("m", ["A", "B"], "t {}", 512)
+    assert base != cache_namespace("m2", ["A", "B"], "t {}", 512)
+    assert base != cache_namespace("m", ["B", "A"], "t {}", 512)
+    assert base != cache_namespace("m", ["A", "B"], "u {}", 512)
+    assert base != cache_namespace("m", ["A", "B"], "t {}", 256)
+
+
+def test_classifier_serves_hits_without_model(tiny_mnli_dir: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that classify/classify_threshold reuse cached scores and never run the model for seen texts.
+    """
+    cache = ClassificationCache(str(tmp_path / "zsl.sqlite"))
+    zsl = ZeroShotRisk(model_id=tiny_mnli_dir, cache=cache)
+    first = zsl.classify(TINY_TEXTS, top_k=3)
+
+    def _boom(texts: list[str]) -> list:
+        raise AssertionError("model should not run on cache hits")
+
+    monkeypatch.setattr(zsl, "_run_model", _boom)
+    assert zsl.classify(TINY_TEXTS, top_k=3) == first
+    assert len(zsl.classify_threshold(TINY_TEXTS[:1], threshold=0.0)) == 1
+    assert cache.stats()["misses"] == len(TINY_TEXTS)
+
+
+def test_reads_do_not_write_until_next_put(tmp_path: Path) -> None:
+    """
+    Test that disk hits only record last_used in memory and the next write flushes it.
+    """
+    path = str(tmp_path / "zsl.sqlite")
+    cache = ClassificationCache(path, memory_items=0)
+    cache.put_many({"ns:a": [0.1], "ns:b": [0.2]})
+    writes = cache._db.total_changes
+    for _ in range(3):
+        assert cache.get_many(["ns:a"]) == {"ns:a": [0.1]}
+    assert cache._db.total_changes == writes
+    assert not cache._db.in_transaction
+
+    cache.put_many({"ns:c": [0.3]})
+    reader = ClassificationCache(path)
+    used = dict(reader._db.execute("SELECT key, last_used FROM zsl_scores").fetchall())
+    assert used["ns:a"] > used["ns:b"]